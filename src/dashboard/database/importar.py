@@ -1,6 +1,6 @@
 import streamlit as st
-from sqlalchemy.exc import DatabaseError, IntegrityError
 from src.database.export_import_db import import_database_zip
+from src.database.tipos_base.database import Database
 import pandas as pd
 
 from src.database.reset_contador_ids import reset_contador_ids
@@ -27,25 +27,13 @@ def importar_database():
 
         if st.button("Salvar no Banco de Dados"):
             with st.spinner("Salvando no banco de dados..."):
-                # Salva os dados no banco de dados
-                for model, rows in models:
-                    for row in rows:
-                        try:
-                            row.save()
-                        except IntegrityError as e:
-                            if e.code == "gkpj":
-                                print('record already exists')
-                                row.merge()
-                            else:
-                                print(e.code)
-                                raise
-                        except DatabaseError as e:
-                            print('aqui')
-                            if e.code == " DPY-4011":
-                                row.save()
-                            else:
-                                print(e.code)
-                                raise
+                # Salva os dados no banco de dados: um upsert em lote por tabela, pelo id,
+                # atualizando os registros que já existem, e um único commit antes de atualizar o contador de IDs
+                with Database.get_session() as session:
+                    for model, rows in models:
+                        if rows:
+                            model.bulk_upsert([row.to_dict() for row in rows], keys=['id'], session=session)
+                    session.commit()
 
                 # Atualiza o contador de IDs
                 reset_contador_ids()
@@ -105,18 +105,30 @@ class TableView:
         selected = {'selection': {'rows': [], 'columns': []}}
 
         filters_valid:list[BinaryExpression] = []
-        offset = st.query_params.get('offset', None)
 
         for f in model_filters.get_filters():
             if f.value is not None or f.optional == False:
                 filters_valid.append(f.get_sqlalchemy_filter(self.model, model_filters.get_correct_filter_value(f)))
 
+        navegacao = self.navegacao()
+        total_itens, estimado = self.model.count_estimate(filters=filters_valid)
+        itens_por_pagina = self.model.__table_view_itens_per_page__
+
+        # a última página começa depois da última página completa, como ao avançar página a página,
+        # para que a página anterior a ela seja a mesma. Com o total estimado, exibe as últimas linhas (ver paginacao)
+        limite_pagina = itens_por_pagina
+        if navegacao['from_end'] and not estimado:
+            limite_pagina = total_itens % itens_por_pagina or itens_por_pagina
+
+        # paginação por cursor: cada página é consultada a partir da primeira/última linha da página atual, sem OFFSET
         dataframe = self.model.filter_dataframe(
             select_fields=self.model.__table_view_fields__,
             filters=None if not filters_valid else filters_valid,
             order_by=[self.model.id.desc()] if self.model.id is not None else None,
-            limit=self.model.__table_view_itens_per_page__,
-            offset=offset,
+            limit=limite_pagina,
+            after=navegacao['after'],
+            before=navegacao['before'],
+            from_end=navegacao['from_end'],
             as_display=True
         )
 
@@ -129,7 +141,7 @@ class TableView:
                          hide_index=True,
                          )
 
-            self.paginacao(filters_valid)
+            self.paginacao(dataframe, total_itens, estimado)
 
         with (col2):
             if st.button("Novo"):
@@ -155,49 +167,87 @@ class TableView:
                     st.rerun()
 
 
-    def paginacao(self, filters: list[BinaryExpression] = None):
+    def navegacao(self) -> dict:
+        """
+        Estado da navegação entre as páginas da tabela (página atual e cursor), reiniciado quando os filtros mudam.
+        :return: Dicionário com 'pagina', 'after', 'before', 'from_end' e 'filters'.
+        """
+        chave = f"{self.model.__name__}__navegacao__"
+        filtros = st.query_params.get('filters')
+        navegacao = st.session_state.get(chave)
+
+        if navegacao is None or navegacao['filters'] != filtros:
+            navegacao = {'pagina': 1, 'after': None, 'before': None, 'from_end': False, 'filters': filtros}
+            st.session_state[chave] = navegacao
 
-        total_itens = self.model.count(filters=filters)
+        return navegacao
 
-        if total_itens < self.model.__table_view_itens_per_page__:
+    def mudar_pagina(self, pagina: int, after: tuple = None, before: tuple = None, from_end: bool = False):
+        """
+        Função para mudar a página da tabela.
+        :param pagina: Número da página exibido.
+        :param after: Cursor da última linha da página atual (próxima página).
+        :param before: Cursor da primeira linha da página atual (página anterior).
+        :param from_end: Se True, exibe a última página.
+        """
+        navegacao = self.navegacao()
+        navegacao.update(pagina=pagina, after=after, before=before, from_end=from_end)
+        st.rerun()
+
+    def paginacao(self, dataframe, total_itens: int, estimado: bool):
+        """
+        Exibe a página atual e os botões de navegação.
+        :param dataframe: Página exibida, retornada pelo filter_dataframe.
+        :param total_itens: Quantidade de registros com os filtros atuais.
+        :param estimado: Se o total é estimado (count_estimate).
+        """
+
+        navegacao = self.navegacao()
+
+        if total_itens <= self.model.__table_view_itens_per_page__ and navegacao['pagina'] == 1:
             return
 
         total_paginas = ceil(total_itens / self.model.__table_view_itens_per_page__)
-        coluna_paginas, coluna_botao = st.columns([4, 1])
+        # '~' indica um total estimado (tabelas grandes sem filtros)
+        aproximado = "~" if estimado else ""
 
-        pagina_atual = ceil(int(st.query_params.get('offset', 0)) / self.model.__table_view_itens_per_page__) + 1
+        # 'tem_mais' indica se existem linhas na direção consultada: depois da página (próxima) ou antes dela (anterior)
+        consulta_reversa = navegacao['before'] is not None or navegacao['from_end']
+        tem_anterior = dataframe.attrs['tem_mais'] if consulta_reversa else navegacao['after'] is not None
+        tem_proxima = not navegacao['from_end'] and (True if consulta_reversa else dataframe.attrs['tem_mais'])
 
-        if pagina_atual > total_paginas:
-            st.query_params.pop('offset', None)
-            st.rerun()
+        if dataframe.empty and navegacao['pagina'] != 1:
+            # os registros da página foram removidos
+            self.mudar_pagina(1)
 
-        with coluna_paginas:
+        pagina_atual = navegacao['pagina'] if tem_anterior else 1
+        pagina_atual = min(pagina_atual, total_paginas) if tem_proxima else total_paginas
 
-            st.write(f"Página {pagina_atual} de {total_paginas}")
+        coluna_paginas, coluna_primeira, coluna_anterior, coluna_proxima, coluna_ultima = st.columns([4, 1, 1, 1, 1])
 
-        with coluna_botao:
-            def mudar_pagina(page: int):
-                """
-                Função para mudar a página da tabela.
-                :param page: Página para a qual mudar.
-                """
+        with coluna_paginas:
 
-                offset_value = (page - 1) * self.model.__table_view_itens_per_page__
+            if navegacao['from_end'] and estimado:
+                # sem o total exato, a última página não pode ser alinhada às demais: são exibidos os últimos registros
+                st.write(f"Últimos {len(dataframe)} registros ({aproximado}{total_itens} registros)")
+            else:
+                st.write(f"Página {pagina_atual} de {aproximado}{total_paginas} ({aproximado}{total_itens} registros)")
 
-                if offset_value != st.query_params.get('offset', 0):
-                    st.query_params['offset'] = offset_value
-                    st.rerun()
+        with coluna_primeira:
+            if st.button("⏮", help="Primeira página", disabled=not tem_anterior):
+                self.mudar_pagina(1)
 
-            nova_pagina = st.number_input(
-                "Página",
-                min_value=1,
-                max_value=total_paginas,
-                value=pagina_atual,
-                step=1,
-            )
+        with coluna_anterior:
+            if st.button("◀", help="Página anterior", disabled=not tem_anterior):
+                self.mudar_pagina(max(1, pagina_atual - 1), before=dataframe.attrs['cursor_inicio'])
+
+        with coluna_proxima:
+            if st.button("▶", help="Próxima página", disabled=not tem_proxima):
+                self.mudar_pagina(pagina_atual + 1, after=dataframe.attrs['cursor_fim'])
 
-            if nova_pagina != pagina_atual:
-                mudar_pagina(nova_pagina)
+        with coluna_ultima:
+            if st.button("⏭", help="Última página", disabled=not tem_proxima):
+                self.mudar_pagina(total_paginas, from_end=True)
 
 
     def edit_view(self, model_id: int|None = None):
@@ -2,6 +2,9 @@ import streamlit as st
 import joblib
 import os
 import numpy as np
+from src.database.models.equipamento import Equipamento
+from src.database.models.sensor import TipoSensorEnum
+from src.wokwi_api.ultimas_leituras import UltimasLeituras
 
 
 # --- 1. CARREGAR O SEU MODELO ---
@@ -34,9 +37,27 @@ def previsao_manual():
 
     st.header("Insira as características de equipamentos:")
 
-    Lux_str = st.number_input("Lux", value=15.0, step=1.0)
-    Temperatura_str = st.number_input("Temperatura", value=14.0, step=1.0)
-    vibracao_str = st.number_input("Vibração", value=0.0, step=1.0)
+    # Preenche os campos com o estado atual de um equipamento (última leitura de cada tipo de sensor)
+    equipamento = st.selectbox(
+        "Preencher com as últimas leituras do equipamento:",
+        [None] + Equipamento.all(),
+        format_func=lambda e: "Nenhum" if e is None else str(e),
+    )
+
+    ultimas = UltimasLeituras.do_equipamento(equipamento.id) if equipamento is not None else {}
+
+    def valor_inicial(tipo: TipoSensorEnum, padrao: float) -> float:
+        leitura = ultimas.get(tipo)
+        return float(leitura.valor) if leitura is not None else padrao
+
+    if equipamento is not None and not ultimas:
+        st.info("O equipamento ainda não possui leituras.")
+
+    chave = equipamento.id if equipamento is not None else 0
+
+    Lux_str = st.number_input("Lux", value=valor_inicial(TipoSensorEnum.LUX, 15.0), step=1.0, key=f"lux_{chave}")
+    Temperatura_str = st.number_input("Temperatura", value=valor_inicial(TipoSensorEnum.TEMPERATURA, 14.0), step=1.0, key=f"temperatura_{chave}")
+    vibracao_str = st.number_input("Vibração", value=valor_inicial(TipoSensorEnum.VIBRACAO, 0.0), step=1.0, key=f"vibracao_{chave}")
 
     # --- 3. LÓGICA DE PREVISÃO ---
     # O código abaixo só roda se o modelo foi carregado com sucesso
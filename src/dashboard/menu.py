@@ -5,6 +5,7 @@ from src.dashboard.database.importar import importar_db_page
 from src.dashboard.generic.table_view import TableView
 from src.dashboard.manual import previsao_manual_page
 from src.dashboard.principal import get_principal_page
+from src.dashboard.tempo_real import leituras_tempo_real_page
 from src.database.dynamic_import import import_models
 from src.dashboard.manual import previsao_manual_page
 
@@ -54,6 +55,7 @@ def menu():
     
     st.sidebar.page_link(get_principal_page())
     st.sidebar.page_link(previsao_manual_page)
+    st.sidebar.page_link(leituras_tempo_real_page)
     crud_menu()
     export_import_menu()
 
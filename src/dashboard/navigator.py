@@ -5,8 +5,10 @@ from src.dashboard.database.importar import importar_db_page
 from src.dashboard.global_messages import get_global_messages
 from src.dashboard.manual import previsao_manual_page
 from src.dashboard.principal import get_principal_page
+from src.dashboard.tempo_real import leituras_tempo_real_page
 from src.dashboard.generic.table_view import TableView
 from src.database.dynamic_import import import_models
+from src.database.tipos_base.database import Database
 from src.dashboard.menu import menu
 from src.dashboard.manual import previsao_manual_page
 
@@ -41,10 +43,13 @@ def navigation():
         *get_generic_pages(),
         exportar_db_page,
         importar_db_page,
-        previsao_manual_page
+        previsao_manual_page,
+        leituras_tempo_real_page
     ])
 
     menu()
 
-    current_page.run()
+    # As consultas e alterações dos models durante a renderização da página compartilham uma única sessão e transação
+    with Database.unidade_de_trabalho():
+        current_page.run()
 
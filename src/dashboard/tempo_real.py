@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+from src.database.models.sensor import Sensor
+from src.wokwi_api.transmissao_leituras import SSE_TAMANHO_BUFFER, TransmissaoLeituras
+
+# Quantidade de leituras exibidas na página
+_MAXIMO_LEITURAS = 500
+
+
+def leituras_tempo_real():
+    """
+    Página com as leituras recebidas pela API, lidas do buffer em memória do /leitura/stream,
+    sem consultas ao banco de dados a cada atualização.
+    """
+    st.title("Leituras em Tempo Real")
+
+    if os.environ.get("ENABLE_API", "false").lower() != "true":
+        st.info(
+            "Esta página mostra as leituras recebidas pela API iniciada junto com o dashboard (ENABLE_API=true). "
+            "Para acompanhar uma API em outro processo, use o endpoint /leitura/stream."
+        )
+        return
+
+    if 'tempo_real_sensores' not in st.session_state:
+        # Uma consulta ao abrir a página, para exibir o nome dos sensores
+        st.session_state['tempo_real_sensores'] = {sensor.id: str(sensor) for sensor in Sensor.all()}
+        st.session_state['tempo_real_ultimo_id'] = max(0, TransmissaoLeituras.ultimo_id() - SSE_TAMANHO_BUFFER)
+        st.session_state['tempo_real_leituras'] = []
+
+    nomes = st.session_state['tempo_real_sensores']
+
+    selecionados = st.multiselect(
+        "Sensores", list(nomes), format_func=lambda sensor_id: nomes.get(sensor_id, str(sensor_id))
+    )
+
+    @st.fragment(run_every=2)
+    def atualizar():
+        eventos, _, ultimo_id = TransmissaoLeituras.ler(st.session_state['tempo_real_ultimo_id'])
+        st.session_state['tempo_real_ultimo_id'] = ultimo_id
+
+        leituras = st.session_state['tempo_real_leituras']
+        leituras.extend(
+            {"sensor_id": evento.sensor_id, "data_leitura": evento.data_leitura, "valor": evento.valor}
+            for evento in eventos
+        )
+        del leituras[:-_MAXIMO_LEITURAS]
+
+        df = pd.DataFrame(leituras, columns=["sensor_id", "data_leitura", "valor"])
+        if selecionados:
+            df = df[df["sensor_id"].isin(selecionados)]
+
+        if df.empty:
+            st.warning("Aguardando leituras...")
+            return
+
+        df["sensor"] = df["sensor_id"].map(lambda sensor_id: nomes.get(sensor_id, str(sensor_id)))
+
+        st.line_chart(df, x="data_leitura", y="valor", color="sensor")
+        st.dataframe(df.sort_values("data_leitura", ascending=False)[["data_leitura", "sensor", "valor"]], hide_index=True)
+
+    atualizar()
+
+
+leituras_tempo_real_page = st.Page(leituras_tempo_real, title="Leituras em Tempo Real", icon="📡")
@@ -4,7 +4,6 @@ import random
 import numpy as np
 from datetime import datetime, timedelta
 
-from src.database.tipos_base.database import Database
 from src.database.models.sensor import LeituraSensor
 
 
@@ -21,17 +20,12 @@ def gerar_leituras_vibracao(sensor_id: int, tempo_total: int = 10, leituras_por_
         for pico in picos:
             vibracao[pico] += random.uniform(4, 8)
 
-    # Salva no banco
-    with Database.get_session() as session:
-        agora = datetime.now()
-        leituras = [
-            LeituraSensor(
-                sensor_id=sensor_id,
-                data_leitura=agora + timedelta(seconds=i),
-                valor=float(vibracao[i])
-            ) for i in range(total_leituras)
-        ]
-        session.add_all(leituras)
-        session.commit()
+    # Salva no banco, em lote
+    agora = datetime.now()
+    LeituraSensor.bulk_insert({
+        "sensor_id": [sensor_id] * total_leituras,
+        "data_leitura": [agora + timedelta(seconds=i) for i in range(total_leituras)],
+        "valor": vibracao,
+    })
 
     return picos
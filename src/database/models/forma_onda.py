@@ -0,0 +1,157 @@
+import zlib
+from enum import StrEnum
+from typing import List, Self
+from datetime import datetime, date, time
+
+import numpy as np
+from sqlalchemy import Sequence, ForeignKey, Float, Integer, DateTime, Enum, LargeBinary, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.database.models.sensor import Sensor
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.model import Model
+from src.database.tipos_base.model_mixins.display import SimpleTableFilter
+
+# As amostras são gravadas como float32 little-endian comprimidas com zlib
+DTYPE_AMOSTRAS = np.dtype('<f4')
+
+
+class EixoFormaOndaEnum(StrEnum):
+    X = "X"
+    Y = "Y"
+    Z = "Z"
+    MODULO = "M"
+
+    def __str__(self):
+        match self.value:
+            case "M":
+                return "Módulo"
+
+        return f"Eixo {self.value}"
+
+
+class FormaOndaSensor(Model):
+    """
+    Janela de amostras em alta frequência (1 a 10 kHz) do acelerômetro de um sensor de vibração.
+    Cada janela é gravada em uma única linha, com as amostras em um campo binário comprimido,
+    em vez de uma linha da LEITURA_SENSOR por amostra.
+    """
+    __tablename__ = 'FORMA_ONDA_SENSOR'
+    __menu_group__ = "Sensores"
+    __menu_order__ = 4
+    __database_import_order__ = 13
+    # Gravada pela API, como as leituras
+    __cache_ttl__ = 5
+
+    # O campo 'dados' (binário) não é exibido na tabela
+    __table_view_fields__ = ['id', 'sensor_id', 'eixo', 'data_inicio', 'taxa_amostragem', 'quantidade_amostras']
+
+    __table_view_filters__ = [
+        SimpleTableFilter(field='sensor_id', label='Sensor', operator='=='),
+        SimpleTableFilter(field='data_inicio', label='Data Inicial', operator='>=', optional=True),
+        SimpleTableFilter(field='data_inicio', label='Data Final', operator='<=', optional=True)
+    ]
+
+    __table_args__ = (Index('IX_FORMA_ONDA_SENSOR_SENSOR_DATA', 'sensor_id', 'data_inicio'),)
+
+    @classmethod
+    def display_name(cls) -> str:
+        return "Forma de Onda"
+
+    @classmethod
+    def display_name_plural(cls) -> str:
+        return "Formas de Onda"
+
+    def __str__(self):
+        return f"Sensor_id: {self.sensor_id} - {self.eixo} - {self.data_inicio.strftime('%Y-%m-%d %H:%M:%S')} - {self.quantidade_amostras} amostras"
+
+    id: Mapped[int] = mapped_column(
+        Sequence(f"{__tablename__}_SEQ_ID"), primary_key=True, autoincrement=True, nullable=False
+    )
+
+    sensor_id: Mapped[int] = mapped_column(
+        ForeignKey('SENSOR.id'), nullable=False, info={'label': 'Sensor'}
+    )
+
+    sensor: Mapped[Sensor] = relationship('Sensor', back_populates='formas_onda')
+
+    eixo: Mapped[EixoFormaOndaEnum] = mapped_column(
+        Enum(EixoFormaOndaEnum, length=15), nullable=False, info={'label': 'Eixo'},
+        comment="Eixo do acelerômetro (X, Y, Z) ou módulo da aceleração (M)"
+    )
+
+    data_inicio: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, info={'label': 'Data de Início'},
+        comment="Horário da primeira amostra da janela"
+    )
+
+    taxa_amostragem: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Taxa de Amostragem (Hz)'},
+        comment="Quantidade de amostras por segundo"
+    )
+
+    quantidade_amostras: Mapped[int] = mapped_column(
+        Integer, nullable=False, info={'label': 'Quantidade de Amostras'}
+    )
+
+    dados: Mapped[bytes] = mapped_column(
+        LargeBinary, nullable=False, info={'label': 'Amostras'},
+        comment="Amostras em float32 little-endian comprimidas com zlib"
+    )
+
+    @staticmethod
+    def comprimir(amostras: np.ndarray | list[float]) -> bytes:
+        """
+        Comprime as amostras no formato do campo 'dados'.
+        :param amostras: Amostras da janela.
+        :return: Bytes comprimidos.
+        """
+        return zlib.compress(np.ascontiguousarray(amostras, dtype=DTYPE_AMOSTRAS).tobytes())
+
+    @classmethod
+    def from_amostras(cls,
+                      sensor_id: int,
+                      eixo: EixoFormaOndaEnum,
+                      data_inicio: datetime,
+                      taxa_amostragem: float,
+                      amostras: np.ndarray | list[float]) -> Self:
+        """
+        Cria uma janela a partir das amostras.
+        :param sensor_id: Id do sensor de vibração.
+        :param eixo: Eixo das amostras.
+        :param data_inicio: Horário da primeira amostra.
+        :param taxa_amostragem: Amostras por segundo.
+        :param amostras: Amostras da janela.
+        :return: Instância da janela.
+        """
+        return cls(
+            sensor_id=sensor_id,
+            eixo=eixo,
+            data_inicio=data_inicio,
+            taxa_amostragem=taxa_amostragem,
+            quantidade_amostras=len(amostras),
+            dados=cls.comprimir(amostras),
+        )
+
+    def amostras(self) -> np.ndarray:
+        """
+        Retorna as amostras da janela. O array é criado sobre os bytes descomprimidos, sem cópia, e por isso é somente leitura.
+        :return: Array float32 com as amostras.
+        """
+        return np.frombuffer(zlib.decompress(self.dados), dtype=DTYPE_AMOSTRAS)
+
+    def instantes(self) -> np.ndarray:
+        """
+        Retorna o instante de cada amostra, em segundos a partir de data_inicio.
+        :return: Array float64 com os instantes.
+        """
+        return np.arange(self.quantidade_amostras) / self.taxa_amostragem
+
+    @classmethod
+    def get_formas_onda_for_sensor(cls, sensor_id: int, data_inicial: date, data_final: date) -> List['FormaOndaSensor']:
+        with Database.get_session() as session:
+            return session.query(cls).filter(
+                cls.sensor_id == sensor_id,
+                cls.data_inicio >= datetime.combine(data_inicial, time.min),
+                cls.data_inicio <= datetime.combine(data_final, time.max)
+            ).order_by(cls.data_inicio).all()
@@ -0,0 +1,137 @@
+from typing import List, Self
+from datetime import datetime, date, time, timedelta
+
+import numpy as np
+from sqlalchemy import Sequence, ForeignKey, Float, Integer, DateTime, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.database.models.sensor import Sensor
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.model import Model
+from src.database.tipos_base.model_mixins.display import SimpleTableFilter
+from src.plots.plot_config import GenericPlot, PlotField, TipoGrafico, OrderBy
+
+
+class LeituraAgregada(Model):
+    """
+    Estatísticas de uma janela de leituras de um sensor, calculadas no dispositivo
+    e enviadas no lugar das leituras individuais.
+    """
+    __tablename__ = 'LEITURA_AGREGADA'
+    __menu_group__ = "Sensores"
+    __menu_order__ = 5
+    __database_import_order__ = 14
+    # Recebida pela API (outro processo): o cache expira rápido
+    __cache_ttl__ = 5
+
+    __table_view_filters__ = [
+        SimpleTableFilter(field='sensor_id', label='Sensor', operator='=='),
+        SimpleTableFilter(field='data_inicio', label='Data Inicial', operator='>=', optional=True),
+        SimpleTableFilter(field='data_inicio', label='Data Final', operator='<=', optional=True)
+    ]
+
+    __generic_plot__ = GenericPlot(
+        eixo_x=[PlotField(field='data_inicio', display_name='Início da Janela')],
+        eixo_y=[
+            PlotField(field='minimo', display_name='Mínimo'),
+            PlotField(field='media', display_name='Média'),
+            PlotField(field='maximo', display_name='Máximo'),
+        ],
+        tipo=TipoGrafico.LINHA,
+        title="Gráfico de Leituras Agregadas do Sensor",
+        filters=[
+            SimpleTableFilter(field='sensor_id', operator='==', label='Sensor', optional=False),
+            SimpleTableFilter(field='data_inicio', name='data_inicio_inicial', operator='>=', label='Data Inicial'),
+            SimpleTableFilter(field='data_inicio', name='data_inicio_final', operator='<=', label='Data Final'),
+        ],
+        order_by=[OrderBy(field='data_inicio', asc=True)]
+    )
+
+    # Uma janela por sensor e início: o reenvio da mesma janela é descartado na gravação
+    __table_args__ = (
+        UniqueConstraint('sensor_id', 'data_inicio', name='UK_LEITURA_AGREGADA_SENSOR_DATA'),
+        Index('IX_LEITURA_AGREGADA_DATA', 'data_inicio'),
+    )
+
+    @classmethod
+    def display_name(cls) -> str:
+        return "Leitura Agregada"
+
+    @classmethod
+    def display_name_plural(cls) -> str:
+        return "Leituras Agregadas"
+
+    def __str__(self):
+        return f"Sensor_id: {self.sensor_id} - {self.data_inicio.strftime('%Y-%m-%d %H:%M:%S')} - média {self.media}"
+
+    id: Mapped[int] = mapped_column(
+        Sequence(f"{__tablename__}_SEQ_ID"), primary_key=True, autoincrement=True, nullable=False
+    )
+
+    sensor_id: Mapped[int] = mapped_column(
+        ForeignKey('SENSOR.id'), nullable=False, info={'label': 'Sensor'}
+    )
+
+    sensor: Mapped[Sensor] = relationship('Sensor', back_populates='leituras_agregadas')
+
+    data_inicio: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, info={'label': 'Início da Janela'}
+    )
+
+    data_fim: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, info={'label': 'Fim da Janela'}
+    )
+
+    quantidade: Mapped[int] = mapped_column(
+        Integer, nullable=False, info={'label': 'Quantidade de Leituras'},
+        comment="Quantidade de leituras resumidas na janela"
+    )
+
+    minimo: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Mínimo'}
+    )
+
+    maximo: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Máximo'}
+    )
+
+    media: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Média'}
+    )
+
+    desvio_padrao: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Desvio Padrão'}
+    )
+
+    @classmethod
+    def get_leituras_agregadas_for_sensor(cls, sensor_id: int, data_inicial: date, data_final: date) -> List['LeituraAgregada']:
+        with Database.get_session() as session:
+            return session.query(cls).filter(
+                cls.sensor_id == sensor_id,
+                cls.data_inicio >= datetime.combine(data_inicial, time.min),
+                cls.data_inicio <= datetime.combine(data_final, time.max)
+            ).order_by(cls.data_inicio).all()
+
+    @classmethod
+    def random_range(cls, nullable: bool = True, quantity: int = 100, **kwargs) -> List[Self]:
+        data_inicial = kwargs.get('values_by_name', {}).get(
+            'data_inicio_inicial', (datetime.now() - timedelta(days=7)).isoformat()
+        )
+        data_inicial = datetime.fromisoformat(data_inicial) if isinstance(data_inicial, str) else data_inicial
+
+        medias = 50 + np.cumsum(np.random.normal(0, 2, quantity))
+        desvios = np.random.uniform(0.5, 5, quantity)
+
+        return [
+            cls(
+                sensor_id=1,
+                data_inicio=data_inicial + timedelta(hours=i),
+                data_fim=data_inicial + timedelta(hours=i + 1),
+                quantidade=60,
+                minimo=float(media - 2 * desvio),
+                maximo=float(media + 2 * desvio),
+                media=float(media),
+                desvio_padrao=float(desvio),
+            )
+            for i, (media, desvio) in enumerate(zip(medias, desvios))
+        ]
@@ -2,7 +2,7 @@ from enum import StrEnum
 from typing import List, Self, Union, Any
 from datetime import datetime, date, time, timedelta
 
-from sqlalchemy import Sequence, String, ForeignKey, Float, DateTime, Enum
+from sqlalchemy import Sequence, String, ForeignKey, Float, DateTime, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 import numpy as np
@@ -105,6 +105,9 @@ class Sensor(Model):
         SimpleTableFilter(field='tipo_sensor_id', label='Tipo de Sensor', operator='==')
     ]
 
+    # Um sensor de cada tipo por serial: permite o cadastro em lote idempotente (ON CONFLICT / MERGE)
+    __table_args__ = (UniqueConstraint('cod_serial', 'tipo_sensor_id', name='UK_SENSOR_SERIAL_TIPO'),)
+
     @classmethod
     def display_name_plural(cls) -> str:
         return "Sensores"
@@ -148,6 +151,12 @@ class Sensor(Model):
 
     leituras: Mapped[List['LeituraSensor']] = relationship('LeituraSensor', back_populates='sensor', cascade="all, delete-orphan")
 
+    formas_onda: Mapped[List['FormaOndaSensor']] = relationship('FormaOndaSensor', back_populates='sensor', cascade="all, delete-orphan")
+
+    leituras_agregadas: Mapped[List['LeituraAgregada']] = relationship('LeituraAgregada', back_populates='sensor', cascade="all, delete-orphan")
+
+    registro_ultima_leitura: Mapped['UltimaLeitura'] = relationship('UltimaLeitura', back_populates='sensor', uselist=False, cascade="all, delete-orphan")
+
     def __str__(self):
         return f"{self.id} - {self.nome}"
 
@@ -161,9 +170,19 @@ class Sensor(Model):
 
 class LeituraSensor(Model):
     __tablename__ = 'LEITURA_SENSOR'
+    # Consultas por sensor e período (gráficos, dataset) percorrem este índice em ordem
+    __table_args__ = (
+        Index('IX_LEITURA_SENSOR_SENSOR_DATA', 'sensor_id', 'data_leitura'),
+        # Ordem da paginação por cursor do endpoint /leituras/
+        Index('IX_LEITURA_SENSOR_DATA_ID', 'data_leitura', 'id'),
+    )
     __menu_group__ = "Sensores"
     __menu_order__ = 3
     __database_import_order__ = 12
+    # A listagem sem filtros mostra o total estimado: o COUNT(*) percorreria todas as leituras
+    __count_estimado__ = True
+    # Gravada continuamente pela API, em outro processo: os resultados em cache expiram em poucos segundos
+    __cache_ttl__ = 5
 
     __table_view_filters__ = [
         SimpleTableFilter(field='sensor_id', label='Sensor', operator='=='),
@@ -213,6 +232,11 @@ class LeituraSensor(Model):
         Float, nullable=False, info={'label': 'Valor'}
     )
 
+    chave_idempotencia: Mapped[str] = mapped_column(
+        String(100), nullable=True, unique=True, info={'label': 'Chave de Idempotência'},
+        comment="Sensor e horário (ou inicialização e número de sequência) enviados pelo dispositivo, usados para descartar leituras duplicadas"
+    )
+
     @classmethod
     def get_leituras_for_sensor(cls, sensor_id: int, data_inicial: date, data_final: date) -> List['LeituraSensor']:
         with Database.get_session() as session:
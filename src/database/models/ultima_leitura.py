@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from sqlalchemy import Sequence, ForeignKey, Float, DateTime
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.database.models.sensor import Sensor
+from src.database.tipos_base.model import Model
+from src.database.tipos_base.model_mixins.display import SimpleTableFilter
+
+
+class UltimaLeitura(Model):
+    """
+    Leitura mais recente de cada sensor. Mantida em memória pela API (UltimasLeituras) a cada gravação
+    e salva periodicamente nesta tabela, para que o estado atual dos sensores seja lido sem percorrer a LEITURA_SENSOR.
+    """
+    __tablename__ = 'ULTIMA_LEITURA'
+    __menu_group__ = "Sensores"
+    __menu_order__ = 6
+    __database_import_order__ = 15
+    # Atualizada pela API a cada leitura
+    __cache_ttl__ = 5
+
+    __table_view_filters__ = [
+        SimpleTableFilter(field='sensor_id', label='Sensor', operator='==', optional=True)
+    ]
+
+    @classmethod
+    def display_name(cls) -> str:
+        return "Última Leitura"
+
+    @classmethod
+    def display_name_plural(cls) -> str:
+        return "Últimas Leituras"
+
+    def __str__(self):
+        return f"Sensor_id: {self.sensor_id} - {self.data_leitura.strftime('%Y-%m-%d %H:%M:%S')} - {self.valor}"
+
+    id: Mapped[int] = mapped_column(
+        Sequence(f"{__tablename__}_SEQ_ID"), primary_key=True, autoincrement=True, nullable=False
+    )
+
+    # Uma linha por sensor, atualizada a cada gravação (upsert pelo sensor_id)
+    sensor_id: Mapped[int] = mapped_column(
+        ForeignKey('SENSOR.id'), nullable=False, unique=True, info={'label': 'Sensor'}
+    )
+
+    sensor: Mapped[Sensor] = relationship('Sensor', back_populates='registro_ultima_leitura')
+
+    data_leitura: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, info={'label': 'Data da Leitura'}
+    )
+
+    valor: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Valor'}
+    )
@@ -1,10 +1,12 @@
 from contextlib import contextmanager
+from contextvars import ContextVar
 from io import StringIO
 from typing import Optional
-from sqlalchemy import create_engine, Engine, MetaData
+from sqlalchemy import create_engine, Engine, MetaData, Index, Table, UniqueConstraint, event, inspect
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 import json
+import logging
 import os
 
 from sqlalchemy.sql.ddl import CreateTable
@@ -13,16 +15,22 @@ from src.settings import SQL_ALCHEMY_DEBUG
 
 DEFAULT_DSN = "oracle.fiap.com.br:1521/ORCL"
 
+# Sessão da unidade de trabalho ativa no contexto atual (thread ou task)
+_unidade_de_trabalho: ContextVar[Session | None] = ContextVar("unidade_de_trabalho", default=None)
+
 class Database:
 
     engine:Engine
     session:sessionmaker
 
     @staticmethod
-    def init_sqlite(path:Optional[str] = None):
+    def init_sqlite(path:Optional[str] = None, wal:bool = False, busy_timeout:float = 30.0):
         """
         Inicializa a conexão com o banco de dados SQLite.
         :param path: Caminho do banco de dados SQLite.
+        :param wal: Se True, usa o journal WAL, que permite leituras simultâneas a uma escrita.
+        Recomendado quando vários processos escrevem no mesmo arquivo (ex.: API com vários workers).
+        :param busy_timeout: Tempo, em segundos, que uma conexão aguarda o banco ser liberado por outra antes de falhar.
         :return:
         """
 
@@ -30,7 +38,24 @@ class Database:
             path = os.path.join(os.getcwd(), "database.db")
 
         # Cria o engine de conexão
-        engine = create_engine(f"sqlite:///{path}", echo=SQL_ALCHEMY_DEBUG)
+        engine = create_engine(f"sqlite:///{path}", echo=SQL_ALCHEMY_DEBUG, connect_args={"timeout": busy_timeout})
+
+        @event.listens_for(engine, "connect")
+        def _configurar_conexao(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+            if wal:
+                cursor.execute("PRAGMA journal_mode = WAL")
+                cursor.execute("PRAGMA synchronous = NORMAL")
+            cursor.close()
+
+        @event.listens_for(engine, "savepoint")
+        def _iniciar_transacao(conn, _):
+            # O driver sqlite3 só inicia a transação antes do primeiro INSERT/UPDATE: um SAVEPOINT fora de uma transação
+            # (ex.: escrita na unidade de trabalho depois de apenas consultas) seria confirmado no RELEASE
+            dbapi_connection = conn.connection.dbapi_connection
+            if not dbapi_connection.in_transaction:
+                dbapi_connection.execute("BEGIN")
 
         # Testa a conexão
         with engine.connect() as _:
@@ -39,17 +64,26 @@ class Database:
         Database.session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
     @staticmethod
-    def init_oracledb(user:str, password:str, dsn:str=DEFAULT_DSN):
+    def init_oracledb(user:str, password:str, dsn:str=DEFAULT_DSN, pool_size:int = 5, max_overflow:int = 10):
         '''
         Inicializa a conexão com o banco de dados Oracle.
         :param user: Nome do usuário do banco de dados.
         :param password: Senha do usuário do banco de dados.
         :param dsn: DSN do banco de dados.
+        :param pool_size: Quantidade de conexões mantidas abertas no pool.
+        :param max_overflow: Quantidade de conexões extras que podem ser abertas além do pool_size.
         :return:
         '''
 
         # Cria o engine de conexão
-        engine = create_engine(f"oracle+oracledb://{user}:{password}@{dsn}", echo=SQL_ALCHEMY_DEBUG)
+        engine = create_engine(
+            f"oracle+oracledb://{user}:{password}@{dsn}",
+            echo=SQL_ALCHEMY_DEBUG,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            # Descarta conexões derrubadas pelo servidor antes de usá-las
+            pool_pre_ping=True,
+        )
 
         # Testa a conexão
         with engine.connect() as _:
@@ -83,6 +117,36 @@ class Database:
 
         Database.init_oracledb(user, password)
 
+    @staticmethod
+    def init_from_env(wal:bool = False, pool_size:int = 5):
+        """
+        Inicializa a conexão a partir das variáveis de ambiente.
+        Se SQLITE_PATH estiver definida usa o SQLite, caso contrário usa o Oracle com as variáveis 'user', 'senha' e 'dsn'.
+        :param wal: Se True, usa o journal WAL no SQLite.
+        :param pool_size: Quantidade de conexões mantidas abertas no pool do Oracle.
+        :return:
+        """
+        sqlite_path = os.environ.get('SQLITE_PATH')
+
+        if sqlite_path is not None:
+            Database.init_sqlite(sqlite_path or None, wal=wal)
+            return
+
+        user = os.environ.get('user')
+        senha = os.environ.get('senha')
+
+        if user is None or senha is None:
+            raise ValueError("Defina SQLITE_PATH ou as variáveis 'user' e 'senha' do banco de dados Oracle.")
+
+        Database.init_oracledb(user, senha, os.environ.get('dsn') or DEFAULT_DSN, pool_size=pool_size)
+
+    @staticmethod
+    def inicializado() -> bool:
+        """
+        Retorna se a conexão com o banco de dados foi inicializada.
+        """
+        return getattr(Database, 'engine', None) is not None
+
     @staticmethod
     @contextmanager
     def get_session() -> Generator[Session, None, None]:
@@ -92,6 +156,64 @@ class Database:
         finally:
             db.close()
 
+    @staticmethod
+    @contextmanager
+    def unidade_de_trabalho() -> Generator[Session, None, None]:
+        """
+        Abre uma unidade de trabalho: os métodos dos models (get_from_id, all, save, count, ...) chamados dentro do bloco,
+        no mesmo contexto (thread ou task), compartilham uma única sessão, confirmada com um único commit ao final.
+        As instâncias continuam ligadas à sessão dentro do bloco, permitindo carregar os relacionamentos na mesma transação.
+        Em caso de erro as alterações são desfeitas. Exceções de controle de fluxo que não herdam de Exception
+        (ex.: st.rerun() e st.stop() do Streamlit) confirmam as alterações.
+        Uma unidade aberta dentro de outra reutiliza a sessão da externa.
+        :return: Sessão da unidade de trabalho.
+        """
+        atual = _unidade_de_trabalho.get()
+
+        if atual is not None:
+            yield atual
+            return
+
+        # As instâncias continuam utilizáveis depois do commit, fora do bloco
+        session = Database.session(expire_on_commit=False)
+        token = _unidade_de_trabalho.set(session)
+
+        try:
+            yield session
+        except Exception:
+            # Os listeners das tabelas alteradas também são notificados no rollback (ex.: caches)
+            session.rollback()
+            raise
+        finally:
+            _unidade_de_trabalho.reset(token)
+            try:
+                # Os listeners das tabelas alteradas (ex.: caches) são notificados depois do commit
+                session.commit()
+            finally:
+                session.close()
+
+    @staticmethod
+    def sessao_atual() -> Session | None:
+        """
+        Retorna a sessão da unidade de trabalho ativa no contexto atual, ou None se não houver.
+        """
+        return _unidade_de_trabalho.get()
+
+    @staticmethod
+    @contextmanager
+    def get_session_atual() -> Generator[Session, None, None]:
+        """
+        Retorna a sessão da unidade de trabalho ativa ou, se não houver, uma nova sessão fechada ao final do bloco.
+        """
+        atual = _unidade_de_trabalho.get()
+
+        if atual is not None:
+            yield atual
+            return
+
+        with Database.get_session() as session:
+            yield session
+
     @classmethod
     def list_tables(cls) -> list[str]:
         """
@@ -138,6 +260,95 @@ class Database:
             print("Erro ao criar tabelas no banco de dados.")
             raise
 
+        # O create_all não altera as tabelas que já existem
+        cls.atualizar_esquema()
+
+    @classmethod
+    def atualizar_esquema(cls):
+        """
+        Atualiza as tabelas já existentes para a versão atual dos models, de forma idempotente:
+        adiciona as colunas que faltam (apenas as que aceitam nulo) e cria os índices e as restrições de unicidade
+        que faltam, como índices únicos (o SQLite não permite adicionar uma restrição a uma tabela existente).
+        Chamado pelo create_all_tables, ao iniciar a API e o dashboard.
+        ATENÇÃO: Para isso funcionar deve-se carregar todos os models na memória.
+        """
+        from src.database.tipos_base.model import Model
+        from src.database.dynamic_import import import_models
+
+        import_models(sort=True)
+
+        with cls.engine.begin() as conexao:
+            inspetor = inspect(conexao)
+            preparer = conexao.dialect.identifier_preparer
+
+            for tabela in Model.metadata.sorted_tables:
+                if not inspetor.has_table(tabela.name):
+                    continue
+
+                existentes = {coluna['name'].lower() for coluna in inspetor.get_columns(tabela.name)}
+
+                for coluna in tabela.columns:
+                    if coluna.name.lower() in existentes:
+                        continue
+
+                    if not coluna.nullable:
+                        logging.error(f"A coluna {tabela.name}.{coluna.name} não existe e não aceita nulo: adicione-a manualmente.")
+                        continue
+
+                    tipo = coluna.type.compile(dialect=conexao.dialect)
+                    adicionar = f"ADD ({preparer.format_column(coluna)} {tipo})" if conexao.dialect.name == 'oracle' \
+                        else f"ADD COLUMN {preparer.format_column(coluna)} {tipo}"
+
+                    conexao.exec_driver_sql(f"ALTER TABLE {preparer.format_table(tabela)} {adicionar}")
+                    logging.info(f"Coluna {tabela.name}.{coluna.name} adicionada.")
+
+                # Colunas (em minúsculas) que já possuem um índice único ou uma restrição de unicidade
+                unicos = {
+                    tuple(nome.lower() for nome in item['column_names'])
+                    for item in [*inspetor.get_unique_constraints(tabela.name), *inspetor.get_indexes(tabela.name)]
+                    if item.get('unique', True)
+                }
+                indices = {indice['name'].lower() for indice in inspetor.get_indexes(tabela.name) if indice['name']}
+
+                for indice in cls._indices_esperados(tabela):
+                    colunas = tuple(coluna.name.lower() for coluna in indice.columns)
+
+                    if indice.name.lower() in indices or (indice.unique and colunas in unicos):
+                        continue
+
+                    try:
+                        with conexao.begin_nested():
+                            indice.create(bind=conexao)
+                        logging.info(f"Índice {indice.name} criado em {tabela.name}.")
+                    except Exception as e:
+                        # Ex.: linhas duplicadas que impedem a criação de um índice único
+                        logging.error(f"Não foi possível criar o índice {indice.name} em {tabela.name}: {e}")
+
+    @staticmethod
+    def _indices_esperados(tabela: Table) -> list[Index]:
+        """
+        Retorna os índices declarados na tabela e um índice único para cada restrição de unicidade
+        (UniqueConstraint ou coluna com unique=True), com o nome da restrição ou UX_<tabela>_<coluna>.
+        """
+        indices = list(tabela.indexes)
+
+        # As colunas com unique=True também geram uma UniqueConstraint (sem nome)
+        restricoes = [
+            ([coluna.name for coluna in restricao.columns], restricao.name)
+            for restricao in tabela.constraints if isinstance(restricao, UniqueConstraint)
+        ]
+
+        if restricoes:
+            # Os índices são criados em uma cópia da tabela, para não alterar o metadata dos models
+            copia = tabela.to_metadata(MetaData())
+
+            for colunas, nome in restricoes:
+                # 30 caracteres: limite de nome do Oracle anterior ao 12.2
+                nome = nome or f"UX_{tabela.name}_{'_'.join(colunas)}".upper()[:30]
+                indices.append(Index(nome, *(copia.c[coluna] for coluna in colunas), unique=True))
+
+        return indices
+
     @classmethod
     def drop_all_tables(cls):
         """
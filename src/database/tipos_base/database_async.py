@@ -0,0 +1,96 @@
+from contextlib import asynccontextmanager
+from typing import Optional, AsyncGenerator
+from sqlalchemy import Engine
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+import os
+
+from src.database.tipos_base.database import DEFAULT_DSN
+from src.settings import SQL_ALCHEMY_DEBUG
+
+# Driver assíncrono correspondente a cada driver síncrono suportado
+_DRIVERS_ASYNC = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "oracle+oracledb": "oracle+oracledb_async",
+}
+
+
+class DatabaseAsync:
+    """
+    Variante assíncrona do Database, usada pelos endpoints 'async def' da API.
+    Utiliza o aiosqlite para o SQLite e o modo assíncrono do python-oracledb para o Oracle.
+    """
+
+    engine: AsyncEngine | None = None
+    session: async_sessionmaker | None = None
+
+    @staticmethod
+    def _init_engine(url: str | URL, **kwargs):
+        engine = create_async_engine(url, echo=SQL_ALCHEMY_DEBUG, **kwargs)
+        DatabaseAsync.engine = engine
+        DatabaseAsync.session = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    @staticmethod
+    def init_sqlite(path: Optional[str] = None):
+        """
+        Inicializa a conexão assíncrona com o banco de dados SQLite.
+        :param path: Caminho do banco de dados SQLite.
+        :return:
+        """
+        if path is None:
+            path = os.path.join(os.getcwd(), "database.db")
+
+        DatabaseAsync._init_engine(f"sqlite+aiosqlite:///{path}")
+
+    @staticmethod
+    def init_oracledb(user: str, password: str, dsn: str = DEFAULT_DSN):
+        """
+        Inicializa a conexão assíncrona com o banco de dados Oracle.
+        :param user: Nome do usuário do banco de dados.
+        :param password: Senha do usuário do banco de dados.
+        :param dsn: DSN do banco de dados.
+        :return:
+        """
+        DatabaseAsync._init_engine(f"oracle+oracledb_async://{user}:{password}@{dsn}")
+
+    @staticmethod
+    def init_from_engine(engine: Engine):
+        """
+        Inicializa a conexão assíncrona com o mesmo banco de dados de um engine síncrono já existente.
+        :param engine: Engine síncrono do banco de dados (ex.: Database.engine).
+        :return:
+        """
+        url = engine.url
+        driver = _DRIVERS_ASYNC.get(url.drivername)
+
+        if driver is None:
+            raise ValueError(f"Driver '{url.drivername}' não possui uma versão assíncrona suportada.")
+
+        DatabaseAsync._init_engine(url.set(drivername=driver))
+
+    @staticmethod
+    def inicializado() -> bool:
+        """
+        Retorna se a conexão assíncrona foi inicializada.
+        """
+        return DatabaseAsync.engine is not None
+
+    @staticmethod
+    @asynccontextmanager
+    async def get_session() -> AsyncGenerator[AsyncSession, None]:
+        db = DatabaseAsync.session()
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def dispose():
+        """
+        Fecha todas as conexões do engine assíncrono.
+        """
+        if DatabaseAsync.engine is not None:
+            await DatabaseAsync.engine.dispose()
+            DatabaseAsync.engine = None
+            DatabaseAsync.session = None
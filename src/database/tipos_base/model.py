@@ -5,6 +5,7 @@ import pandas as pd
 from sqlalchemy.orm import DeclarativeBase
 from enum import Enum
 from src.database.tipos_base.database import Database
+from src.database.tipos_base.model_mixins.bulk import _ModelBulkMixin # noqa
 from src.database.tipos_base.model_mixins.crud import _ModelCrudMixin # noqa
 from src.database.tipos_base.model_mixins.display import _ModelDisplayMixin # noqa
 from src.database.tipos_base.model_mixins.fields import _ModelFieldsMixin # noqa
@@ -22,6 +23,7 @@ class Model(DeclarativeBase,
             _ModelFieldsMixin,
             _ModelDisplayMixin,
             _ModelCrudMixin,
+            _ModelBulkMixin,
             ):
 
     __database_import_order__:int = 100000
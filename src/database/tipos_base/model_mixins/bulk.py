@@ -0,0 +1,275 @@
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import BinaryExpression, Executable, Insert, Sequence, bindparam, delete, insert, select, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session
+from typing import Any, Generator, Iterator
+
+# Quantidade de linhas por comando (executemany) nas operações em lote
+BULK_TAMANHO_LOTE = int(os.environ.get("BULK_TAMANHO_LOTE", 10000))
+
+
+def _valores_coluna(coluna) -> list:
+    """
+    Converte uma coluna (lista, array do NumPy ou Series do pandas) em uma lista de valores nativos do Python.
+    """
+    if hasattr(coluna, "to_numpy"):
+        coluna = coluna.to_numpy()
+
+    tipo = getattr(coluna, "dtype", None)
+
+    if tipo is None:
+        return list(coluna)
+
+    if tipo.kind == "M":
+        # datetime64 -> datetime (NaT -> None)
+        return coluna.astype("datetime64[us]").tolist()
+
+    valores = coluna.tolist()
+
+    if tipo.kind in "fO":
+        # NaN -> NULL
+        return [None if isinstance(valor, float) and valor != valor else valor for valor in valores]
+
+    return valores
+
+
+def _lotes(dados, tamanho: int) -> Iterator[list[dict]]:
+    """
+    Divide os dados em lotes de dicionários (uma linha por dicionário), com as mesmas chaves em todas as linhas do lote.
+    :param dados: Lista de dicionários, DataFrame do pandas, dicionário de colunas (listas ou arrays do NumPy)
+    ou array estruturado do NumPy.
+    :param tamanho: Quantidade de linhas por lote.
+    """
+    if isinstance(dados, list):
+        for inicio in range(0, len(dados), tamanho):
+            # Um executemany exige as mesmas chaves em todas as linhas: as linhas são agrupadas pelas chaves informadas
+            grupos: dict[tuple, list[dict]] = {}
+            for linha in dados[inicio:inicio + tamanho]:
+                grupos.setdefault(tuple(linha), []).append(linha)
+            yield from grupos.values()
+        return
+
+    if hasattr(dados, "columns") and hasattr(dados, "iloc"):
+        # DataFrame
+        dados = {str(nome): dados[nome] for nome in dados.columns}
+    elif getattr(getattr(dados, "dtype", None), "names", None):
+        # Array estruturado do NumPy
+        dados = {nome: dados[nome] for nome in dados.dtype.names}
+
+    if not isinstance(dados, dict):
+        raise TypeError(f"Formato de dados não suportado: {type(dados).__name__}.")
+
+    nomes = list(dados)
+    colunas = [_valores_coluna(dados[nome]) for nome in nomes]
+    quantidade = len(colunas[0]) if colunas else 0
+
+    for inicio in range(0, quantidade, tamanho):
+        yield [dict(zip(nomes, linha)) for linha in zip(*(coluna[inicio:inicio + tamanho] for coluna in colunas))]
+
+
+class _ModelBulkMixin:
+    """
+    Mixin class onde as operações em lote são definidas: muitas linhas por comando (executemany),
+    em vez de uma sessão e um commit por instância (save/merge).
+    Sem uma sessão informada, a operação usa a sessão de escrita do mixin de CRUD (_write_session):
+    uma transação própria, ou a unidade de trabalho ativa.
+    Com uma sessão informada, o commit fica com quem chamou, e os listeners de escrita são notificados no fim da transação.
+    """
+
+    @classmethod
+    @contextmanager
+    def _bulk_session(cls, session: Session | None, notify: bool = True) -> Generator[Session, None, None]:
+        if session is None:
+            with cls._write_session() as session:
+                yield session
+            return
+
+        yield session
+
+        # Os listeners são notificados quando a transação de quem chamou terminar. Sem notify,
+        # o cache de consultas da tabela ainda é invalidado, para que as consultas não retornem dados antigos
+        cls._mark_written(session, notify)
+
+    @classmethod
+    def _insert_ignoring_conflicts(cls, columns: list[str], dialect: str) -> Insert:
+        """
+        Monta um INSERT que ignora as linhas que violam o índice único das colunas informadas (ex.: reenvios).
+        :param columns: Colunas do índice único.
+        :param dialect: Nome do dialeto do banco de dados.
+        :return: Comando INSERT.
+        """
+        if dialect == 'sqlite':
+            return sqlite.insert(cls).on_conflict_do_nothing(index_elements=[getattr(cls, coluna) for coluna in columns])
+
+        if dialect == 'oracle':
+            return insert(cls).prefix_with(
+                f"/*+ IGNORE_ROW_ON_DUPKEY_INDEX({cls.__tablename__}({', '.join(columns)})) */", dialect='oracle'
+            )
+
+        return insert(cls)
+
+    @classmethod
+    def _upsert(cls,
+                dialect: str,
+                columns: list[str],
+                keys: list[str],
+                update_columns: list[str],
+                version_column: str | None) -> Executable:
+        """
+        Monta o comando que insere as linhas ou atualiza as existentes (mesmos valores nas colunas 'keys'):
+        INSERT ... ON CONFLICT no SQLite e MERGE no Oracle, que não possui ON CONFLICT.
+        :param dialect: Nome do dialeto do banco de dados.
+        :param columns: Colunas informadas em cada linha.
+        :param keys: Colunas do índice único que identifica a linha.
+        :param update_columns: Colunas atualizadas nas linhas existentes. Se vazia, as existentes são mantidas.
+        :param version_column: Se informada, a linha existente só é atualizada quando o valor novo desta coluna
+        for maior ou igual ao atual (ex.: data da leitura).
+        :return: Comando a ser executado com a lista de linhas (executemany).
+        """
+        tabela = cls.__table__
+
+        if dialect == 'oracle':
+            origem = ", ".join(f":{coluna} AS {coluna}" for coluna in columns)
+            condicao = " AND ".join(f"d.{coluna} = n.{coluna}" for coluna in keys)
+
+            colunas_insert = list(columns)
+            valores_insert = [f"n.{coluna}" for coluna in columns]
+
+            if 'id' not in columns and isinstance(tabela.c.id.default, Sequence):
+                colunas_insert.insert(0, 'id')
+                valores_insert.insert(0, f"{tabela.c.id.default.name}.NEXTVAL")
+
+            merge = f"MERGE INTO {cls.__tablename__} d\nUSING (SELECT {origem} FROM dual) n\nON ({condicao})\n"
+
+            if update_columns:
+                merge += "WHEN MATCHED THEN\n    UPDATE SET " + ", ".join(f"d.{coluna} = n.{coluna}" for coluna in update_columns)
+                if version_column:
+                    merge += f" WHERE n.{version_column} >= d.{version_column}"
+                merge += "\n"
+
+            merge += f"WHEN NOT MATCHED THEN\n    INSERT ({', '.join(colunas_insert)})\n    VALUES ({', '.join(valores_insert)})"
+
+            # Os tipos dos parâmetros garantem a mesma conversão do ORM (ex.: Enum gravado pelo nome)
+            return text(merge).bindparams(*(bindparam(coluna, type_=tabela.c[coluna].type) for coluna in columns))
+
+        if dialect == 'sqlite':
+            comando = sqlite.insert(cls)
+            indice = [getattr(cls, coluna) for coluna in keys]
+
+            if not update_columns:
+                return comando.on_conflict_do_nothing(index_elements=indice)
+
+            return comando.on_conflict_do_update(
+                index_elements=indice,
+                set_={coluna: comando.excluded[coluna] for coluna in update_columns},
+                where=(comando.excluded[version_column] >= tabela.c[version_column]) if version_column else None,
+            )
+
+        return insert(cls)
+
+    @classmethod
+    def bulk_insert(cls,
+                    data: list[dict] | dict[str, Any] | Any,
+                    chunk_size: int | None = None,
+                    ignore_conflicts_on: list[str] | None = None,
+                    session: Session | None = None,
+                    notify: bool = True) -> int:
+        """
+        Insere muitas linhas com um comando por lote (executemany), em uma única transação.
+        :param data: Lista de dicionários, DataFrame do pandas, dicionário de colunas (listas ou arrays do NumPy)
+        ou array estruturado do NumPy. As chaves/colunas são os nomes dos campos do model.
+        :param chunk_size: Quantidade de linhas por comando. Padrão: BULK_TAMANHO_LOTE.
+        :param ignore_conflicts_on: Colunas de um índice único: as linhas que já existem são ignoradas.
+        :param session: Sessão a ser usada, sem commit. Se None, usa uma transação própria (ou a unidade de trabalho ativa).
+        :param notify: Com uma sessão informada, se False os listeners de escrita não são notificados no fim da transação
+        (ex.: quem chamou já atualiza os próprios caches). O cache de consultas (CacheConsultas) da tabela é invalidado mesmo assim.
+        :return: Quantidade de linhas inseridas.
+        """
+        inseridas = 0
+
+        with cls._bulk_session(session, notify) as session:
+            # Executado direto na conexão (Core), sem montar objetos do ORM, para obter a quantidade de linhas
+            conexao = session.connection()
+            dialeto = conexao.dialect.name
+            comando = cls._insert_ignoring_conflicts(ignore_conflicts_on, dialeto) if ignore_conflicts_on else insert(cls)
+
+            for lote in _lotes(data, chunk_size or BULK_TAMANHO_LOTE):
+                resultado = conexao.execute(comando, lote)
+                inseridas += resultado.rowcount if resultado.rowcount >= 0 else len(lote)
+
+        return inseridas
+
+    @classmethod
+    def bulk_upsert(cls,
+                    data: list[dict] | dict[str, Any] | Any,
+                    keys: list[str],
+                    update_columns: list[str] | None = None,
+                    version_column: str | None = None,
+                    chunk_size: int | None = None,
+                    session: Session | None = None,
+                    notify: bool = True) -> int:
+        """
+        Insere as linhas novas e atualiza as existentes (identificadas pelas colunas 'keys', que devem formar um índice único)
+        com um comando por lote: INSERT ... ON CONFLICT no SQLite e MERGE no Oracle.
+        :param data: Lista de dicionários, DataFrame do pandas, dicionário de colunas (listas ou arrays do NumPy)
+        ou array estruturado do NumPy.
+        :param keys: Colunas que identificam a linha (ex.: ['id'] ou ['cod_serial', 'tipo_sensor_id']).
+        :param update_columns: Colunas atualizadas nas linhas existentes. Padrão: todas as informadas, exceto as 'keys'.
+        Se vazia, as linhas existentes são mantidas (apenas insere as novas).
+        :param version_column: Se informada, a linha existente só é atualizada quando o valor novo desta coluna
+        for maior ou igual ao atual.
+        :param chunk_size: Quantidade de linhas por comando. Padrão: BULK_TAMANHO_LOTE.
+        :param session: Sessão a ser usada, sem commit. Se None, usa uma transação própria (ou a unidade de trabalho ativa).
+        :param notify: Com uma sessão informada, se False os listeners de escrita não são notificados no fim da transação
+        (ex.: quem chamou já atualiza os próprios caches). O cache de consultas (CacheConsultas) da tabela é invalidado mesmo assim.
+        :return: Quantidade de linhas inseridas ou atualizadas.
+        """
+        afetadas = 0
+
+        with cls._bulk_session(session, notify) as session:
+            conexao = session.connection()
+            dialeto = conexao.dialect.name
+            comandos: dict[tuple, Executable] = {}
+
+            for lote in _lotes(data, chunk_size or BULK_TAMANHO_LOTE):
+                colunas = tuple(lote[0])
+
+                if colunas not in comandos:
+                    atualizar = [coluna for coluna in colunas if coluna not in keys] if update_columns is None else update_columns
+                    comandos[colunas] = cls._upsert(dialeto, list(colunas), keys, atualizar, version_column)
+
+                resultado = conexao.execute(comandos[colunas], lote)
+                afetadas += resultado.rowcount if resultado.rowcount >= 0 else len(lote)
+
+        return afetadas
+
+    @classmethod
+    def bulk_delete(cls,
+                    filters: list[BinaryExpression] | None,
+                    chunk_size: int | None = None,
+                    session: Session | None = None) -> int:
+        """
+        Remove as linhas que atendem aos filtros, em lotes de até chunk_size linhas por comando.
+        Sem uma sessão informada, cada lote é confirmado separadamente, evitando uma transação longa em tabelas grandes.
+        :param filters: Filtros das linhas a serem removidas. Se None, remove todas as linhas.
+        :param chunk_size: Quantidade máxima de linhas por comando. Padrão: BULK_TAMANHO_LOTE.
+        :param session: Sessão a ser usada, sem commit. Se None, usa uma transação própria por lote (ou a unidade de trabalho ativa).
+        :return: Quantidade de linhas removidas.
+        """
+        chunk_size = chunk_size or BULK_TAMANHO_LOTE
+        comando = delete(cls.__table__).where(
+            cls.id.in_(select(cls.id).where(*(filters or [])).limit(chunk_size))
+        )
+
+        removidas = 0
+
+        while True:
+            with cls._bulk_session(session) as sessao_lote:
+                quantidade = sessao_lote.connection().execute(comando).rowcount
+
+            removidas += quantidade
+
+            if quantidade < chunk_size:
+                return removidas
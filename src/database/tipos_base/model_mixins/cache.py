@@ -0,0 +1,225 @@
+"""
+Cache em memória, compartilhado pelo processo, dos resultados das consultas dos models
+(filter_dataframe, all, get_from_id e count).
+Cada resultado é identificado pelo SQL compilado e pelos seus parâmetros, e guarda as tabelas consultadas:
+as escritas feitas pelos models descartam, no fim da transação, os resultados das tabelas alteradas e das que as referenciam
+(ex.: remover um sensor remove as suas leituras). Escritas de outros processos (ex.: a API gravando leituras)
+são vistas ao final do tempo limite do model (__cache_ttl__) ou de QUERY_CACHE_TTL_SEGUNDOS.
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, TypeVar
+
+from sqlalchemy import Executable, Table
+from sqlalchemy.sql.util import find_tables
+
+from src.database.tipos_base.database import Database
+
+# Tempo máximo, em segundos, que um resultado fica em cache quando o model não define __cache_ttl__
+QUERY_CACHE_TTL_SEGUNDOS = float(os.environ.get("QUERY_CACHE_TTL_SEGUNDOS", 60))
+# Memória máxima ocupada pelos resultados em cache. 0 desativa o cache
+QUERY_CACHE_TAMANHO_MB = float(os.environ.get("QUERY_CACHE_TAMANHO_MB", 64))
+
+T = TypeVar("T")
+
+
+def tamanho_aproximado(valor: Any) -> int:
+    """
+    Estima a memória, em bytes, ocupada por um resultado (DataFrame, listas, tuplas, dicionários ou valores simples).
+    """
+    if hasattr(valor, "memory_usage"):
+        # DataFrame do pandas
+        return int(valor.memory_usage(index=True, deep=True).sum())
+
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamanho_aproximado(item) for item in valor)
+
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamanho_aproximado(chave) + tamanho_aproximado(item) for chave, item in valor.items())
+
+    return sys.getsizeof(valor)
+
+
+def tabelas_afetadas(tabela: Table) -> set[str]:
+    """
+    Retorna o nome da tabela e das tabelas que a referenciam por chave estrangeira, direta ou indiretamente,
+    que podem ser alteradas junto com ela (ex.: ON DELETE CASCADE).
+    """
+    afetadas = {tabela.name}
+    pendentes = [tabela]
+
+    while pendentes:
+        referenciada = pendentes.pop()
+        for outra in tabela.metadata.tables.values():
+            if outra.name not in afetadas and any(fk.references(referenciada) for fk in outra.foreign_keys):
+                afetadas.add(outra.name)
+                pendentes.append(outra)
+
+    return afetadas
+
+
+@dataclass
+class _Resultado:
+    valor: Any
+    tabelas: frozenset[str]
+    tamanho: int
+    expira_em: float
+
+
+class CacheConsultas:
+    """
+    Cache LRU dos resultados das consultas, limitado pela memória ocupada (QUERY_CACHE_TAMANHO_MB) e pelo tempo limite.
+    """
+
+    _resultados: OrderedDict[tuple, _Resultado] = OrderedDict()
+    _tamanho_total: int = 0
+    # Quantidade de invalidações de cada tabela: um resultado consultado antes de uma escrita não é guardado depois dela
+    _geracoes: dict[str, int] = {}
+    _limpezas: int = 0
+    _acertos: int = 0
+    _faltas: int = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def chave(statement: Executable, *extras) -> tuple:
+        """
+        Identifica uma consulta pelo SQL compilado e pelos parâmetros.
+        :param statement: Consulta do SQLAlchemy.
+        :param extras: Valores adicionais que diferenciam o resultado (ex.: o formato retornado).
+        :return: Chave do cache.
+        """
+        compilado = statement.compile()
+        return Database.engine, *extras, str(compilado), repr(sorted(compilado.params.items()))
+
+    @staticmethod
+    def tabelas(statement: Executable) -> frozenset[str]:
+        """
+        Retorna os nomes das tabelas usadas na consulta, inclusive nos filtros e subconsultas.
+        """
+        return frozenset(tabela.name for tabela in find_tables(statement, check_columns=True) if isinstance(tabela, Table))
+
+    @classmethod
+    def obter(cls,
+              chave: tuple,
+              tabelas: frozenset[str],
+              consultar: Callable[[], T],
+              ttl: float | None = None,
+              copiar: Callable[[T], T] | None = None) -> T:
+        """
+        Retorna o resultado em cache ou executa a consulta e guarda o resultado.
+        Dentro de uma unidade de trabalho com escritas ainda não confirmadas em alguma das tabelas,
+        a consulta é executada sem usar o cache, para enxergar as alterações da própria transação.
+        :param chave: Identificação da consulta (CacheConsultas.chave).
+        :param tabelas: Tabelas usadas na consulta.
+        :param consultar: Função que executa a consulta.
+        :param ttl: Tempo limite, em segundos. Padrão: QUERY_CACHE_TTL_SEGUNDOS.
+        :param copiar: Função que copia o resultado, para valores mutáveis (ex.: DataFrame):
+        quem chamou pode alterá-lo sem alterar o que está em cache.
+        :return: Resultado da consulta.
+        """
+        limite = int(QUERY_CACHE_TAMANHO_MB * 1024 * 1024)
+
+        if limite <= 0 or cls._tabelas_alteradas_na_sessao() & tabelas:
+            return consultar()
+
+        agora = time.monotonic()
+
+        with cls._lock:
+            resultado = cls._resultados.get(chave)
+
+            if resultado is not None and resultado.expira_em > agora:
+                cls._resultados.move_to_end(chave)
+                cls._acertos += 1
+                return copiar(resultado.valor) if copiar else resultado.valor
+
+            cls._faltas += 1
+            geracoes = cls._geracoes_das(tabelas)
+
+        valor = consultar()
+        tamanho = tamanho_aproximado(valor)
+
+        # Um resultado grande não é guardado, para não descartar todo o restante do cache
+        if tamanho <= limite // 4:
+            with cls._lock:
+                if geracoes == cls._geracoes_das(tabelas):
+                    cls._remover(chave)
+                    cls._resultados[chave] = _Resultado(
+                        valor, tabelas, tamanho, agora + (QUERY_CACHE_TTL_SEGUNDOS if ttl is None else ttl)
+                    )
+                    cls._tamanho_total += tamanho
+
+                    while cls._tamanho_total > limite:
+                        cls._remover(next(iter(cls._resultados)))
+
+        return copiar(valor) if copiar else valor
+
+    @classmethod
+    def invalidar(cls, tabelas: Iterable[str] | None = None) -> None:
+        """
+        Descarta os resultados que usam alguma das tabelas.
+        :param tabelas: Nomes das tabelas alteradas. Se None, descarta todo o cache.
+        """
+        with cls._lock:
+            if tabelas is None:
+                cls._resultados.clear()
+                cls._tamanho_total = 0
+                cls._limpezas += 1
+                return
+
+            tabelas = set(tabelas)
+
+            for tabela in tabelas:
+                cls._geracoes[tabela] = cls._geracoes.get(tabela, 0) + 1
+
+            for chave in [chave for chave, resultado in cls._resultados.items() if resultado.tabelas & tabelas]:
+                cls._remover(chave)
+
+    @classmethod
+    def invalidar_model(cls, model: type) -> None:
+        """
+        Descarta os resultados da tabela do model e das tabelas que a referenciam. Registrado como listener de escrita
+        dos models (_ModelCrudMixin.add_write_listener).
+        """
+        tabela = getattr(model, "__table__", None)
+        if tabela is not None:
+            cls.invalidar(tabelas_afetadas(tabela))
+
+    @classmethod
+    def estatisticas(cls) -> dict:
+        """
+        Retorna a quantidade de acertos, faltas e resultados em cache e a memória ocupada, em bytes.
+        """
+        with cls._lock:
+            return {
+                "acertos": cls._acertos,
+                "faltas": cls._faltas,
+                "resultados": len(cls._resultados),
+                "bytes": cls._tamanho_total,
+            }
+
+    @classmethod
+    def _geracoes_das(cls, tabelas: frozenset[str]) -> tuple:
+        return cls._limpezas, *(cls._geracoes.get(tabela, 0) for tabela in sorted(tabelas))
+
+    @classmethod
+    def _remover(cls, chave: tuple) -> None:
+        resultado = cls._resultados.pop(chave, None)
+        if resultado is not None:
+            cls._tamanho_total -= resultado.tamanho
+
+    @staticmethod
+    def _tabelas_alteradas_na_sessao() -> set[str]:
+        session = Database.sessao_atual()
+
+        if session is None:
+            return set()
+
+        alteradas = set()
+        for model in session.info.get("models_alterados", ()):
+            alteradas |= tabelas_afetadas(model.__table__)
+
+        return alteradas
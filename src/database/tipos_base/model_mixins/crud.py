@@ -1,21 +1,192 @@
 from abc import abstractmethod
+from contextlib import contextmanager
 
 import logging
+import os
 
 from src.database.tipos_base.database import Database
-from sqlalchemy import inspect, BinaryExpression, UnaryExpression
-from typing import Self
+from src.database.tipos_base.model_mixins.cache import CacheConsultas
+from src.database.tipos_base.model_mixins.ordenacao import clausulas_ordem, inverter_ordem, normalizar_ordem
+from sqlalchemy import event, func, inspect, select, text, BinaryExpression, Select, UnaryExpression
+from sqlalchemy.orm import ORMExecuteState, Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Self, Callable, Generator
+
+# Quantidade mínima de registros para que a contagem estimada seja usada no lugar do COUNT(*)
+COUNT_ESTIMADO_MINIMO = int(os.environ.get("COUNT_ESTIMADO_MINIMO", 100000))
+
+# Funções chamadas sempre que um model é alterado pelos métodos do mixin.
+_write_listeners: list[Callable[[type], None]] = []
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_flush(session: Session, _) -> None:
+    # Instâncias gravadas diretamente na sessão (session.add, session.delete, relacionamentos com cascade)
+    for instancia in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instancia, _ModelCrudMixin):
+            type(instancia)._mark_written(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _registrar_dml(estado: ORMExecuteState) -> None:
+    # INSERT/UPDATE/DELETE executados pela sessão (ex.: session.execute(insert(Model), linhas))
+    if (estado.is_insert or estado.is_update or estado.is_delete) and estado.bind_mapper is not None:
+        model = estado.bind_mapper.class_
+        if issubclass(model, _ModelCrudMixin):
+            model._mark_written(estado.session)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _notificar_fim_transacao(session: Session, transacao) -> None:
+    # Os listeners (ex.: caches) são notificados apenas no fim da transação externa: o "after_commit" também é
+    # disparado ao liberar um savepoint (escritas dentro da unidade de trabalho), antes do commit de fato.
+    # Também no rollback, que pode desfazer linhas já vistas por quem usa a sessão
+    if transacao.parent is not None:
+        return
+
+    for model, notificar in session.info.pop("models_alterados", {}).items():
+        if notificar:
+            model._notify_write()
+        else:
+            # Escrita sem notificação (ex.: bulk_upsert com notify=False): o cache de consultas é sempre invalidado
+            CacheConsultas.invalidar_model(model)
+
 
 class _ModelCrudMixin:
     """
     Mixin class onde os métodos de CRUD são definidos.
     """
 
+    # Se True, a listagem sem filtros usa uma contagem estimada (count_estimate) nas tabelas grandes
+    __count_estimado__: bool = False
+    # Tempo, em segundos, que os resultados das consultas ficam em cache (CacheConsultas).
+    # None usa QUERY_CACHE_TTL_SEGUNDOS; um valor menor para as tabelas gravadas continuamente por outro processo (API)
+    __cache_ttl__: float | None = None
+
+    @staticmethod
+    def add_write_listener(listener: Callable[[type], None]) -> None:
+        """
+        Registra uma função que será chamada sempre que um registro for criado, alterado ou removido
+        pelos métodos do mixin. Útil para invalidar caches.
+        :param listener: Função que recebe a classe do model alterado.
+        """
+        if listener not in _write_listeners:
+            _write_listeners.append(listener)
+
+    @classmethod
+    def _notify_write(cls) -> None:
+        """
+        Notifica os listeners registrados de que a tabela do model foi alterada.
+        """
+        for listener in _write_listeners:
+            listener(cls)
+
+    @classmethod
+    def _mark_written(cls, session: Session, notify: bool = True) -> None:
+        """
+        Registra que a tabela do model foi alterada na sessão: os listeners são notificados no fim da transação.
+        :param notify: Se False, no fim da transação apenas o cache de consultas (CacheConsultas) da tabela é invalidado,
+        a menos que outra escrita na mesma transação notifique os listeners.
+        """
+        alterados = session.info.setdefault("models_alterados", {})
+        alterados[cls] = alterados.get(cls, False) or notify
+
+    @classmethod
+    @contextmanager
+    def _write_session(cls) -> Generator[Session, None, None]:
+        """
+        Sessão usada nas escritas do mixin.
+        Fora de uma unidade de trabalho (Database.unidade_de_trabalho) é uma sessão própria, confirmada ao final do bloco.
+        Dentro dela, a escrita é feita em um savepoint: um erro desfaz apenas esta escrita (ex.: IntegrityError tratado
+        por quem chamou) e o commit, assim como a notificação dos listeners, fica para o final da unidade.
+        """
+        session = Database.sessao_atual()
+
+        if session is None:
+            # A instância salva continua com os valores carregados depois do commit
+            session = Database.session(expire_on_commit=False)
+            try:
+                yield session
+                cls._mark_written(session)
+                session.commit()
+            finally:
+                session.close()
+            return
+
+        with session.begin_nested():
+            yield session
+
+        cls._mark_written(session)
+
     @property
     @abstractmethod
     def id(self):
         raise NotImplementedError("O atributo 'id' deve ser definido na classe herdeira.")
 
+    @classmethod
+    def _cached_query(cls, statement, consultar: Callable[[], object], *extras, copiar: Callable | None = None):
+        """
+        Executa a consulta usando o cache de resultados (CacheConsultas), com o tempo limite do model.
+        :param statement: Consulta do SQLAlchemy, que identifica o resultado junto com os extras.
+        :param consultar: Função que executa a consulta.
+        :param copiar: Função que copia o resultado, para valores mutáveis.
+        :return: Resultado da consulta.
+        """
+        return CacheConsultas.obter(
+            CacheConsultas.chave(statement, *extras),
+            CacheConsultas.tabelas(statement),
+            consultar,
+            ttl=cls.__cache_ttl__,
+            copiar=copiar,
+        )
+
+    @classmethod
+    def _cached_instances(cls, session: Session, statement: Select) -> list[Self]:
+        """
+        Consulta as colunas das instâncias usando o cache de resultados e monta uma nova instância por linha,
+        sem alterações pendentes, como se tivesse sido carregada pela consulta.
+        Dentro de uma unidade de trabalho as instâncias são ligadas à sessão e as que já estão na sessão são
+        reaproveitadas sem alteração, como em uma consulta; fora dela ficam desligadas, como as carregadas por uma
+        sessão já fechada. Com alterações pendentes (não gravadas) na sessão em alguma das tabelas, consulta sem o cache.
+        :param session: Sessão atual.
+        :param statement: select(cls) com os filtros e a ordenação.
+        :return: Lista de instâncias.
+        """
+        unidade_de_trabalho = Database.sessao_atual() is session
+
+        if unidade_de_trabalho:
+            pendentes = {type(instancia).__table__.name for instancia in (*session.new, *session.dirty, *session.deleted)}
+            if pendentes & CacheConsultas.tabelas(statement):
+                return list(session.execute(statement).scalars())
+
+        mapper = inspect(cls)
+        atributos = [(propriedade.key, propriedade.columns[0]) for propriedade in mapper.column_attrs]
+        posicoes_pk = [[coluna for _, coluna in atributos].index(coluna) for coluna in mapper.primary_key]
+        statement = statement.with_only_columns(*(coluna for _, coluna in atributos))
+
+        # As linhas são guardadas como tuplas: cada chamada recebe instâncias próprias
+        linhas = cls._cached_query(statement, lambda: [tuple(linha) for linha in session.execute(statement)])
+
+        instancias = []
+
+        for linha in linhas:
+            if unidade_de_trabalho:
+                existente = session.identity_map.get(
+                    mapper.identity_key_from_primary_key([linha[posicao] for posicao in posicoes_pk])
+                )
+                if existente is not None:
+                    instancias.append(existente)
+                    continue
+
+            instancia = mapper.class_manager.new_instance()
+            for (chave, _), valor in zip(atributos, linha):
+                set_committed_value(instancia, chave, valor)
+            make_transient_to_detached(instancia)
+
+            instancias.append(session.merge(instancia, load=False) if unidade_de_trabalho else instancia)
+
+        return instancias
+
     @classmethod
     def get_from_id(cls, id:int) -> Self:
         """
@@ -23,8 +194,14 @@ class _ModelCrudMixin:
         :param id: int - ID da instância a ser buscada.
         :return: Model - Instância encontrada ou None.
         """
-        with Database.get_session() as session:
-            return session.query(cls).filter(cls.id == id).one()
+        with Database.get_session_atual() as session:
+            instancias = cls._cached_instances(session, select(cls).where(cls.id == id))
+
+            if not instancias:
+                # Mesmo erro do Query.one()
+                return session.query(cls).filter(cls.id == id).one()
+
+            return instancias[0]
 
     @classmethod
     def all(cls) -> list[Self]:
@@ -32,9 +209,9 @@ class _ModelCrudMixin:
         Retorna todos os registros da tabela.
         :return: list[Model] - Lista de instâncias do modelo.
         """
-        with Database.get_session() as session:
+        with Database.get_session_atual() as session:
             #order by id
-            return session.query(cls).order_by(cls.id).all()
+            return cls._cached_instances(session, select(cls).order_by(cls.id))
 
     def save(self) -> Self:
         """
@@ -42,10 +219,10 @@ class _ModelCrudMixin:
         :return: Model - Instância salva.
         """
 
-        with Database.get_session() as session:
+        with type(self)._write_session() as session:
             session.add(self)
-            session.commit()
-            logging.info(f"Registro salvo com sucesso: {self.id}")
+
+        logging.info(f"Registro salvo com sucesso: {self.id}")
 
         return self
 
@@ -55,9 +232,8 @@ class _ModelCrudMixin:
         :return: Model - Instância salva.
         """
 
-        with Database.get_session() as session:
+        with type(self)._write_session() as session:
             session.merge(self)
-            session.commit()
 
         return self
 
@@ -72,8 +248,8 @@ class _ModelCrudMixin:
             if key in column_names:
                 setattr(self, key, value)
 
-        with Database.get_session() as session:
-            session.commit()
+        with type(self)._write_session():
+            pass
 
         return self
 
@@ -82,25 +258,70 @@ class _ModelCrudMixin:
         Remove a instância do banco de dados.
         :return: Model - Instância removida.
         """
-        with Database.get_session() as session:
+        with type(self)._write_session() as session:
             session.delete(self)
-            session.commit()
 
         return self
 
     @classmethod
     def count(cls, filters:list[BinaryExpression] or None = None) -> int:
         """
-        Conta o número de registros na tabela.
+        Conta o número de registros na tabela, usando o cache de resultados (CacheConsultas).
         :param filters: list[BinaryExpression] or None - Filtros a serem aplicados na contagem.
         :return: int - Número de registros.
         """
-        with Database.get_session() as session:
+        comando = select(func.count()).select_from(cls)
 
-            if filters:
-                return session.query(cls).filter(*filters).count()
+        if filters:
+            comando = comando.where(*filters)
 
-            return session.query(cls).count()
+        with Database.get_session_atual() as session:
+            return cls._cached_query(comando, lambda: session.execute(comando).scalar_one())
+
+    @classmethod
+    def _estimar_count(cls, session: Session) -> int | None:
+        """
+        Estima o número de registros sem percorrer a tabela: estatísticas do Oracle (NUM_ROWS, atualizadas pela coleta
+        de estatísticas) ou, sem elas, a faixa de ids (max - min + 1), lida nas pontas do índice da chave primária.
+        """
+        if session.get_bind().dialect.name == 'oracle':
+            num_rows = session.execute(
+                text("SELECT num_rows FROM user_tables WHERE table_name = :tabela"),
+                {"tabela": cls.__tablename__.upper()},
+            ).scalar()
+            if num_rows:
+                return int(num_rows)
+
+        # Subconsultas separadas: cada uma lê apenas uma ponta do índice
+        maior, menor = session.execute(
+            select(select(func.max(cls.id)).scalar_subquery(), select(func.min(cls.id)).scalar_subquery())
+        ).one()
+
+        if maior is None:
+            return 0
+
+        return maior - menor + 1
+
+    @classmethod
+    def count_estimate(cls, filters:list[BinaryExpression] or None = None) -> tuple[int, bool]:
+        """
+        Conta o número de registros, usando uma estimativa nas tabelas grandes sem filtros dos models com
+        __count_estimado__ = True (ex.: leituras), em que o COUNT(*) percorre a tabela inteira.
+        Com filtros, ou abaixo de COUNT_ESTIMADO_MINIMO registros, a contagem é exata.
+        :param filters: list[BinaryExpression] or None - Filtros a serem aplicados na contagem.
+        :return: tuple[int, bool] - Número de registros e se ele é uma estimativa.
+        """
+        if filters or not cls.__count_estimado__:
+            return cls.count(filters=filters), False
+
+        with Database.get_session_atual() as session:
+            # A chave é a consulta do id, diferenciada da mesma consulta feita por outros métodos
+            estimativa = cls._cached_query(select(cls.id), lambda: cls._estimar_count(session), "count_estimate")
+
+        if estimativa is None or estimativa < COUNT_ESTIMADO_MINIMO:
+            return cls.count(), False
+
+        return estimativa, True
 
     @classmethod
     def first(cls,
@@ -113,7 +334,7 @@ class _ModelCrudMixin:
         :param order_by: list[UnaryExpression] or None - Ordenação a ser aplicada na busca.
         :return: Model | None - Primeira instância encontrada ou None.
         """
-        with Database.get_session() as session:
+        with Database.get_session_atual() as session:
 
             query = session.query(cls)
 
@@ -137,26 +358,16 @@ class _ModelCrudMixin:
         :param order_by: list[UnaryExpression] or None - Ordenação a ser aplicada na busca.
         :return: Model | None - Última instância encontrada ou None.
         """
-        with Database.get_session() as session:
+        with Database.get_session_atual() as session:
 
             query = session.query(cls)
 
             if filters:
                 query = query.filter(*filters)
 
-            if order_by:
-
-                query = query.order_by(*order_by)
-
-                count = query.count()
-
-                if count == 0:
-                    return None
+            # a ordenação é invertida e o primeiro registro é retornado, sem contar a tabela nem usar OFFSET
+            ordem = inverter_ordem(normalizar_ordem(order_by or [cls.id.asc()], cls.id))
+            return query.order_by(*clausulas_ordem(ordem)).first()
 
-                return query.offset(count - 1).first()
 
-            else:
-                # se não tiver order_by, ordena pelo id
-                order_by = [cls.id.desc()]
-                query = query.order_by(*order_by)
-                return query.first()
\ No newline at end of file
+_ModelCrudMixin.add_write_listener(CacheConsultas.invalidar_model)
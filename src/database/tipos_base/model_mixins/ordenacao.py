@@ -0,0 +1,68 @@
+"""
+Funções de ordenação usadas pela paginação por cursor (keyset) dos mixins.
+Em vez de OFFSET, a próxima página é consultada a partir dos valores das colunas da ordenação da última linha
+da página anterior, usando o índice da ordenação: o custo de uma página não depende da sua posição.
+"""
+from typing import Any, Optional, List
+from sqlalchemy import ColumnElement, UnaryExpression, and_, or_
+from sqlalchemy.sql import operators
+
+# Coluna (ou expressão) da ordenação e se a ordem é decrescente
+ItemOrdem = tuple[ColumnElement, bool]
+
+
+def normalizar_ordem(order_by: Optional[List[UnaryExpression]], coluna_id: ColumnElement) -> list[ItemOrdem]:
+    """
+    Converte a ordenação em uma lista de (coluna, decrescente), terminando pelo id quando ele não faz parte da ordenação,
+    para que a ordem seja única e o cursor identifique exatamente uma linha.
+    :param order_by: Ordenação (ex.: [Model.data.desc()]). Se vazia, ordena pelo id.
+    :param coluna_id: Coluna id do model.
+    :return: Lista de (coluna, decrescente).
+    """
+    ordem: list[ItemOrdem] = []
+
+    for item in order_by or []:
+        if isinstance(item, UnaryExpression) and item.modifier in (operators.desc_op, operators.asc_op):
+            ordem.append((item.element, item.modifier is operators.desc_op))
+        else:
+            ordem.append((item, False))
+
+    coluna_id = coluna_id.expression if hasattr(coluna_id, "expression") else coluna_id
+
+    if not any(coluna.compare(coluna_id) for coluna, _ in ordem):
+        # O id acompanha a direção da primeira coluna
+        ordem.append((coluna_id, ordem[0][1] if ordem else False))
+
+    return ordem
+
+
+def inverter_ordem(ordem: list[ItemOrdem]) -> list[ItemOrdem]:
+    """
+    Inverte a direção de todas as colunas da ordenação.
+    """
+    return [(coluna, not decrescente) for coluna, decrescente in ordem]
+
+
+def clausulas_ordem(ordem: list[ItemOrdem]) -> list[UnaryExpression]:
+    """
+    Converte a ordenação normalizada nas cláusulas do ORDER BY.
+    """
+    return [coluna.desc() if decrescente else coluna.asc() for coluna, decrescente in ordem]
+
+
+def filtro_apos(ordem: list[ItemOrdem], cursor: tuple[Any, ...]) -> ColumnElement[bool]:
+    """
+    Monta a condição das linhas posteriores ao cursor na ordenação informada.
+    Equivalente a (a, b) > (:a, :b), que o Oracle não suporta, respeitando a direção de cada coluna.
+    :param ordem: Ordenação normalizada.
+    :param cursor: Valores das colunas da ordenação na última linha já retornada.
+    :return: Condição do WHERE.
+    """
+    condicoes = []
+
+    for posicao, (coluna, decrescente) in enumerate(ordem):
+        iguais = [anterior == cursor[indice] for indice, (anterior, _) in enumerate(ordem[:posicao])]
+        posterior = coluna < cursor[posicao] if decrescente else coluna > cursor[posicao]
+        condicoes.append(and_(*iguais, posterior))
+
+    return or_(*condicoes)
@@ -11,10 +11,25 @@ import pandas as pd
 from typing import List
 from src.database.tipos_base.database import Database
 from src.database.tipos_base.model_mixins.fields import _ModelFieldsMixin
+from src.database.tipos_base.model_mixins.ordenacao import clausulas_ordem, filtro_apos, inverter_ordem, normalizar_ordem
 from PIL import Image
 import base64
 
 
+def _valores_cursor(linha: pd.Series) -> tuple:
+    """
+    Converte os valores do cursor lidos pelo pandas (ex.: numpy.int64, Timestamp) para os tipos do Python.
+    """
+    valores = []
+    for valor in linha.tolist():
+        if isinstance(valor, pd.Timestamp):
+            valor = valor.to_pydatetime()
+        elif hasattr(valor, "item"):
+            valor = valor.item()
+        valores.append(valor)
+    return tuple(valores)
+
+
 class _ModelSerializationMixin(_ModelFieldsMixin):
     """
     Mixin onde os métodos de serialização são definidos.
@@ -171,10 +186,21 @@ class _ModelSerializationMixin(_ModelFieldsMixin):
                          select_fields: Optional[List[str]] = None,
                          as_display: bool = False,
                          offset: Optional[int] = None,
-                         limit: Optional[int] = None
+                         limit: Optional[int] = None,
+                         after: Optional[tuple] = None,
+                         before: Optional[tuple] = None,
+                         from_end: bool = False,
                          ) -> pd.DataFrame:
         """
         Obtém os dados da instância formatados para plotagem.
+        Além do offset, permite a paginação por cursor (keyset), com custo constante em qualquer página:
+        o cursor são os valores das colunas do order_by (seguidas do id) de uma linha, disponíveis em
+        dataframe.attrs['cursor_inicio'] e dataframe.attrs['cursor_fim'] para a primeira e a última linha retornadas.
+        :param after: Cursor: retorna as linhas posteriores a ele na ordenação (próxima página).
+        :param before: Cursor: retorna as linhas anteriores a ele na ordenação (página anterior), mantendo a ordenação.
+        :param from_end: Se True, retorna as últimas linhas da ordenação, consultando na ordem inversa. Para que a última
+        página seja a mesma obtida avançando página a página, o limit deve ser o tamanho dela (total % limit, ou limit).
+        Com limit, dataframe.attrs['tem_mais'] informa se existem mais linhas na direção consultada.
         """
 
         # faz um query com o sqlalchemy filtrando pelos filters do generic_plot e ordernando pelos order_by do generic_plot
@@ -185,12 +211,19 @@ class _ModelSerializationMixin(_ModelFieldsMixin):
             if filters is not None:
                 query = query.filter(*filters)
 
-            if order_by:
-                query = query.order_by(*order_by)
+            # o id completa a ordenação, para que o cursor identifique uma única linha
+            ordem = normalizar_ordem(order_by or [cls.id.asc()], cls.id)
 
-            else:
-                # se não tiver order_by, ordena pelo id
-                query = query.order_by(cls.id.asc())
+            # a página anterior e a última são consultadas na ordem inversa, a partir do cursor, e depois invertidas
+            reverso = before is not None or from_end
+            if reverso:
+                ordem = inverter_ordem(ordem)
+
+            cursor = before if before is not None else after
+            if cursor is not None:
+                query = query.filter(filtro_apos(ordem, cursor))
+
+            query = query.order_by(*clausulas_ordem(ordem))
 
             # limita os campos retornados
             campos_para_retornar = []
@@ -203,16 +236,39 @@ class _ModelSerializationMixin(_ModelFieldsMixin):
                         raise AttributeError(f"A classe {cls.__class__.__name__} não possui o atributo '{field}'.")
                     campos_para_retornar.append(getattr(cls, field))
 
+            colunas_cursor = [f"_cursor_{indice}" for indice in range(len(ordem))]
+
             # como vai retornar apenas o dataframe para gerar o gráfico, não precisa retornar todos os campos da tabela,
-            query = query.with_entities(*campos_para_retornar)
+            query = query.with_entities(
+                *campos_para_retornar,
+                *(coluna.label(nome) for (coluna, _), nome in zip(ordem, colunas_cursor))
+            )
 
             if offset is not None:
                 query = query.offset(offset)
 
             if limit is not None:
-                query = query.limit(limit)
+                # uma linha a mais indica se existe outra página
+                query = query.limit(limit + 1)
+
+            # o resultado da consulta fica em cache (CacheConsultas) e cada chamada recebe uma cópia
+            dataframe = cls._cached_query(
+                query.statement, lambda: pd.read_sql(query.statement, session.bind), "dataframe", copiar=pd.DataFrame.copy
+            )
+
+            tem_mais = limit is not None and len(dataframe) > limit
+            if tem_mais:
+                dataframe = dataframe.iloc[:limit]
+
+            if reverso:
+                dataframe = dataframe.iloc[::-1].reset_index(drop=True)
+
+            cursores = dataframe[colunas_cursor]
+            dataframe = dataframe.drop(columns=colunas_cursor)
 
-            dataframe = pd.read_sql(query.statement, session.bind)
+            dataframe.attrs['cursor_inicio'] = _valores_cursor(cursores.iloc[0]) if len(cursores) else None
+            dataframe.attrs['cursor_fim'] = _valores_cursor(cursores.iloc[-1]) if len(cursores) else None
+            dataframe.attrs['tem_mais'] = tem_mais
 
             if as_display:
                 colum_names = {}
@@ -1,9 +1,22 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 
 from src.logger.color_text import makeCyan, makeBlue, makeYellow, makeRed, makePink
 from src.settings import DEBUG
 
+# Quantidade máxima de mensagens aguardando a thread de escrita. Acima disso as mensagens são descartadas
+LOG_FILA_TAMANHO = int(os.environ.get("LOG_FILA_TAMANHO", 10000))
+# Mensagens por segundo do logger das leituras (uma mensagem por requisição de ingestão)
+LOG_LEITURAS_POR_SEGUNDO = float(os.environ.get("LOG_LEITURAS_POR_SEGUNDO", 10))
+
+# Logger das mensagens geradas a cada leitura recebida
+LOGGER_LEITURAS = "src.wokwi_api.leituras"
+
 LOGGER_COLORS = {
     logging.DEBUG: makeCyan,
     logging.INFO: makeBlue,
@@ -27,6 +40,109 @@ class LoggerColorFormatter(logging.Formatter):
         return super().format(record)
 
 
+class FiltroLimiteTaxa(logging.Filter):
+    """
+    Limita a quantidade de mensagens por segundo dos loggers configurados (e dos seus filhos).
+    As mensagens acima do limite são descartadas e a quantidade descartada é informada na próxima mensagem aceita.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._limites: dict[str, float] = {}
+        # Nome do logger -> [mensagens disponíveis, último instante, mensagens descartadas]
+        self._estados: dict[str, list] = {}
+        self._nomes: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def limitar(self, nome_logger: str, mensagens_por_segundo: float) -> None:
+        """
+        Define o limite de mensagens por segundo de um logger.
+        :param nome_logger: Nome do logger.
+        :param mensagens_por_segundo: Limite. Até um segundo de mensagens pode ser enviado de uma vez.
+        """
+        with self._lock:
+            self._limites[nome_logger] = mensagens_por_segundo
+            self._estados[nome_logger] = [max(1.0, mensagens_por_segundo), time.monotonic(), 0]
+            self._nomes.clear()
+
+    def _logger_limitado(self, nome: str) -> str | None:
+        # Deve ser chamado com o _lock adquirido
+        if nome not in self._nomes:
+            atual = nome
+            while atual and atual not in self._limites:
+                atual = atual.rpartition(".")[0]
+            self._nomes[nome] = atual or None
+        return self._nomes[nome]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        with self._lock:
+            nome = self._logger_limitado(record.name)
+            if nome is None:
+                return True
+
+            limite = self._limites[nome]
+            estado = self._estados[nome]
+            agora = time.monotonic()
+            estado[0] = min(max(1.0, limite), estado[0] + (agora - estado[1]) * limite)
+            estado[1] = agora
+
+            if estado[0] < 1:
+                estado[2] += 1
+                return False
+
+            estado[0] -= 1
+            descartadas, estado[2] = estado[2], 0
+
+        if descartadas:
+            record.msg = f"{record.getMessage()} ({descartadas} mensagens anteriores descartadas)"
+            record.args = None
+
+        return True
+
+
+class QueueHandlerSemBloqueio(QueueHandler):
+    """
+    Envia as mensagens para a fila da thread de escrita sem nunca bloquear quem registrou a mensagem:
+    com a fila cheia a mensagem é descartada.
+    """
+
+    def __init__(self, fila: queue.Queue):
+        super().__init__(fila)
+        self.descartadas = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartadas += 1
+
+
+_FILTRO_TAXA = FiltroLimiteTaxa()
+_FILTRO_TAXA.limitar(LOGGER_LEITURAS, LOG_LEITURAS_POR_SEGUNDO)
+
+_listener: QueueListener | None = None
+
+
+def limitar_taxa_logger(nome_logger: str, mensagens_por_segundo: float) -> None:
+    """
+    Limita as mensagens por segundo de um logger (ex.: mensagens geradas a cada leitura).
+    :param nome_logger: Nome do logger.
+    :param mensagens_por_segundo: Limite de mensagens por segundo.
+    """
+    _FILTRO_TAXA.limitar(nome_logger, mensagens_por_segundo)
+
+
+def parar_logger() -> None:
+    """
+    Escreve as mensagens pendentes na fila e para a thread de escrita.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def configurar_logger(file_name: str = 'app.log', level: int = None):
     """
     Configura o logger para o aplicativo.
@@ -45,27 +161,36 @@ def configurar_logger(file_name: str = 'app.log', level: int = None):
 
     logger.setLevel(level)
 
-    if not any(getattr(h, "name", None) == "console_handler_format" for h in logger.handlers):
+    if any(getattr(h, "name", None) == "queue_handler_format" for h in logger.handlers):
+        return
 
-        format_string = '[%(levelname)s] %(asctime)s %(filename)s: %(message)s'
+    global _listener
 
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(level)
-        console_handler.name = 'console_handler_format'
+    format_string = '[%(levelname)s] %(asctime)s %(filename)s: %(message)s'
 
-        formatter = LoggerColorFormatter(format_string)
-        console_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(level)
+    console_handler.name = 'console_handler_format'
+    console_handler.setFormatter(LoggerColorFormatter(format_string))
 
-        logger.addHandler(console_handler)
+    file_handler = logging.FileHandler(file_name)
+    file_handler.setLevel(level)
+    file_handler.setFormatter(logging.Formatter(format_string))
+    file_handler.name = 'file_handler_format'
 
+    # O console e o arquivo são escritos por uma thread em segundo plano:
+    # quem registra a mensagem (ex.: requisições de ingestão, reruns do Streamlit) apenas a coloca na fila
+    fila = queue.Queue(maxsize=LOG_FILA_TAMANHO)
 
-    if not any(getattr(h, "name", None) == "file_handler_format" for h in logger.handlers):
+    queue_handler = QueueHandlerSemBloqueio(fila)
+    queue_handler.setLevel(level)
+    queue_handler.addFilter(_FILTRO_TAXA)
+    queue_handler.name = 'queue_handler_format'
+    logger.addHandler(queue_handler)
 
-        file_handler = logging.FileHandler(file_name)
-        file_handler.setLevel(level)
-        file_handler.setFormatter(logging.Formatter(format_string))
-        file_handler.name = 'file_handler_format'
-        logger.addHandler(file_handler)
+    _listener = QueueListener(fila, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(parar_logger)
 
 if __name__ == '__main__':
     configurar_logger()
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from sqlalchemy.orm import joinedload
+from src.database.models.leitura_agregada import LeituraAgregada
 from src.database.models.sensor import LeituraSensor, Sensor
 from src.database.tipos_base.database import Database
 
@@ -73,6 +74,37 @@ def get_dataframe_leituras_sensores() -> pd.DataFrame:
 
     return df
 
+def _convert_agregadas_to_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as leituras agregadas para um DataFrame com uma linha por janela e, para cada tipo de sensor,
+    as colunas de média, mínimo, máximo e desvio padrão. Ex.: 'Temperatura (°C) - media'.
+    """
+    estatisticas = ['media', 'minimo', 'maximo', 'desvio_padrao']
+
+    df_pivot = df.pivot_table(index='data_inicio', columns='tipo_sensor', values=estatisticas, aggfunc='mean')
+    df_pivot.columns = [f"{tipo} - {estatistica}" for estatistica, tipo in df_pivot.columns]
+    df_pivot = df_pivot.ffill().bfill()
+    df_pivot = df_pivot.reset_index()
+
+    return df_pivot
+
+def get_dataframe_leituras_agregadas() -> pd.DataFrame:
+    """
+    Retorna um DataFrame com as janelas agregadas (LEITURA_AGREGADA) dos sensores, uma linha por janela.
+    :return: DataFrame com as estatísticas das janelas.
+    """
+    agregadas = LeituraAgregada.as_dataframe_all()
+
+    if agregadas.empty:
+        return agregadas
+
+    df = _convert_sensor_id_to_tipo_sensor(agregadas)
+    df = _convert_agregadas_to_dataframe(df)
+    df = _limpar_redundantes(df)
+    df = _criar_coluna_target(df)
+
+    return df
+
 
 if __name__ == '__main__':
 
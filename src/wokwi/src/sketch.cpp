@@ -34,6 +34,9 @@ const char* endpoint_api = API_URL; // URL da API
 const String init_sensor = String(endpoint_api) + "/init/";     // Endpoint de inicialização
 const String post_sensor = String(endpoint_api) + "/leitura/";  // Endpoint de envio de dados
 
+// Intervalo entre envios, atualizado pelo campo "proximo_intervalo_ms" da resposta da API
+unsigned long intervalo_envio_ms = 5000;
+
 // === FUNÇÃO DE CONEXÃO WI-FI ===
 void conectaWiFi() {
   WiFi.begin(ssid, password, canal_wifi);
@@ -61,6 +64,11 @@ int post_data(JsonDocument& doc, const String& endpoint_api) {
       Serial.println("Status code: " + String(httpCode));
       String payload = http.getString();
       Serial.println(payload);
+
+      JsonDocument resposta;
+      if (!deserializeJson(resposta, payload) && resposta["proximo_intervalo_ms"].is<unsigned long>()) {
+        intervalo_envio_ms = resposta["proximo_intervalo_ms"];
+      }
     } else {
       Serial.println("Erro na requisição");
     }
@@ -311,5 +319,5 @@ void loop() {
     }
   }
 
-  delay(5000);
+  delay(intervalo_envio_ms);
 }
@@ -0,0 +1,181 @@
+"""
+Recomenda ao dispositivo o intervalo até o próximo envio de leituras.
+O intervalo é calculado pela regra do tipo de cada sensor do serial, a partir da variação recente das leituras,
+e é aumentado quando a API está carregada (buffer e fila de admissão ocupados).
+Novas regras podem ser registradas por tipo de sensor com o decorator 'regra_amostragem'.
+"""
+import math
+import os
+import threading
+from typing import Callable
+from src.database.models.sensor import TipoSensorEnum
+from src.wokwi_api.buffer_leituras import BufferLeituras
+from src.wokwi_api.controle_admissao import ControleAdmissao
+
+AMOSTRAGEM_INTERVALO_PADRAO_MS = int(os.environ.get("AMOSTRAGEM_INTERVALO_PADRAO_MS", 5000))
+AMOSTRAGEM_INTERVALO_MIN_MS = int(os.environ.get("AMOSTRAGEM_INTERVALO_MIN_MS", 1000))
+AMOSTRAGEM_INTERVALO_MAX_MS = int(os.environ.get("AMOSTRAGEM_INTERVALO_MAX_MS", 60000))
+# Peso da leitura mais recente nas médias móveis exponenciais (rápida e lenta)
+AMOSTRAGEM_ALFA = float(os.environ.get("AMOSTRAGEM_ALFA", 0.2))
+AMOSTRAGEM_ALFA_LENTO = float(os.environ.get("AMOSTRAGEM_ALFA_LENTO", 0.02))
+# Quantas vezes o intervalo pode ser multiplicado quando a API está totalmente carregada
+AMOSTRAGEM_FATOR_CARGA_MAX = float(os.environ.get("AMOSTRAGEM_FATOR_CARGA_MAX", 4.0))
+
+# Quantidade de leituras antes de a variação ser considerada confiável
+_AMOSTRAS_MINIMAS = 5
+
+
+class EstatisticaSensor:
+    """
+    Média e variância móveis exponenciais das leituras de um sensor.
+    """
+
+    def __init__(self):
+        self.quantidade = 0
+        self.media = 0.0
+        self.variancia = 0.0
+        # Média com peso menor para a leitura recente, usada para detectar tendências
+        self.media_lenta = 0.0
+
+    def adicionar(self, valor: float) -> None:
+        if self.quantidade == 0:
+            self.media = self.media_lenta = valor
+        else:
+            diferenca = valor - self.media
+            incremento = AMOSTRAGEM_ALFA * diferenca
+            self.media += incremento
+            self.variancia = (1 - AMOSTRAGEM_ALFA) * (self.variancia + diferenca * incremento)
+            self.media_lenta += AMOSTRAGEM_ALFA_LENTO * (valor - self.media_lenta)
+
+        self.quantidade += 1
+
+    @property
+    def desvio_padrao(self) -> float:
+        """
+        Desvio padrão recente, na unidade do sensor.
+        """
+        return math.sqrt(self.variancia)
+
+    @property
+    def tendencia(self) -> float:
+        """
+        Diferença, na unidade do sensor, entre a média recente e a média de longo prazo. Positiva quando o sinal está subindo.
+        """
+        return self.media - self.media_lenta
+
+    @property
+    def coeficiente_variacao(self) -> float:
+        """
+        Desvio padrão relativo à média, comparável entre sensores de escalas diferentes.
+        Não deve ser usado em grandezas cujo zero é arbitrário (ex.: temperatura em °C): perto de zero ele tende ao infinito.
+        """
+        return self.desvio_padrao / max(abs(self.media), 1e-9)
+
+
+RegraAmostragem = Callable[[EstatisticaSensor], float]
+
+_REGRAS: dict[TipoSensorEnum, RegraAmostragem] = {}
+
+
+def regra_amostragem(tipo: TipoSensorEnum) -> Callable[[RegraAmostragem], RegraAmostragem]:
+    """
+    Registra a regra de um tipo de sensor, substituindo a anterior.
+    A regra recebe a EstatisticaSensor e retorna o intervalo recomendado em milissegundos.
+    :param tipo: Tipo do sensor.
+    """
+    def decorator(regra: RegraAmostragem) -> RegraAmostragem:
+        _REGRAS[tipo] = regra
+        return regra
+
+    return decorator
+
+
+def intervalo_por_desvio(estatistica: EstatisticaSensor, minimo_ms: float, maximo_ms: float, desvio_maximo: float) -> float:
+    """
+    Interpola o intervalo entre o máximo (sinal estável) e o mínimo (desvio padrão >= desvio_maximo).
+    :param estatistica: Estatística do sensor.
+    :param minimo_ms: Intervalo para sinais instáveis.
+    :param maximo_ms: Intervalo para sinais estáveis.
+    :param desvio_maximo: Desvio padrão, na unidade do sensor, a partir do qual o intervalo mínimo é usado.
+    :return: Intervalo em milissegundos.
+    """
+    instabilidade = min(1.0, estatistica.desvio_padrao / desvio_maximo)
+    return maximo_ms - (maximo_ms - minimo_ms) * instabilidade
+
+
+@regra_amostragem(TipoSensorEnum.LUX)
+def _regra_lux(estatistica: EstatisticaSensor) -> float:
+    # A luminosidade varia em ordens de grandeza: 20% da média, com um mínimo de 50 lux para ambientes escuros
+    return intervalo_por_desvio(estatistica, 5000, 60000, max(0.2 * abs(estatistica.media), 50.0))
+
+
+@regra_amostragem(TipoSensorEnum.TEMPERATURA)
+def _regra_temperatura(estatistica: EstatisticaSensor) -> float:
+    # Limite em °C: relativo à média, o mesmo ruído pareceria instável perto de 0 °C e estável a 80 °C
+    return intervalo_por_desvio(estatistica, 5000, 60000, 0.5)
+
+
+@regra_amostragem(TipoSensorEnum.VIBRACAO)
+def _regra_vibracao(estatistica: EstatisticaSensor) -> float:
+    # Vibração subindo indica possível falha: envia no intervalo mínimo até estabilizar.
+    # Limites absolutos, pois com o equipamento parado a vibração fica perto de zero
+    if estatistica.tendencia > 0.1:
+        return AMOSTRAGEM_INTERVALO_MIN_MS
+    return intervalo_por_desvio(estatistica, 1000, 30000, 0.15)
+
+
+class AmostragemAdaptativa:
+    """
+    Mantém a estatística das leituras de cada sensor e calcula o intervalo recomendado para cada serial.
+    """
+
+    _estatisticas: dict[int, EstatisticaSensor] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def registrar(cls, linhas: list[dict]) -> None:
+        """
+        Atualiza as estatísticas com as leituras recebidas.
+        :param linhas: Lista de dicionários com as chaves 'sensor_id' e 'valor'.
+        """
+        with cls._lock:
+            for linha in linhas:
+                estatistica = cls._estatisticas.get(linha["sensor_id"])
+                if estatistica is None:
+                    estatistica = cls._estatisticas[linha["sensor_id"]] = EstatisticaSensor()
+                estatistica.adicionar(linha["valor"])
+
+    @staticmethod
+    def fator_carga() -> float:
+        """
+        Retorna o multiplicador do intervalo pela carga da API: 1 sem carga até AMOSTRAGEM_FATOR_CARGA_MAX
+        com o buffer cheio ou todas as vagas e a fila do controle de admissão ocupadas.
+        """
+        ocupacao_buffer = BufferLeituras.tamanho() / BufferLeituras.tamanho_maximo if BufferLeituras.ativo() else 0.0
+        ocupacao_admissao = (ControleAdmissao.em_andamento + ControleAdmissao.na_fila) / \
+            (ControleAdmissao.max_em_andamento + ControleAdmissao.max_fila)
+
+        ocupacao = min(1.0, max(ocupacao_buffer, ocupacao_admissao))
+        return 1 + (AMOSTRAGEM_FATOR_CARGA_MAX - 1) * ocupacao
+
+    @classmethod
+    def proximo_intervalo_ms(cls, sensores: list[tuple[int, TipoSensorEnum]]) -> int:
+        """
+        Calcula o intervalo recomendado até o próximo envio do serial. O sensor que exige o menor intervalo define o resultado.
+        :param sensores: Lista de (sensor_id, tipo) do serial.
+        :return: Intervalo em milissegundos.
+        """
+        intervalos = []
+
+        for sensor_id, tipo in sensores:
+            estatistica = cls._estatisticas.get(sensor_id)
+            regra = _REGRAS.get(tipo)
+
+            if estatistica is None or regra is None or estatistica.quantidade < _AMOSTRAS_MINIMAS:
+                intervalos.append(AMOSTRAGEM_INTERVALO_PADRAO_MS)
+            else:
+                intervalos.append(regra(estatistica))
+
+        intervalo = min(intervalos, default=AMOSTRAGEM_INTERVALO_PADRAO_MS) * cls.fator_carga()
+
+        return int(min(AMOSTRAGEM_INTERVALO_MAX_MS, max(AMOSTRAGEM_INTERVALO_MIN_MS, intervalo)))
@@ -1,39 +1,122 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from src.settings import DEBUG
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.database_async import DatabaseAsync
+from src.database.dynamic_import import import_models
+from src.logger.config import configurar_logger
+from src.wokwi_api.buffer_leituras import BufferLeituras
+from src.wokwi_api.controle_admissao import MiddlewareAdmissao
+from src.wokwi_api.metricas import MiddlewareMetricas
+from src.wokwi_api.consultar_leituras import leituras_router
 from src.wokwi_api.init_sensor import init_router
+from src.wokwi_api.ingestao_async import init_async_router, receber_async_router
+from src.wokwi_api.receber_forma_onda import forma_onda_router
 from src.wokwi_api.receber_leitura import receber_router
+from src.wokwi_api.receber_leitura_agregada import agregada_router
+from src.wokwi_api.receber_leitura_ws import ws_router
+from src.wokwi_api.spool import Spool
+from src.wokwi_api.ultimas_leituras import UltimasLeituras
+from src.wokwi_api.status_api import metricas_router, status_router
+from src.wokwi_api.transmissao_leituras import stream_router
 import uvicorn
 import threading
+import os
+
+
+def api_async_habilitada() -> bool:
+    """
+    Retorna se a API deve usar os endpoints assíncronos (variável de ambiente API_ASYNC).
+    """
+    return os.environ.get("API_ASYNC", "false").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicia os serviços em segundo plano da API e os finaliza quando a API é encerrada.
+    """
+    if not Database.inicializado():
+        # Executando como servidor independente (ex.: workers do servidor.py), sem o dashboard.
+        # Cada worker é um processo separado, sem o logger configurado pelo processo principal
+        configurar_logger("api.log")
+        Database.init_from_env(wal=True)
+
+    # Carrega todos os models para que os relacionamentos entre eles possam ser resolvidos
+    import_models()
+
+    if api_async_habilitada() and not DatabaseAsync.inicializado():
+        # Usa o mesmo banco de dados configurado no Database
+        DatabaseAsync.init_from_engine(Database.engine)
+
+    # Carrega a leitura mais recente de cada sensor, atualizada a cada gravação
+    UltimasLeituras.iniciar()
+
+    if Spool.habilitado():
+        # Iniciado antes do buffer, que também desvia para o spool as leituras que não consegue gravar
+        Spool.iniciar()
+
+    if BufferLeituras.habilitado():
+        BufferLeituras.iniciar()
+
+    yield
+
+    # Grava as leituras que ainda estão no buffer antes de encerrar
+    BufferLeituras.parar()
+    Spool.parar()
+    UltimasLeituras.parar()
+
+    await DatabaseAsync.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+# Limita as requisições de ingestão em andamento e descarta o excesso com 503 + Retry-After
+app.add_middleware(MiddlewareAdmissao)
+# Adicionado por último para ser o mais externo e medir também as requisições descartadas pela admissão
+app.add_middleware(MiddlewareMetricas)
+
+if api_async_habilitada():
+    # As rotas assíncronas são registradas primeiro e por isso têm prioridade sobre as síncronas de mesmo caminho
+    app.include_router(init_async_router, prefix='/init')
+    app.include_router(receber_async_router, prefix='/leitura')
 
-app = FastAPI()
 app.include_router(init_router, prefix='/init')
 app.include_router(receber_router, prefix='/leitura')
+app.include_router(ws_router, prefix='/leitura')
+app.include_router(forma_onda_router, prefix='/leitura')
+app.include_router(agregada_router, prefix='/leitura')
+app.include_router(stream_router, prefix='/leitura')
+app.include_router(leituras_router, prefix='/leituras')
+app.include_router(status_router, prefix='/status')
+app.include_router(metricas_router, prefix='/metrics')
 
 def _print_routes(app):
     for route in app.routes:
         if hasattr(route, "methods"):
             print(f"{list(route.methods)} {route.path}")
 
-def iniciar_api():
+def iniciar_api(host:str = None, port:int = None):
     """
     Inicia a API
+    :param host: Endereço onde a API vai escutar. Padrão: variável de ambiente API_HOST ou 0.0.0.0.
+    :param port: Porta da API. Padrão: variável de ambiente API_PORT ou 8180.
     """
     if DEBUG:
         _print_routes(app)
-    uvicorn.run(app, host="0.0.0.0", port=8180)
+    uvicorn.run(app, host=host or os.environ.get("API_HOST", "0.0.0.0"), port=port or int(os.environ.get("API_PORT", 8180)))
 
 
 def inciar_api_thread_paralelo():
     """
     Inicia a API em uma thread separada.
     Isso permite que a API seja executada em segundo plano enquanto outras tarefas podem ser executadas
+    Para executar a API em processos independentes do dashboard, utilize o servidor.py.
     """
     api_thread = threading.Thread(target=iniciar_api, daemon=True)
     api_thread.start()
 
 if __name__ == "__main__":
-    from src.database.tipos_base.database import Database
     Database.init_sqlite('../../database.db')
 
-    uvicorn.run(app, host="0.0.0.0", port=8180)
\ No newline at end of file
+    iniciar_api()
\ No newline at end of file
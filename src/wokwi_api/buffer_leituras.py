@@ -0,0 +1,233 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from sqlalchemy.exc import SQLAlchemyError
+from src.wokwi_api.gravar_leituras import banco_indisponivel, gravar_leituras_validas
+from src.wokwi_api.metricas import contador, medidor
+from src.wokwi_api.reordenacao import JanelaReordenacao
+from src.wokwi_api.spool import gravar_com_spool
+
+_LEITURAS_PERDIDAS = contador("buffer_leituras_perdidas_total", "Leituras do buffer que não puderam ser gravadas.")
+
+# Espera máxima, em segundos, entre as tentativas de gravar um lote enquanto o banco está indisponível
+_ESPERA_MAXIMA_SEGUNDOS = 5.0
+
+
+class BufferCheioError(Exception):
+    """
+    Lançada quando o buffer de leituras não possui espaço para novas leituras.
+    """
+    pass
+
+
+class BufferLeituras:
+    """
+    Buffer em memória (write-behind) para as leituras dos sensores.
+    As requisições apenas adicionam as leituras no buffer e retornam. Uma thread em segundo plano
+    grava as leituras no banco em INSERTs de várias linhas, quando o buffer atinge 'tamanho_lote'
+    leituras ou quando 'intervalo' segundos se passam desde a última gravação.
+
+    Configurado pelas variáveis de ambiente:
+        INGESTAO_MODO: 'direto' (padrão) grava na requisição, 'buffer' usa este buffer.
+        BUFFER_TAMANHO_MAXIMO: quantidade máxima de leituras pendentes (padrão 100000).
+        BUFFER_TAMANHO_LOTE: quantidade de leituras que dispara uma gravação (padrão 1000).
+        BUFFER_INTERVALO_SEGUNDOS: tempo máximo entre gravações (padrão 1.0).
+        REORDENACAO_JANELA_SEGUNDOS: tempo que as leituras ficam retidas para serem gravadas
+            na ordem de (sensor_id, data_leitura), mesmo as que chegam atrasadas (padrão 0, apenas ordena cada lote).
+    """
+
+    tamanho_maximo: int = int(os.environ.get("BUFFER_TAMANHO_MAXIMO", 100000))
+    tamanho_lote: int = int(os.environ.get("BUFFER_TAMANHO_LOTE", 1000))
+    intervalo: float = float(os.environ.get("BUFFER_INTERVALO_SEGUNDOS", 1.0))
+    janela_reordenacao: float = float(os.environ.get("REORDENACAO_JANELA_SEGUNDOS", 0.0))
+
+    _pendentes: deque = deque()
+    # Leituras retiradas do buffer que a thread está tentando gravar
+    _gravando: int = 0
+    _janela: JanelaReordenacao | None = None
+    _condicao = threading.Condition()
+    _thread: threading.Thread | None = None
+    _parar: bool = False
+    _atexit_registrado: bool = False
+
+    @staticmethod
+    def habilitado() -> bool:
+        """
+        Retorna se o modo de ingestão configurado é o buffer.
+        """
+        return os.environ.get("INGESTAO_MODO", "direto").lower() == "buffer"
+
+    @classmethod
+    def configurar(cls,
+                   tamanho_maximo: int | None = None,
+                   tamanho_lote: int | None = None,
+                   intervalo: float | None = None,
+                   janela_reordenacao: float | None = None):
+        """
+        Altera a configuração do buffer.
+        :param tamanho_maximo: Quantidade máxima de leituras pendentes.
+        :param tamanho_lote: Quantidade de leituras que dispara uma gravação.
+        :param intervalo: Tempo máximo, em segundos, entre gravações.
+        :param janela_reordenacao: Tempo, em segundos, que as leituras ficam retidas para reordenação. Aplicado no próximo iniciar().
+        """
+        if tamanho_maximo is not None:
+            cls.tamanho_maximo = tamanho_maximo
+        if tamanho_lote is not None:
+            cls.tamanho_lote = tamanho_lote
+        if intervalo is not None:
+            cls.intervalo = intervalo
+        if janela_reordenacao is not None:
+            cls.janela_reordenacao = janela_reordenacao
+
+    @classmethod
+    def ativo(cls) -> bool:
+        """
+        Retorna se a thread de gravação está em execução.
+        """
+        return cls._thread is not None and cls._thread.is_alive()
+
+    @classmethod
+    def tamanho(cls) -> int:
+        """
+        Retorna a quantidade de leituras pendentes no buffer, incluindo as retidas na janela de reordenação.
+        """
+        return len(cls._pendentes) + cls._gravando + (len(cls._janela) if cls._janela is not None else 0)
+
+    @classmethod
+    def iniciar(cls):
+        """
+        Inicia a thread que grava as leituras do buffer no banco de dados.
+        """
+        with cls._condicao:
+            if cls.ativo():
+                return
+
+            cls._parar = False
+            cls._janela = JanelaReordenacao(cls.janela_reordenacao)
+            cls._thread = threading.Thread(target=cls._executar, name="buffer-leituras", daemon=True)
+            cls._thread.start()
+
+        if not cls._atexit_registrado:
+            # Garante que as leituras pendentes sejam gravadas quando o processo for encerrado
+            atexit.register(cls.parar)
+            cls._atexit_registrado = True
+
+        logging.info(f"Buffer de leituras iniciado (lote={cls.tamanho_lote}, intervalo={cls.intervalo}s).")
+
+    @classmethod
+    def parar(cls, timeout: float | None = 30.0):
+        """
+        Para a thread de gravação, gravando antes todas as leituras pendentes.
+        :param timeout: Tempo máximo, em segundos, para aguardar a gravação das leituras pendentes.
+        """
+        with cls._condicao:
+            if not cls.ativo():
+                return
+            cls._parar = True
+            cls._condicao.notify_all()
+
+        cls._thread.join(timeout)
+
+        if cls._thread.is_alive():
+            # Ex.: banco indisponível durante todo o tempo de espera
+            _LEITURAS_PERDIDAS.inc(cls.tamanho())
+            logging.error(f"Buffer de leituras finalizado com {cls.tamanho()} leituras não gravadas.")
+        else:
+            logging.info("Buffer de leituras finalizado.")
+
+        cls._thread = None
+
+    @classmethod
+    def adicionar(cls, linhas: list[dict]):
+        """
+        Adiciona leituras ao buffer. Todas as leituras são aceitas ou nenhuma é.
+        :param linhas: Lista de dicionários com as chaves 'sensor_id', 'data_leitura' e 'valor'.
+        :raises BufferCheioError: Se o buffer não possuir espaço para todas as leituras.
+        """
+        with cls._condicao:
+            if len(cls._pendentes) + len(linhas) > cls.tamanho_maximo:
+                raise BufferCheioError(f"Buffer de leituras cheio ({len(cls._pendentes)} pendentes).")
+
+            cls._pendentes.extend(linhas)
+
+            if len(cls._pendentes) >= cls.tamanho_lote:
+                cls._condicao.notify()
+
+    @classmethod
+    def _retirar_lote(cls) -> list[dict]:
+        quantidade = min(len(cls._pendentes), cls.tamanho_lote)
+        return [cls._pendentes.popleft() for _ in range(quantidade)]
+
+    @classmethod
+    def _executar(cls):
+        ultima_gravacao = time.monotonic()
+
+        while True:
+            with cls._condicao:
+                while not cls._parar and len(cls._pendentes) < cls.tamanho_lote:
+                    restante = cls.intervalo - (time.monotonic() - ultima_gravacao)
+                    if restante <= 0:
+                        break
+                    cls._condicao.wait(restante)
+
+                lote = cls._retirar_lote()
+                finalizar = cls._parar and not cls._pendentes
+
+            # Retém as leituras recentes e libera as demais ordenadas por (sensor_id, data_leitura)
+            cls._janela.adicionar(lote)
+            lote = cls._janela.retirar(todas=finalizar)
+
+            if lote:
+                cls._gravar(lote)
+
+            ultima_gravacao = time.monotonic()
+
+            if finalizar:
+                return
+
+    @classmethod
+    def _gravar(cls, lote: list[dict]):
+        """
+        Grava um lote do buffer. As leituras já foram confirmadas aos dispositivos, por isso não são descartadas
+        quando o banco está indisponível: o lote é tentado novamente com espera crescente, e enquanto isso o buffer
+        enche e as novas requisições recebem 429. Se o banco recusar o lote por causa dos dados, apenas as
+        leituras inválidas são descartadas.
+        """
+        espera = 0.1
+        cls._gravando = len(lote)
+
+        try:
+            while True:
+                try:
+                    # Com o spool ativo, as leituras vão para o disco se o banco estiver indisponível
+                    gravar_com_spool(lote)
+                    return
+                except SQLAlchemyError as e:
+                    if not banco_indisponivel(e):
+                        break
+                    erro = e
+                except OSError as e:
+                    # Ex.: falha ao gravar no spool em disco
+                    erro = e
+
+                logging.warning(f"Erro ao gravar {len(lote)} leituras do buffer, nova tentativa em {espera:.1f}s: {erro}")
+                time.sleep(espera)
+                espera = min(espera * 2, _ESPERA_MAXIMA_SEGUNDOS)
+
+            try:
+                _, recusadas = gravar_leituras_validas(lote)
+            except SQLAlchemyError as e:
+                # O banco ficou indisponível durante a divisão do lote
+                logging.warning(f"Erro ao gravar {len(lote)} leituras do buffer, nova tentativa: {e}")
+                return cls._gravar(lote)
+
+            if recusadas:
+                _LEITURAS_PERDIDAS.inc(len(recusadas))
+                logging.error(f"{len(recusadas)} leituras do buffer recusadas pelo banco de dados e descartadas.")
+        finally:
+            cls._gravando = 0
+
+medidor("buffer_leituras_pendentes", "Leituras aguardando gravação no buffer.", BufferLeituras.tamanho)
@@ -0,0 +1,70 @@
+from typing import Iterator
+import numpy as np
+
+
+class ColunasLeituras:
+    """
+    Leituras em colunas (arrays do NumPy), como são decodificadas do formato binário.
+    O gravar_leituras as envia ao LeituraSensor.bulk_insert como dicionário de colunas, sem passar por uma lista
+    de dicionários. Quem trabalha com linhas (buffer, spool, transmissão, últimas leituras) as percorre como a
+    lista de dicionários das rotas JSON.
+    """
+
+    def __init__(self, colunas: dict[str, np.ndarray]):
+        """
+        :param colunas: Arrays de mesmo tamanho com as chaves 'sensor_id', 'data_leitura' (datetime64) e 'valor',
+        e opcionalmente 'chave_idempotencia'.
+        """
+        self.colunas = colunas
+        self._linhas: list[dict] | None = None
+
+    def __len__(self) -> int:
+        return len(self.colunas["sensor_id"])
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return ColunasLeituras({nome: coluna[indice] for nome, coluna in self.colunas.items()})
+        return self[indice:indice + 1 or None].linhas()[0]
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.linhas())
+
+    def linhas(self) -> list[dict]:
+        """
+        Converte as colunas em uma lista de dicionários com valores nativos do Python (datetime, int, float).
+        A conversão é feita uma única vez, na primeira chamada.
+        """
+        if self._linhas is None:
+            nomes = list(self.colunas)
+            valores = [
+                coluna.astype("datetime64[us]").tolist() if coluna.dtype.kind == "M" else coluna.tolist()
+                for coluna in self.colunas.values()
+            ]
+            self._linhas = [dict(zip(nomes, linha)) for linha in zip(*valores)]
+
+        return self._linhas
+
+    def ordenadas(self) -> "ColunasLeituras":
+        """
+        Retorna as leituras ordenadas por (sensor_id, data_leitura), a ordem do índice da LEITURA_SENSOR.
+        """
+        ordem = np.lexsort((self.colunas["data_leitura"], self.colunas["sensor_id"]))
+        return ColunasLeituras({nome: coluna[ordem] for nome, coluna in self.colunas.items()})
+
+    @staticmethod
+    def concatenar(partes: list["ColunasLeituras"]) -> "ColunasLeituras":
+        """
+        Junta várias leituras em colunas, com as mesmas colunas em todas as partes.
+        """
+        if not partes:
+            return ColunasLeituras({
+                "sensor_id": np.empty(0, dtype=np.int64),
+                "data_leitura": np.empty(0, dtype="datetime64[ms]"),
+                "valor": np.empty(0, dtype=np.float64),
+            })
+
+        return ColunasLeituras({nome: np.concatenate([parte.colunas[nome] for parte in partes]) for nome in partes[0].colunas})
+
+
+# Leituras aceitas pela ingestão: lista de dicionários (rotas JSON) ou colunas (formato binário)
+Leituras = list[dict] | ColunasLeituras
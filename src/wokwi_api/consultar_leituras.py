@@ -0,0 +1,235 @@
+"""
+Endpoints de consulta das leituras gravadas, para os consumidores que hoje acessam o banco ou o dashboard diretamente.
+
+A paginação é por cursor (keyset) em (data_leitura, id): cada página continua depois da última leitura
+da página anterior, sem OFFSET, e por isso o custo de cada página não cresce com a posição.
+Nos formatos NDJSON e Arrow a resposta é enviada em streaming, página a página, sem montar objetos do ORM
+e com memória constante no servidor, independente da quantidade de leituras.
+"""
+import io
+import json
+import os
+from datetime import datetime
+from typing import Iterator, Literal
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import ColumnElement, Row, and_, or_, select
+from src.database.models.sensor import LeituraSensor, Sensor
+from src.database.tipos_base.database import Database
+from src.wokwi_api.horario_leitura import para_horario_local
+from src.wokwi_api.ultimas_leituras import UltimasLeituras
+
+# Quantidade de leituras por consulta ao banco (e por página no formato JSON)
+LEITURAS_TAMANHO_PAGINA = int(os.environ.get("LEITURAS_TAMANHO_PAGINA", 1000))
+# Quantidade máxima de leituras por página no formato JSON
+LEITURAS_LIMITE_MAXIMO = int(os.environ.get("LEITURAS_LIMITE_MAXIMO", 10000))
+
+MEDIA_TYPE_NDJSON = "application/x-ndjson"
+MEDIA_TYPE_ARROW = "application/vnd.apache.arrow.stream"
+
+Cursor = tuple[datetime, int]
+
+leituras_router = APIRouter()
+
+
+def codificar_cursor(data_leitura: datetime, leitura_id: int) -> str:
+    """
+    Monta o cursor que continua depois da leitura informada: '<data_leitura ISO>,<id>'.
+    :param data_leitura: Data da última leitura recebida.
+    :param leitura_id: Id da última leitura recebida.
+    :return: Cursor.
+    """
+    return f"{data_leitura.isoformat()},{leitura_id}"
+
+
+def decodificar_cursor(cursor: str) -> Cursor:
+    """
+    Lê um cursor gerado por codificar_cursor.
+    :param cursor: Cursor.
+    :return: (data_leitura, id)
+    :raises ValueError: Se o cursor for inválido.
+    """
+    try:
+        data_leitura, leitura_id = cursor.rsplit(",", 1)
+        return datetime.fromisoformat(data_leitura), int(leitura_id)
+    except ValueError:
+        raise ValueError(f"Cursor inválido: '{cursor}'.")
+
+
+def _consultar_pagina(filtros: list[ColumnElement[bool]], apos: Cursor | None, quantidade: int) -> list[Row]:
+    """
+    Consulta as próximas leituras na ordem (data_leitura, id), depois do cursor.
+    :param filtros: Condições do WHERE.
+    :param apos: Cursor da última leitura já retornada.
+    :param quantidade: Quantidade máxima de leituras.
+    :return: Linhas (id, sensor_id, data_leitura, valor).
+    """
+    query = select(LeituraSensor.id, LeituraSensor.sensor_id, LeituraSensor.data_leitura, LeituraSensor.valor) \
+        .where(*filtros)
+
+    if apos is not None:
+        data_leitura, leitura_id = apos
+        # Equivalente a (data_leitura, id) > (:data, :id), que o Oracle não suporta
+        query = query.where(or_(
+            LeituraSensor.data_leitura > data_leitura,
+            and_(LeituraSensor.data_leitura == data_leitura, LeituraSensor.id > leitura_id)
+        ))
+
+    query = query.order_by(LeituraSensor.data_leitura, LeituraSensor.id).limit(quantidade)
+
+    with Database.get_session() as session:
+        return session.execute(query).all()
+
+
+def _paginas(filtros: list[ColumnElement[bool]], apos: Cursor | None, limite: int | None) -> Iterator[list[Row]]:
+    """
+    Percorre as leituras em páginas de LEITURAS_TAMANHO_PAGINA, uma consulta curta por página.
+    :param filtros: Condições do WHERE.
+    :param apos: Cursor inicial.
+    :param limite: Quantidade máxima de leituras no total. None para todas.
+    """
+    restante = limite
+
+    while restante is None or restante > 0:
+        quantidade = LEITURAS_TAMANHO_PAGINA if restante is None else min(restante, LEITURAS_TAMANHO_PAGINA)
+        pagina = _consultar_pagina(filtros, apos, quantidade)
+
+        if pagina:
+            yield pagina
+
+        if len(pagina) < quantidade:
+            return
+
+        apos = (pagina[-1].data_leitura, pagina[-1].id)
+        if restante is not None:
+            restante -= len(pagina)
+
+
+def _ndjson(paginas: Iterator[list[Row]]) -> Iterator[bytes]:
+    for pagina in paginas:
+        yield "".join(
+            json.dumps({
+                "id": linha.id,
+                "sensor_id": linha.sensor_id,
+                "data_leitura": linha.data_leitura.isoformat(),
+                "valor": linha.valor,
+            }) + "\n"
+            for linha in pagina
+        ).encode("utf-8")
+
+
+class _SaidaStream(io.RawIOBase):
+    """
+    Destino do writer do Arrow que guarda os bytes até serem enviados na resposta.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._partes: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def retirar(self) -> bytes:
+        dados = b"".join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def _arrow(paginas: Iterator[list[Row]]) -> Iterator[bytes]:
+    # O pyarrow é instalado como dependência do streamlit
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("sensor_id", pa.int64()),
+        ("data_leitura", pa.timestamp("us")),
+        ("valor", pa.float64()),
+    ])
+
+    saida = _SaidaStream()
+
+    with pa.ipc.new_stream(saida, schema) as writer:
+        yield saida.retirar()
+
+        for pagina in paginas:
+            # Um record batch por página, montado direto das colunas
+            writer.write_batch(pa.record_batch(list(map(list, zip(*pagina))), schema=schema))
+            yield saida.retirar()
+
+    yield saida.retirar()
+
+
+@leituras_router.get('/')
+def consultar_leituras(sensor_id: list[int] | None = Query(None),
+                       equipamento_id: int | None = None,
+                       data_inicial: datetime | None = None,
+                       data_final: datetime | None = None,
+                       cursor: str | None = None,
+                       limite: int | None = Query(None, ge=1),
+                       formato: Literal['json', 'ndjson', 'arrow'] = 'json'):
+    """
+    Consulta as leituras dos sensores na ordem (data_leitura, id).
+    - json: uma página de até 'limite' leituras (padrão LEITURAS_TAMANHO_PAGINA) e o 'proximo_cursor' da página seguinte.
+    - ndjson / arrow: todas as leituras (ou as 'limite' primeiras) em streaming, uma leitura por linha ou um stream IPC do Apache Arrow.
+    O 'cursor' continua a consulta depois da leitura informada ('<data_leitura ISO>,<id>').
+    """
+    try:
+        apos = decodificar_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+    filtros: list[ColumnElement[bool]] = []
+
+    if sensor_id:
+        filtros.append(LeituraSensor.sensor_id.in_(sensor_id))
+    if equipamento_id is not None:
+        filtros.append(LeituraSensor.sensor_id.in_(select(Sensor.id).where(Sensor.equipamento_id == equipamento_id)))
+    if data_inicial is not None:
+        filtros.append(LeituraSensor.data_leitura >= para_horario_local(data_inicial))
+    if data_final is not None:
+        filtros.append(LeituraSensor.data_leitura <= para_horario_local(data_final))
+
+    if formato == 'ndjson':
+        return StreamingResponse(_ndjson(_paginas(filtros, apos, limite)), media_type=MEDIA_TYPE_NDJSON)
+
+    if formato == 'arrow':
+        return StreamingResponse(_arrow(_paginas(filtros, apos, limite)), media_type=MEDIA_TYPE_ARROW)
+
+    quantidade = min(limite or LEITURAS_TAMANHO_PAGINA, LEITURAS_LIMITE_MAXIMO)
+    pagina = _consultar_pagina(filtros, apos, quantidade)
+
+    return {
+        "status": "success",
+        "leituras": [
+            {"id": linha.id, "sensor_id": linha.sensor_id, "data_leitura": linha.data_leitura, "valor": linha.valor}
+            for linha in pagina
+        ],
+        "proximo_cursor": codificar_cursor(pagina[-1].data_leitura, pagina[-1].id) if len(pagina) == quantidade else None,
+    }
+
+
+@leituras_router.get('/ultimas')
+def consultar_ultimas_leituras(sensor_id: list[int] | None = Query(None), equipamento_id: int | None = None):
+    """
+    Retorna o estado atual dos sensores: a leitura mais recente de cada um, mantida em memória pela API,
+    sem consultar a LEITURA_SENSOR.
+    """
+    sensor_ids = sensor_id or None
+
+    if equipamento_id is not None:
+        with Database.get_session() as session:
+            do_equipamento = list(session.scalars(select(Sensor.id).where(Sensor.equipamento_id == equipamento_id)))
+        sensor_ids = [id_sensor for id_sensor in sensor_ids if id_sensor in do_equipamento] if sensor_ids else do_equipamento
+
+    return {
+        "status": "success",
+        "leituras": [
+            {"sensor_id": sensor, "data_leitura": data_leitura, "valor": valor}
+            for sensor, (data_leitura, valor) in sorted(UltimasLeituras.valores(sensor_ids).items())
+        ],
+    }
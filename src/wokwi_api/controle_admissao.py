@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from src.wokwi_api.metricas import medidor
+
+
+class ControleAdmissao:
+    """
+    Controle de admissão das requisições de ingestão.
+    Limita a quantidade de requisições em andamento e a quantidade de requisições aguardando na fila.
+    Quando os limites são excedidos a requisição é descartada com 503 e o cabeçalho 'Retry-After',
+    assim uma rajada de leituras degrada a API de forma controlada em vez de esgotar o threadpool.
+
+    Configurado pelas variáveis de ambiente:
+        ADMISSAO_MAX_EM_ANDAMENTO: requisições processadas ao mesmo tempo (padrão 64).
+        ADMISSAO_MAX_FILA: requisições aguardando uma vaga (padrão 256).
+        ADMISSAO_ESPERA_MAXIMA_SEGUNDOS: tempo máximo de espera na fila (padrão 2.0).
+        ADMISSAO_RETRY_AFTER_SEGUNDOS: valor do cabeçalho 'Retry-After' (padrão 1).
+    """
+
+    max_em_andamento: int = int(os.environ.get("ADMISSAO_MAX_EM_ANDAMENTO", 64))
+    max_fila: int = int(os.environ.get("ADMISSAO_MAX_FILA", 256))
+    espera_maxima: float = float(os.environ.get("ADMISSAO_ESPERA_MAXIMA_SEGUNDOS", 2.0))
+    retry_after: int = int(os.environ.get("ADMISSAO_RETRY_AFTER_SEGUNDOS", 1))
+
+    # Contadores
+    admitidas: int = 0
+    rejeitadas: int = 0
+    em_andamento: int = 0
+    na_fila: int = 0
+
+    _semaforo: asyncio.Semaphore | None = None
+    _loop: asyncio.AbstractEventLoop | None = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_semaforo(cls) -> asyncio.Semaphore:
+        # O semáforo pertence ao event loop em que foi criado
+        loop = asyncio.get_running_loop()
+        if cls._semaforo is None or cls._loop is not loop:
+            cls._semaforo = asyncio.Semaphore(cls.max_em_andamento)
+            cls._loop = loop
+        return cls._semaforo
+
+    @classmethod
+    async def admitir(cls) -> bool:
+        """
+        Aguarda uma vaga para processar a requisição.
+        :return: True se a requisição foi admitida, False se deve ser descartada.
+        """
+        semaforo = cls._get_semaforo()
+
+        if semaforo.locked():
+            if cls.na_fila >= cls.max_fila:
+                cls._rejeitar()
+                return False
+
+            cls.na_fila += 1
+            try:
+                await asyncio.wait_for(semaforo.acquire(), timeout=cls.espera_maxima)
+            except asyncio.TimeoutError:
+                cls._rejeitar()
+                return False
+            finally:
+                cls.na_fila -= 1
+        else:
+            await semaforo.acquire()
+
+        with cls._lock:
+            cls.admitidas += 1
+            cls.em_andamento += 1
+
+        return True
+
+    @classmethod
+    def liberar(cls) -> None:
+        """
+        Libera a vaga de uma requisição admitida.
+        """
+        with cls._lock:
+            cls.em_andamento -= 1
+        cls._get_semaforo().release()
+
+    @classmethod
+    def _rejeitar(cls) -> None:
+        with cls._lock:
+            cls.rejeitadas += 1
+
+        if cls.rejeitadas % 100 == 1:
+            logging.warning(f"API sobrecarregada: {cls.rejeitadas} requisições rejeitadas até agora.")
+
+    @classmethod
+    def status(cls) -> dict:
+        """
+        Retorna os contadores do controle de admissão.
+        """
+        return {
+            "admitidas": cls.admitidas,
+            "rejeitadas": cls.rejeitadas,
+            "em_andamento": cls.em_andamento,
+            "na_fila": cls.na_fila,
+            "max_em_andamento": cls.max_em_andamento,
+            "max_fila": cls.max_fila,
+        }
+
+
+class MiddlewareAdmissao:
+    """
+    Middleware ASGI que aplica o ControleAdmissao às requisições POST dos caminhos informados.
+    """
+
+    def __init__(self, app, caminhos: tuple[str, ...] = ("/leitura", "/init")):
+        self.app = app
+        self.caminhos = caminhos
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.caminhos):
+            await self.app(scope, receive, send)
+            return
+
+        if not await ControleAdmissao.admitir():
+            await self._responder_sobrecarga(send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ControleAdmissao.liberar()
+
+    @staticmethod
+    async def _responder_sobrecarga(send):
+        corpo = json.dumps({
+            "status": "error",
+            "message": "Servidor sobrecarregado, tente novamente mais tarde."
+        }).encode("utf-8")
+
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(corpo)).encode()),
+                (b"retry-after", str(ControleAdmissao.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": corpo})
+
+
+medidor("admissao_requisicoes_admitidas_total", "Requisições de ingestão admitidas.",
+        lambda: ControleAdmissao.admitidas, tipo="counter")
+medidor("admissao_requisicoes_rejeitadas_total", "Requisições de ingestão rejeitadas com 503.",
+        lambda: ControleAdmissao.rejeitadas, tipo="counter")
+medidor("admissao_em_andamento", "Requisições de ingestão em processamento.", lambda: ControleAdmissao.em_andamento)
+medidor("admissao_na_fila", "Requisições de ingestão aguardando uma vaga.", lambda: ControleAdmissao.na_fila)
@@ -0,0 +1,213 @@
+"""
+Formato binário compacto para o envio de leituras, alternativo ao JSON do LeituraRequest.
+
+Layout (little-endian), content-type 'application/x-leitura':
+
+    versão              uint8       (atualmente 2)
+    blocos, até o fim do payload:
+        tamanho_serial  uint8
+        serial          tamanho_serial bytes (utf-8)
+        inicio          int64       horário da primeira leitura em milissegundos desde 1970 (0 = horário do servidor)
+        intervalo       uint32      milissegundos entre uma leitura e a seguinte
+        seq             int64       número de sequência da primeira leitura, +1 a cada leitura (-1 = sem número de sequência)
+        quantidade      uint32
+        valores         quantidade * 3 float32: [lux, temperatura, vibracao_media] por leitura (NaN = ausente)
+
+Cada leitura ocupa 12 bytes, contra ~150 bytes do JSON, e os valores são decodificados
+de uma só vez com o NumPy, direto em arrays por coluna. O horário e o número de sequência de cada leitura
+são calculados a partir do início do bloco: inicio + i * intervalo e seq + i.
+A versão 1, sem inicio, intervalo e seq no cabeçalho do bloco, continua aceita (leituras com o horário do servidor).
+
+Formas de onda do acelerômetro, content-type 'application/x-forma-onda':
+
+    versão              uint8       (atualmente 1)
+    janelas, até o fim do payload:
+        tamanho_serial  uint8
+        serial          tamanho_serial bytes (utf-8)
+        eixo            1 byte ascii ('X', 'Y', 'Z' ou 'M' para o módulo)
+        taxa            float32     amostras por segundo
+        inicio          int64       horário da primeira amostra em milissegundos desde 1970 (0 = horário do servidor)
+        quantidade      uint32
+        amostras        quantidade * float32
+"""
+import struct
+from dataclasses import dataclass
+import numpy as np
+from src.database.models.sensor import TipoSensorEnum
+
+MEDIA_TYPE = "application/x-leitura"
+MEDIA_TYPE_FORMA_ONDA = "application/x-forma-onda"
+# Versão do formato das formas de onda e das leituras
+VERSAO = 1
+VERSAO_LEITURAS = 2
+
+# Posição de cada tipo de sensor nos formatos compactos (binário e frames do WebSocket)
+ORDEM_VALORES: tuple[TipoSensorEnum, ...] = (TipoSensorEnum.LUX, TipoSensorEnum.TEMPERATURA, TipoSensorEnum.VIBRACAO)
+VALORES_POR_LEITURA = len(ORDEM_VALORES)
+
+_DTYPE_VALORES = np.dtype('<f4')
+_CABECALHO_BLOCO_V1 = struct.Struct('<I')
+_CABECALHO_BLOCO = struct.Struct('<qIqI')
+_CABECALHO_JANELA = struct.Struct('<cfqI')
+
+
+class FormatoBinarioError(ValueError):
+    """
+    Lançada quando o payload binário não segue o layout esperado.
+    """
+    pass
+
+
+def _ler_serial(payload: bytes, posicao: int, tamanho_cabecalho: int) -> tuple[str, int]:
+    # Lê o serial de um bloco e verifica se o cabeçalho que vem depois dele está completo
+    tamanho_serial = payload[posicao]
+    posicao += 1
+
+    if posicao + tamanho_serial + tamanho_cabecalho > len(payload):
+        raise FormatoBinarioError("Payload truncado no cabeçalho do bloco.")
+
+    try:
+        serial = payload[posicao:posicao + tamanho_serial].decode('utf-8')
+    except UnicodeDecodeError:
+        raise FormatoBinarioError("Serial não está em utf-8.")
+
+    return serial, posicao + tamanho_serial
+
+
+@dataclass(frozen=True)
+class BlocoLeituras:
+    serial: str
+    # Milissegundos desde 1970 ou 0 para usar o horário do servidor
+    inicio_ms: int
+    intervalo_ms: int
+    # Número de sequência da primeira leitura ou -1 se o dispositivo não numera as leituras
+    seq: int
+    # Array float32 de formato (quantidade, 3)
+    valores: np.ndarray
+
+
+def decodificar_leituras(payload: bytes) -> list[BlocoLeituras]:
+    """
+    Decodifica um payload binário.
+    :param payload: Bytes recebidos.
+    :return: Lista dos blocos, com os valores em arrays float32 de formato (quantidade, 3) criados sobre o payload (sem cópia).
+    :raises FormatoBinarioError: Se o payload for inválido ou de uma versão não suportada.
+    """
+    if not payload:
+        raise FormatoBinarioError("Payload vazio.")
+
+    if payload[0] not in (1, VERSAO_LEITURAS):
+        raise FormatoBinarioError(f"Versão {payload[0]} do formato binário não suportada.")
+
+    cabecalho = _CABECALHO_BLOCO if payload[0] == VERSAO_LEITURAS else _CABECALHO_BLOCO_V1
+
+    blocos: list[BlocoLeituras] = []
+    posicao = 1
+
+    while posicao < len(payload):
+        serial, posicao = _ler_serial(payload, posicao, cabecalho.size)
+
+        if cabecalho is _CABECALHO_BLOCO:
+            inicio_ms, intervalo_ms, seq, quantidade = cabecalho.unpack_from(payload, posicao)
+        else:
+            inicio_ms, intervalo_ms, seq = 0, 0, -1
+            quantidade, = cabecalho.unpack_from(payload, posicao)
+        posicao += cabecalho.size
+
+        total_valores = quantidade * VALORES_POR_LEITURA
+        if posicao + total_valores * _DTYPE_VALORES.itemsize > len(payload):
+            raise FormatoBinarioError(f"Payload truncado nas leituras do serial '{serial}'.")
+
+        valores = np.frombuffer(payload, dtype=_DTYPE_VALORES, count=total_valores, offset=posicao)
+        blocos.append(BlocoLeituras(serial, inicio_ms, intervalo_ms, seq, valores.reshape(quantidade, VALORES_POR_LEITURA)))
+        posicao += total_valores * _DTYPE_VALORES.itemsize
+
+    return blocos
+
+
+def codificar_leituras(blocos: list[BlocoLeituras]) -> bytes:
+    """
+    Codifica leituras no formato binário (usado por clientes e simuladores).
+    :param blocos: Blocos a serem codificados. Os valores têm formato (quantidade, 3). Use NaN para valores ausentes.
+    :return: Payload binário.
+    """
+    partes = [bytes([VERSAO_LEITURAS])]
+
+    for bloco in blocos:
+        serial_bytes = bloco.serial.encode('utf-8')
+        if len(serial_bytes) > 255:
+            raise FormatoBinarioError(f"Serial '{bloco.serial}' excede 255 bytes.")
+
+        valores = np.asarray(bloco.valores, dtype=_DTYPE_VALORES).reshape(-1, VALORES_POR_LEITURA)
+
+        partes.append(bytes([len(serial_bytes)]))
+        partes.append(serial_bytes)
+        partes.append(_CABECALHO_BLOCO.pack(bloco.inicio_ms, bloco.intervalo_ms, bloco.seq, len(valores)))
+        partes.append(valores.tobytes())
+
+    return b''.join(partes)
+
+
+@dataclass(frozen=True)
+class JanelaFormaOnda:
+    serial: str
+    eixo: str
+    taxa_amostragem: float
+    # Milissegundos desde 1970 ou 0 para usar o horário do servidor
+    inicio_ms: int
+    amostras: np.ndarray
+
+
+def decodificar_formas_onda(payload: bytes) -> list[JanelaFormaOnda]:
+    """
+    Decodifica um payload binário de formas de onda.
+    :param payload: Bytes recebidos.
+    :return: Lista das janelas, com as amostras em arrays float32 criados sobre o payload (sem cópia).
+    :raises FormatoBinarioError: Se o payload for inválido ou de uma versão não suportada.
+    """
+    if not payload:
+        raise FormatoBinarioError("Payload vazio.")
+
+    if payload[0] != VERSAO:
+        raise FormatoBinarioError(f"Versão {payload[0]} do formato binário não suportada.")
+
+    janelas: list[JanelaFormaOnda] = []
+    posicao = 1
+
+    while posicao < len(payload):
+        serial, posicao = _ler_serial(payload, posicao, _CABECALHO_JANELA.size)
+
+        eixo, taxa, inicio_ms, quantidade = _CABECALHO_JANELA.unpack_from(payload, posicao)
+        posicao += _CABECALHO_JANELA.size
+
+        if posicao + quantidade * _DTYPE_VALORES.itemsize > len(payload):
+            raise FormatoBinarioError(f"Payload truncado nas amostras do serial '{serial}'.")
+
+        amostras = np.frombuffer(payload, dtype=_DTYPE_VALORES, count=quantidade, offset=posicao)
+        janelas.append(JanelaFormaOnda(serial, eixo.decode('ascii', errors='replace'), taxa, inicio_ms, amostras))
+        posicao += quantidade * _DTYPE_VALORES.itemsize
+
+    return janelas
+
+
+def codificar_formas_onda(janelas: list[JanelaFormaOnda]) -> bytes:
+    """
+    Codifica janelas de forma de onda no formato binário (usado por clientes e simuladores).
+    :param janelas: Janelas a serem codificadas.
+    :return: Payload binário.
+    """
+    partes = [bytes([VERSAO])]
+
+    for janela in janelas:
+        serial_bytes = janela.serial.encode('utf-8')
+        if len(serial_bytes) > 255:
+            raise FormatoBinarioError(f"Serial '{janela.serial}' excede 255 bytes.")
+
+        amostras = np.asarray(janela.amostras, dtype=_DTYPE_VALORES).ravel()
+
+        partes.append(bytes([len(serial_bytes)]))
+        partes.append(serial_bytes)
+        partes.append(_CABECALHO_JANELA.pack(janela.eixo.encode('ascii'), janela.taxa_amostragem, janela.inicio_ms, len(amostras)))
+        partes.append(amostras.tobytes())
+
+    return b''.join(partes)
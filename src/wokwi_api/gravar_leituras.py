@@ -0,0 +1,115 @@
+import logging
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.database_async import DatabaseAsync
+from src.database.models.sensor import LeituraSensor
+from src.wokwi_api.colunas_leituras import ColunasLeituras, Leituras
+from src.wokwi_api.metricas import DURACAO_CHECKOUT, DURACAO_COMMIT, LEITURAS_GRAVADAS, TAXA_LEITURAS_GRAVADAS
+from src.wokwi_api.reordenacao import ordenar_leituras
+from src.wokwi_api.ultimas_leituras import UltimasLeituras
+
+def banco_indisponivel(erro: SQLAlchemyError) -> bool:
+    """
+    Retorna se o erro é de conexão ou de bloqueio, que deve ser tentado novamente (ao contrário de dados inválidos).
+    """
+    return isinstance(erro, (OperationalError, InterfaceError)) or \
+        (isinstance(erro, DBAPIError) and erro.connection_invalidated)
+
+
+def _inserir_leituras(session: Session, linhas: Leituras) -> int:
+    # Leituras em colunas são inseridas direto dos arrays (dicionário de colunas do bulk_insert).
+    # Ignora as linhas com chave_idempotencia já gravada (leituras reenviadas) e retorna a quantidade inserida
+    dados = linhas.colunas if isinstance(linhas, ColunasLeituras) else linhas
+    return LeituraSensor.bulk_insert(dados, chunk_size=len(linhas), ignore_conflicts_on=['chave_idempotencia'], session=session)
+
+
+def _registrar_gravacao(linhas: Leituras, inseridas: int) -> None:
+    LEITURAS_GRAVADAS.inc(inseridas)
+    TAXA_LEITURAS_GRAVADAS.registrar(inseridas)
+
+    if inseridas == len(linhas):
+        UltimasLeituras.registrar(linhas)
+    elif inseridas:
+        # O INSERT não informa quais reenvios foram ignorados: apenas as leituras sem chave_idempotencia,
+        # que não podem ter sido ignoradas, atualizam o mapa. As demais são vistas na próxima leitura do sensor
+        UltimasLeituras.registrar([linha for linha in linhas if linha.get("chave_idempotencia") is None])
+
+
+def gravar_leituras(linhas: Leituras) -> int:
+    """
+    Grava um conjunto de leituras na tabela LEITURA_SENSOR com um único INSERT em lote (LeituraSensor.bulk_insert),
+    dentro de uma única transação.
+    :param linhas: Lista de dicionários com as chaves 'sensor_id', 'data_leitura' e 'valor', ou leituras em colunas.
+    :return: Quantidade de leituras gravadas, sem os reenvios ignorados pelo índice único da chave_idempotencia.
+    """
+
+    if not linhas:
+        return 0
+
+    # Mantém a tabela gravada na ordem do índice (sensor_id, data_leitura)
+    linhas = ordenar_leituras(linhas)
+
+    # A espera pelo bloqueio de outro worker no SQLite fica com o busy_timeout da conexão (Database.init_sqlite).
+    # Se ele se esgotar, o erro é repassado: o buffer e o spool tentam novamente com espera crescente
+    with Database.get_session() as session:
+        # Obtém a conexão antes do INSERT para medir a espera pelo pool separadamente
+        with DURACAO_CHECKOUT.medir():
+            session.connection()
+
+        with DURACAO_COMMIT.medir():
+            inseridas = _inserir_leituras(session, linhas)
+            session.commit()
+
+    _registrar_gravacao(linhas, inseridas)
+    return inseridas
+
+
+def gravar_leituras_validas(linhas: Leituras) -> tuple[int, list[dict]]:
+    """
+    Grava as leituras como o gravar_leituras, mas, se o banco recusar o lote por causa dos dados
+    (ex.: IntegrityError de uma leitura de um sensor removido), divide o lote ao meio e grava cada metade,
+    recusando apenas as leituras inválidas em vez do lote inteiro.
+    :param linhas: Lista de dicionários com as chaves 'sensor_id', 'data_leitura' e 'valor', ou leituras em colunas.
+    :return: (quantidade de leituras gravadas, leituras recusadas pelo banco)
+    :raises SQLAlchemyError: Se o banco estiver indisponível (banco_indisponivel).
+    """
+    try:
+        return gravar_leituras(linhas), []
+    except SQLAlchemyError as e:
+        if banco_indisponivel(e):
+            raise
+
+        if len(linhas) == 1:
+            logging.warning(f"Leitura recusada pelo banco de dados: {linhas[0]} ({e.__class__.__name__})")
+            return 0, list(linhas)
+
+    meio = len(linhas) // 2
+    gravadas_inicio, recusadas_inicio = gravar_leituras_validas(linhas[:meio])
+    gravadas_fim, recusadas_fim = gravar_leituras_validas(linhas[meio:])
+
+    return gravadas_inicio + gravadas_fim, recusadas_inicio + recusadas_fim
+
+
+async def gravar_leituras_async(linhas: Leituras) -> int:
+    """
+    Versão assíncrona do gravar_leituras, usando o DatabaseAsync.
+    :param linhas: Lista de dicionários com as chaves 'sensor_id', 'data_leitura' e 'valor', ou leituras em colunas.
+    :return: Quantidade de leituras gravadas, sem os reenvios ignorados.
+    """
+
+    if not linhas:
+        return 0
+
+    linhas = ordenar_leituras(linhas)
+
+    async with DatabaseAsync.get_session() as session:
+        with DURACAO_CHECKOUT.medir():
+            await session.connection()
+
+        with DURACAO_COMMIT.medir():
+            inseridas = await session.run_sync(_inserir_leituras, linhas)
+            await session.commit()
+
+    _registrar_gravacao(linhas, inseridas)
+    return inseridas
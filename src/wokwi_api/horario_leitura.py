@@ -0,0 +1,28 @@
+import os
+from datetime import datetime, timedelta
+
+# Quanto o horário enviado pelo dispositivo pode estar à frente do horário do servidor (relógio adiantado)
+LEITURA_TOLERANCIA_FUTURO = timedelta(seconds=float(os.environ.get("LEITURA_TOLERANCIA_FUTURO_SEGUNDOS", 60)))
+
+
+def para_horario_local(data: datetime | None) -> datetime | None:
+    """
+    Converte um horário com fuso para o horário local do servidor, sem fuso, como são gravadas as datas (ex.: datetime.now()).
+    :param data: Horário recebido.
+    :return: Horário local sem fuso.
+    """
+    if data is not None and data.tzinfo is not None:
+        return data.astimezone().replace(tzinfo=None)
+    return data
+
+
+def data_do_timestamp_ms(timestamp_ms: int) -> datetime | None:
+    """
+    Converte um horário em milissegundos desde 1970, enviado nos formatos binários, para o horário local sem fuso.
+    :param timestamp_ms: Milissegundos desde 1970.
+    :return: Horário local ou None se estiver fora do intervalo suportado pelo datetime (ex.: 2**62).
+    """
+    try:
+        return datetime.fromtimestamp(timestamp_ms / 1000)
+    except (OverflowError, OSError, ValueError):
+        return None
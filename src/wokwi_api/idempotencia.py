@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class ChavesRecentes:
+    """
+    Chaves de idempotência das leituras recebidas recentemente, em memória e com tamanho limitado.
+    Uma leitura reenviada pelo dispositivo (ex.: após um timeout) é descartada aqui sem nenhuma consulta ao banco.
+    Cada chave vale por IDEMPOTENCIA_JANELA_SEGUNDOS: depois disso o mesmo seq volta a ser aceito, como após
+    o reinício do dispositivo. Quando a chave é permanente (ver chave_permanente) e já saiu da memória, ou foi
+    recebida por outro worker, o índice único da coluna LEITURA_SENSOR.chave_idempotencia descarta a leitura no INSERT.
+
+    Configurado pelas variáveis de ambiente:
+        IDEMPOTENCIA_MAX_CHAVES: quantidade de chaves mantidas em memória (padrão 100000).
+        IDEMPOTENCIA_JANELA_SEGUNDOS: tempo em que um reenvio da mesma chave é descartado (padrão 600).
+    """
+
+    max_chaves: int = int(os.environ.get("IDEMPOTENCIA_MAX_CHAVES", 100000))
+    janela: float = float(os.environ.get("IDEMPOTENCIA_JANELA_SEGUNDOS", 600))
+
+    # Chave -> momento do registro (time.monotonic), na ordem de registro
+    _chaves: OrderedDict[str, float] = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def registrar(cls, serial: str, chave: str) -> bool:
+        """
+        Registra a chave de uma leitura.
+        :param serial: Serial do dispositivo.
+        :param chave: Chave de idempotência da leitura (ver chave_leitura).
+        :return: True se a chave é nova, False se a leitura é duplicada.
+        """
+        chave = f"{serial}|{chave}"
+        agora = time.monotonic()
+
+        with cls._lock:
+            registrada = cls._chaves.get(chave)
+
+            if registrada is not None and agora - registrada < cls.janela:
+                return False
+
+            # Reinsere no fim, mantendo a ordem de registro usada para expirar as chaves antigas
+            cls._chaves.pop(chave, None)
+            cls._chaves[chave] = agora
+
+            while cls._chaves and (len(cls._chaves) > cls.max_chaves or agora - next(iter(cls._chaves.values())) >= cls.janela):
+                cls._chaves.popitem(last=False)
+
+        return True
+
+    @classmethod
+    def remover(cls, chaves: list[tuple[str, str]]) -> None:
+        """
+        Remove chaves registradas cujas leituras não foram aceitas, para que o reenvio seja aceito.
+        :param chaves: Lista de (serial, chave) a serem removidas.
+        """
+        with cls._lock:
+            for serial, chave in chaves:
+                cls._chaves.pop(f"{serial}|{chave}", None)
+
+    @classmethod
+    @contextmanager
+    def desfazer_em_erro(cls, chaves: list[tuple[str, str]]):
+        """
+        Remove as chaves informadas se o bloco 'with' lançar uma exceção (ex.: buffer cheio ou erro no banco).
+        :param chaves: Lista de (serial, chave) registradas para as leituras do bloco.
+        """
+        try:
+            yield
+        except BaseException:
+            cls.remover(chaves)
+            raise
+
+    @classmethod
+    def limpar(cls) -> None:
+        """
+        Remove todas as chaves da memória.
+        """
+        with cls._lock:
+            cls._chaves.clear()
+
+
+def chave_leitura(seq: int | None, data_leitura, boot: int | None = None) -> str | None:
+    """
+    Monta a chave de idempotência de uma leitura a partir do número de sequência ou, na falta dele, do horário do dispositivo.
+    O seq recomeça quando o dispositivo reinicia, por isso ele só identifica a leitura junto com o identificador
+    da inicialização (boot) ou com o horário do dispositivo. Sem nenhum dos dois, a chave apenas descarta
+    os reenvios recebidos dentro da janela do ChavesRecentes e não é gravada no banco (ver chave_permanente).
+    :param seq: Número de sequência enviado pelo dispositivo.
+    :param data_leitura: Horário da leitura enviado pelo dispositivo.
+    :param boot: Identificador da inicialização do dispositivo (ex.: número aleatório sorteado ao ligar).
+    :return: Chave da leitura ou None se o dispositivo não enviou o seq nem o horário.
+    """
+    if seq is not None:
+        if boot is not None:
+            return f"b{boot}:s{seq}"
+
+        if data_leitura is not None:
+            return f"t{data_leitura.isoformat()}:s{seq}"
+
+        return f"s{seq}"
+
+    if data_leitura is not None:
+        return f"t{data_leitura.isoformat()}"
+
+    return None
+
+
+def chave_permanente(chave: str | None) -> bool:
+    """
+    Retorna se a chave identifica a leitura mesmo após o reinício do dispositivo e pode ser gravada
+    na coluna única LEITURA_SENSOR.chave_idempotencia. As chaves apenas com o seq não podem.
+    :param chave: Chave retornada por chave_leitura.
+    """
+    return chave is not None and not chave.startswith("s")
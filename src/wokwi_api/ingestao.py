@@ -0,0 +1,66 @@
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from src.wokwi_api.buffer_leituras import BufferLeituras, BufferCheioError
+from src.wokwi_api.colunas_leituras import Leituras
+from src.wokwi_api.gravar_leituras import gravar_leituras_async
+from src.wokwi_api.spool import Spool, gravar_com_spool
+from src.wokwi_api.transmissao_leituras import TransmissaoLeituras
+
+
+def aceitar_leituras(linhas: Leituras) -> int:
+    """
+    Aceita leituras já validadas. Se o buffer estiver ativo, apenas as adiciona no buffer,
+    caso contrário grava diretamente no banco de dados (ou no spool em disco, se o banco estiver indisponível).
+    As leituras aceitas são transmitidas aos inscritos do /leitura/stream.
+    :param linhas: Lista de dicionários com as chaves 'sensor_id', 'data_leitura' e 'valor', ou leituras em colunas
+    (formato binário), gravadas sem a conversão para dicionários quando o buffer não está ativo.
+    :return: Quantidade de leituras aceitas.
+    :raises BufferCheioError: Se o buffer não possuir espaço para as leituras.
+    """
+    if not linhas:
+        return 0
+
+    if BufferLeituras.ativo():
+        BufferLeituras.adicionar(linhas)
+        aceitas = len(linhas)
+    else:
+        aceitas = gravar_com_spool(linhas)
+
+    TransmissaoLeituras.publicar(linhas)
+    return aceitas
+
+
+async def aceitar_leituras_async(linhas: Leituras) -> int:
+    """
+    Versão assíncrona do aceitar_leituras.
+    :param linhas: Lista de dicionários com as chaves 'sensor_id', 'data_leitura' e 'valor', ou leituras em colunas.
+    :return: Quantidade de leituras aceitas.
+    :raises BufferCheioError: Se o buffer não possuir espaço para as leituras.
+    """
+    if not linhas:
+        return 0
+
+    if BufferLeituras.ativo():
+        BufferLeituras.adicionar(linhas)
+        aceitas = len(linhas)
+    elif Spool.ativo():
+        # O spool grava em arquivos com fsync, fora do event loop
+        aceitas = await run_in_threadpool(gravar_com_spool, linhas)
+    else:
+        aceitas = await gravar_leituras_async(linhas)
+
+    TransmissaoLeituras.publicar(linhas)
+    return aceitas
+
+
+def resposta_buffer_cheio(erro: BufferCheioError) -> JSONResponse:
+    """
+    Resposta enviada quando o buffer está cheio. O dispositivo deve reenviar após o tempo do 'Retry-After'.
+    :param erro: Erro lançado pelo buffer.
+    :return: Resposta HTTP 429.
+    """
+    return JSONResponse(
+        status_code=429,
+        content={"status": "error", "message": str(erro)},
+        headers={"Retry-After": str(max(1, round(BufferLeituras.intervalo)))},
+    )
@@ -0,0 +1,74 @@
+from datetime import datetime
+from fastapi import APIRouter
+from src.database.tipos_base.database_async import DatabaseAsync
+from src.wokwi_api.amostragem_adaptativa import AmostragemAdaptativa
+from src.wokwi_api.buffer_leituras import BufferCheioError
+from src.wokwi_api.idempotencia import ChavesRecentes, chave_leitura
+from src.wokwi_api.ingestao import aceitar_leituras_async, resposta_buffer_cheio
+from src.wokwi_api.init_sensor import InitSensorRequest, provisionar_sensores
+from src.wokwi_api.receber_leitura import LeituraRequest, linhas_da_leitura
+from src.wokwi_api.receber_leitura_binaria import RotaLeitura
+from src.wokwi_api.rota_sensores import RotaSensores
+
+# Versões 'async def' dos endpoints de ingestão. Elas não ocupam uma thread do threadpool
+# enquanto aguardam o banco de dados, permitindo manter milhares de conexões simultâneas em um único worker.
+init_async_router = APIRouter()
+receber_async_router = APIRouter(route_class=RotaLeitura)
+
+
+@init_async_router.post('/')
+async def init_sensor_async(request: InitSensorRequest):
+    """
+    Cadastra o Sensor na base de dados (versão assíncrona do init_sensor).
+    """
+
+    async with DatabaseAsync.get_session() as session:
+        # Executa o cadastro em lote (mesmas consultas do init_sensor) na conexão assíncrona
+        await session.run_sync(provisionar_sensores, [request.serial])
+
+    return {
+        "status": "success",
+        "message": "Sensor cadastrado com sucesso."
+    }
+
+
+@receber_async_router.post("/")
+async def receber_leitura_async(request: LeituraRequest):
+    """
+    Recebe uma leitura (versão assíncrona do receber_leitura).
+    """
+
+    now = datetime.now()
+
+    sensores = (await RotaSensores.get_varios_async({request.serial})).get(request.serial)
+
+    if not sensores:
+        return {
+            "status": "error",
+            "message": f"Sensor com serial '{request.serial}' não encontrado."
+        }
+
+    chave = chave_leitura(request.seq, request.data_leitura, request.boot)
+
+    if chave is not None and not ChavesRecentes.registrar(request.serial, chave):
+        return {
+            "status": "success",
+            "message": "Leitura já recebida anteriormente.",
+            "proximo_intervalo_ms": AmostragemAdaptativa.proximo_intervalo_ms(sensores),
+        }
+
+    linhas = linhas_da_leitura(request, sensores, now)
+
+    try:
+        with ChavesRecentes.desfazer_em_erro([(request.serial, chave)] if chave else []):
+            await aceitar_leituras_async(linhas)
+    except BufferCheioError as e:
+        return resposta_buffer_cheio(e)
+
+    AmostragemAdaptativa.registrar(linhas)
+
+    return {
+        "status": "success",
+        "message": "Leitura recebida com sucesso",
+        "proximo_intervalo_ms": AmostragemAdaptativa.proximo_intervalo_ms(sensores),
+    }
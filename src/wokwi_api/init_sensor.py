@@ -1,6 +1,8 @@
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
 from src.database.models.sensor import Sensor, TipoSensor, TipoSensorEnum
 from src.database.tipos_base.database import Database
+from src.wokwi_api.rota_sensores import RotaSensor, RotaSensores, buscar_sensores_por_serial
 from fastapi import APIRouter
 
 init_router = APIRouter()
@@ -9,47 +11,88 @@ init_router = APIRouter()
 class InitSensorRequest(BaseModel):
     serial: str
 
-@init_router.post('/')
-def init_sensor(request:InitSensorRequest):
+
+class InitSensorLoteRequest(BaseModel):
+    seriais: list[str]
+
+
+def resolver_tipos_sensor(session: Session) -> dict[TipoSensorEnum, int]:
     """
-    Cadastra o Sensor na base de dados
+    Retorna o id do TipoSensor de cada TipoSensorEnum, cadastrando os que ainda não existem.
+    Faz uma única consulta quando todos os tipos já estão cadastrados.
+    :param session: Sessão do banco de dados.
+    :return: Dicionário com o tipo como chave e o id do TipoSensor como valor.
     """
+    def consultar() -> dict[TipoSensorEnum, int]:
+        return {TipoSensorEnum(tipo): tipo_id for tipo_id, tipo in session.query(TipoSensor.id, TipoSensor.tipo)}
 
-    with Database.get_session() as session:
+    tipos = consultar()
+    faltantes = [tipo for tipo in TipoSensorEnum if tipo not in tipos]
 
-        for tipo in TipoSensorEnum:
-            # Verifica se o tipo de sensor já existe
-            tipo_sensor = session.query(TipoSensor).filter(
-                TipoSensor.tipo == tipo.value
-            ).first()
+    if faltantes:
+        TipoSensor.bulk_insert(
+            [{"tipo": tipo, "nome": str(tipo)} for tipo in faltantes], ignore_conflicts_on=['nome'], session=session
+        )
+        tipos = consultar()
 
-            if not tipo_sensor:
-                # Cria o tipo de sensor se não existir
-                tipo_sensor = TipoSensor(tipo=tipo.value, nome=str(tipo))
-                session.add(tipo_sensor)
-                session.commit()
+    return tipos
 
 
-            old_sensor = session.query(Sensor).filter(
-                Sensor.cod_serial == request.serial,
-                Sensor.tipo_sensor_id == tipo_sensor.id
-            ).first()
+def provisionar_sensores(session: Session, seriais: list[str]) -> tuple[dict[str, list[RotaSensor]], int]:
+    """
+    Cadastra um sensor de cada tipo para cada serial, em lote e de forma idempotente:
+    os tipos são resolvidos em uma consulta, os sensores existentes em uma consulta por bloco de seriais
+    e os faltantes inseridos em um único comando (Sensor.bulk_upsert: INSERT ... ON CONFLICT no SQLite, MERGE no Oracle).
+    Atualiza a tabela de roteamento com os sensores dos seriais.
+    :param session: Sessão do banco de dados.
+    :param seriais: Seriais dos dispositivos.
+    :return: (sensores de cada serial como (sensor_id, tipo), quantidade de sensores inseridos)
+    """
+    seriais = list(dict.fromkeys(seriais))
+    tipos = resolver_tipos_sensor(session)
+    rotas = buscar_sensores_por_serial(session, set(seriais))
+
+    novos: list[dict] = []
+
+    for serial in seriais:
+        existentes = {tipo for _, tipo in rotas.get(serial, [])}
 
-            if old_sensor:
-                # Se já existir um sensor com o mesmo serial e tipo, retorna uma mensagem
+        for tipo in TipoSensorEnum:
+            if tipo in existentes:
                 continue
 
-            # Cria o novo sensor com o tipo encontrado ou criado
-            new_sensor = Sensor(
-                nome=f"Sensor {tipo.value} - {request.serial}",
-                cod_serial=request.serial,
-                tipo_sensor_id=tipo_sensor.id,
-                descricao="Sensor cadastrado via API",
-            )
+            novos.append({
+                "nome": f"Sensor {tipo.value} - {serial}",
+                "cod_serial": serial,
+                "tipo_sensor_id": tipos[tipo],
+                "descricao": "Sensor cadastrado via API",
+            })
+
+    if novos:
+        # Os sensores que já existem (mesmo serial e tipo) são mantidos.
+        # Sem notificar os listeners: a tabela de roteamento é atualizada abaixo, em vez de ser invalidada.
+        # O cache de consultas do SENSOR é invalidado no commit mesmo assim
+        Sensor.bulk_upsert(
+            novos, keys=['cod_serial', 'tipo_sensor_id'], update_columns=[], session=session, notify=False
+        )
+        rotas.update(buscar_sensores_por_serial(session, {sensor["cod_serial"] for sensor in novos}))
+
+    session.commit()
+
+    # Atualiza a tabela de roteamento para que as próximas leituras não precisem consultar o banco
+    RotaSensores.atualizar_varios({serial: rotas.get(serial, []) for serial in seriais})
 
-            session.add(new_sensor)
+    return rotas, len(novos)
 
-        session.commit()
+
+@init_router.post('/')
+def init_sensor(request:InitSensorRequest):
+    """
+    Cadastra o Sensor na base de dados
+    """
+
+    with Database.get_session() as session:
+        provisionar_sensores(session, [request.serial])
 
     return {
         "status": "success",
@@ -57,3 +100,18 @@ def init_sensor(request:InitSensorRequest):
     }
 
 
+@init_router.post('/lote')
+def init_sensor_lote(request: InitSensorLoteRequest):
+    """
+    Cadastra os sensores de vários seriais de uma vez (ex.: implantação de uma nova planta).
+    Os seriais já cadastrados são mantidos, por isso o lote pode ser reenviado.
+    """
+
+    with Database.get_session() as session:
+        rotas, criados = provisionar_sensores(session, request.seriais)
+
+    return {
+        "status": "success",
+        "message": f"{len(rotas)} seriais cadastrados.",
+        "sensores_criados": criados,
+    }
@@ -0,0 +1,241 @@
+"""
+Métricas da API no formato texto do Prometheus, sem dependências externas.
+As métricas são por processo: no servidor com vários workers, cada scrape retorna as métricas do worker que o atendeu.
+"""
+import bisect
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+# Limites (em segundos) padrão dos histogramas de latência
+BUCKETS_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _formatar_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    texto = ",".join(f'{nome}="{str(valor)}"' for nome, valor in labels)
+    return "{" + texto + "}"
+
+
+def _formatar_valor(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Metrica:
+    tipo = "untyped"
+
+    def __init__(self, nome: str, descricao: str):
+        self.nome = nome
+        self.descricao = descricao
+        self._lock = threading.Lock()
+
+    def exportar(self) -> list[str]:
+        return [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} {self.tipo}", *self._amostras()]
+
+    def _amostras(self) -> list[str]:
+        raise NotImplementedError()
+
+
+class Contador(_Metrica):
+    """
+    Valor que apenas cresce (ex.: total de requisições).
+    """
+    tipo = "counter"
+
+    def __init__(self, nome: str, descricao: str):
+        super().__init__(nome, descricao)
+        self._valores: dict[tuple, float] = {}
+
+    def inc(self, valor: float = 1, **labels) -> None:
+        chave = tuple(sorted(labels.items()))
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def valor(self, **labels) -> float:
+        return self._valores.get(tuple(sorted(labels.items())), 0)
+
+    def _amostras(self) -> list[str]:
+        return [f"{self.nome}{_formatar_labels(chave)} {_formatar_valor(valor)}" for chave, valor in list(self._valores.items())]
+
+
+class Medidor(_Metrica):
+    """
+    Valor que pode subir e descer (ex.: tamanho de uma fila). O valor é obtido da função informada no momento do scrape.
+    Use tipo='counter' para exportar contadores mantidos por outras classes.
+    """
+    tipo = "gauge"
+
+    def __init__(self, nome: str, descricao: str, funcao: Callable[[], float], tipo: str = "gauge"):
+        super().__init__(nome, descricao)
+        self.funcao = funcao
+        self.tipo = tipo
+
+    def _amostras(self) -> list[str]:
+        return [f"{self.nome} {_formatar_valor(self.funcao())}"]
+
+
+class Histograma(_Metrica):
+    """
+    Distribuição de valores (ex.: latências) em buckets cumulativos.
+    """
+    tipo = "histogram"
+
+    def __init__(self, nome: str, descricao: str, buckets: tuple[float, ...] = BUCKETS_LATENCIA):
+        super().__init__(nome, descricao)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [contagem por bucket..., soma, total]
+        self._valores: dict[tuple, list[float]] = {}
+
+    def observar(self, valor: float, **labels) -> None:
+        chave = tuple(sorted(labels.items()))
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            dados = self._valores.get(chave)
+            if dados is None:
+                dados = self._valores[chave] = [0] * (len(self.buckets) + 2)
+            if indice < len(self.buckets):
+                dados[indice] += 1
+            dados[-2] += valor
+            dados[-1] += 1
+
+    def medir(self, **labels) -> "_Cronometro":
+        """
+        Mede o tempo de um bloco 'with' e o registra no histograma.
+        """
+        return _Cronometro(self, labels)
+
+    def _amostras(self) -> list[str]:
+        linhas = []
+        for chave, dados in list(self._valores.items()):
+            acumulado = 0
+            for limite, quantidade in zip(self.buckets, dados):
+                acumulado += quantidade
+                linhas.append(f"{self.nome}_bucket{_formatar_labels(chave + (('le', _formatar_valor(limite)),))} {acumulado}")
+            linhas.append(f"{self.nome}_bucket{_formatar_labels(chave + (('le', '+Inf'),))} {int(dados[-1])}")
+            linhas.append(f"{self.nome}_sum{_formatar_labels(chave)} {_formatar_valor(dados[-2])}")
+            linhas.append(f"{self.nome}_count{_formatar_labels(chave)} {int(dados[-1])}")
+        return linhas
+
+
+class _Cronometro:
+
+    def __init__(self, histograma: Histograma, labels: dict):
+        self.histograma = histograma
+        self.labels = labels
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.histograma.observar(time.perf_counter() - self.inicio, **self.labels)
+
+
+class TaxaPorSegundo:
+    """
+    Calcula a taxa por segundo de um evento em uma janela deslizante.
+    """
+
+    def __init__(self, janela_segundos: float = 60.0):
+        self.janela = janela_segundos
+        self._eventos: deque[tuple[float, float]] = deque()
+        self._lock = threading.Lock()
+
+    def registrar(self, quantidade: float = 1) -> None:
+        agora = time.monotonic()
+        with self._lock:
+            self._eventos.append((agora, quantidade))
+            self._descartar_antigos(agora)
+
+    def taxa(self) -> float:
+        agora = time.monotonic()
+        with self._lock:
+            self._descartar_antigos(agora)
+            return sum(quantidade for _, quantidade in self._eventos) / self.janela
+
+    def _descartar_antigos(self, agora: float) -> None:
+        while self._eventos and self._eventos[0][0] < agora - self.janela:
+            self._eventos.popleft()
+
+
+class RegistroMetricas:
+    """
+    Conjunto das métricas exportadas pelo endpoint /metrics.
+    """
+
+    def __init__(self):
+        self._metricas: dict[str, _Metrica] = {}
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        # Registrar novamente a mesma métrica (ex.: reimportação de módulo) retorna a já existente
+        return self._metricas.setdefault(metrica.nome, metrica)
+
+    def exportar(self) -> str:
+        linhas = []
+        for metrica in list(self._metricas.values()):
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+REGISTRO = RegistroMetricas()
+
+
+def contador(nome: str, descricao: str) -> Contador:
+    return REGISTRO.registrar(Contador(nome, descricao))
+
+
+def histograma(nome: str, descricao: str, buckets: tuple[float, ...] = BUCKETS_LATENCIA) -> Histograma:
+    return REGISTRO.registrar(Histograma(nome, descricao, buckets))
+
+
+def medidor(nome: str, descricao: str, funcao: Callable[[], float], tipo: str = "gauge") -> Medidor:
+    return REGISTRO.registrar(Medidor(nome, descricao, funcao, tipo))
+
+
+# Métricas compartilhadas pelos módulos da API
+REQUISICOES = contador("api_requisicoes_total", "Total de requisições HTTP por rota, método e status.")
+DURACAO_REQUISICAO = histograma("api_requisicao_duracao_segundos", "Latência das requisições HTTP por rota e método.")
+
+LEITURAS_GRAVADAS = contador("leituras_gravadas_total", "Total de leituras gravadas na LEITURA_SENSOR.")
+TAXA_LEITURAS_GRAVADAS = TaxaPorSegundo()
+medidor("leituras_gravadas_por_segundo", "Leituras gravadas por segundo (média do último minuto).", TAXA_LEITURAS_GRAVADAS.taxa)
+
+DURACAO_COMMIT = histograma("db_commit_duracao_segundos", "Latência do INSERT + COMMIT das leituras.")
+DURACAO_CHECKOUT = histograma("db_pool_checkout_duracao_segundos", "Tempo de espera para obter uma conexão do pool.")
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que registra a quantidade e a latência das requisições HTTP por rota.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status_code = 500
+
+        async def send_com_status(mensagem):
+            nonlocal status_code
+            if mensagem["type"] == "http.response.start":
+                status_code = mensagem["status"]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, send_com_status)
+        finally:
+            # Usa o caminho declarado na rota (ex.: /leitura/) para não criar uma série por URL
+            rota = getattr(scope.get("route"), "path", None) or "nao_encontrada"
+            DURACAO_REQUISICAO.observar(time.perf_counter() - inicio, rota=rota, metodo=scope["method"])
+            REQUISICOES.inc(rota=rota, metodo=scope["method"], status=str(status_code))
@@ -0,0 +1,162 @@
+import os
+from datetime import datetime
+import numpy as np
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, field_validator
+from sqlalchemy import insert
+from starlette.concurrency import run_in_threadpool
+from src.database.models.forma_onda import EixoFormaOndaEnum, FormaOndaSensor
+from src.database.models.sensor import TipoSensorEnum
+from src.database.tipos_base.database import Database
+from src.wokwi_api.formato_binario import MEDIA_TYPE_FORMA_ONDA, FormatoBinarioError, JanelaFormaOnda, decodificar_formas_onda
+from src.wokwi_api.metricas import contador
+from src.wokwi_api.horario_leitura import LEITURA_TOLERANCIA_FUTURO, data_do_timestamp_ms, para_horario_local
+from src.wokwi_api.rota_binaria import rota_com_formato_binario
+from src.wokwi_api.rota_sensores import RotaSensores
+
+# Limite de amostras por janela (10 s a 10 kHz)
+FORMA_ONDA_MAX_AMOSTRAS = int(os.environ.get("FORMA_ONDA_MAX_AMOSTRAS", 100000))
+
+_EIXOS = {eixo.value for eixo in EixoFormaOndaEnum}
+
+_AMOSTRAS_GRAVADAS = contador("formas_onda_amostras_total", "Amostras de forma de onda gravadas na FORMA_ONDA_SENSOR.")
+
+
+class FormaOndaRequest(BaseModel):
+    serial: str
+    eixo: EixoFormaOndaEnum
+    taxa_amostragem: float
+    amostras: list[float]
+    # Horário da primeira amostra. Se ausente, é usado o horário do servidor
+    data_inicio: datetime | None = None
+
+    @field_validator('data_inicio')
+    @classmethod
+    def _data_inicio_local(cls, data_inicio: datetime | None) -> datetime | None:
+        return para_horario_local(data_inicio)
+
+
+def _data_inicio(inicio_ms: int, now: datetime) -> datetime | None:
+    """
+    Converte o horário de início enviado pelo dispositivo.
+    :param inicio_ms: Milissegundos desde 1970 ou 0 para usar o horário do servidor.
+    :param now: Horário do servidor no recebimento.
+    :return: Horário da primeira amostra (o do servidor se estiver no futuro) ou None se estiver fora do intervalo do datetime.
+    """
+    if not inicio_ms:
+        return now
+
+    data_inicio = data_do_timestamp_ms(inicio_ms)
+
+    if data_inicio is None:
+        return None
+
+    return now if data_inicio > now + LEITURA_TOLERANCIA_FUTURO else data_inicio
+
+
+def gravar_formas_onda(janelas: list[JanelaFormaOnda]) -> list[dict]:
+    """
+    Grava as janelas de forma de onda, cada uma em uma linha da FORMA_ONDA_SENSOR, em um único INSERT em lote.
+    As amostras são associadas ao sensor de vibração do serial.
+    :param janelas: Janelas recebidas.
+    :return: Resultado de cada janela.
+    """
+    now = datetime.now()
+    sensores = RotaSensores.get_varios({janela.serial for janela in janelas})
+
+    linhas: list[dict] = []
+    resultados: list[dict] = []
+
+    for indice, janela in enumerate(janelas):
+        resultado = {"indice": indice, "serial": janela.serial}
+        resultados.append(resultado)
+
+        sensor_id = next((sensor_id for sensor_id, tipo in sensores.get(janela.serial, []) if tipo == TipoSensorEnum.VIBRACAO), None)
+
+        if sensor_id is None:
+            erro = f"Sensor de vibração com serial '{janela.serial}' não encontrado."
+        elif janela.eixo not in _EIXOS:
+            erro = f"Eixo '{janela.eixo}' inválido."
+        elif not janela.taxa_amostragem > 0:
+            erro = "A taxa de amostragem deve ser maior que zero."
+        elif not 0 < len(janela.amostras) <= FORMA_ONDA_MAX_AMOSTRAS:
+            erro = f"A janela deve ter entre 1 e {FORMA_ONDA_MAX_AMOSTRAS} amostras."
+        else:
+            erro = None
+
+        data_inicio = _data_inicio(janela.inicio_ms, now)
+
+        if erro is None and data_inicio is None:
+            erro = f"Horário de início {janela.inicio_ms} ms fora do intervalo suportado."
+
+        if erro is not None:
+            resultado.update({"status": "error", "message": erro})
+            continue
+
+        linhas.append({
+            "sensor_id": sensor_id,
+            "eixo": EixoFormaOndaEnum(janela.eixo),
+            "data_inicio": data_inicio,
+            "taxa_amostragem": float(janela.taxa_amostragem),
+            "quantidade_amostras": len(janela.amostras),
+            "dados": FormaOndaSensor.comprimir(janela.amostras),
+        })
+        resultado.update({"status": "success", "amostras": len(janela.amostras)})
+
+    if linhas:
+        with Database.get_session() as session:
+            session.execute(insert(FormaOndaSensor), linhas)
+            session.commit()
+
+        _AMOSTRAS_GRAVADAS.inc(sum(linha["quantidade_amostras"] for linha in linhas))
+
+    return resultados
+
+
+def _resposta(resultados: list[dict]) -> dict:
+    sucessos = sum(1 for r in resultados if r["status"] == "success")
+
+    return {
+        "status": "success" if sucessos == len(resultados) else ("error" if sucessos == 0 else "partial"),
+        "message": f"{sucessos} janelas recebidas.",
+        "resultados": resultados,
+    }
+
+
+async def receber_forma_onda_binaria(request: Request) -> Response:
+    """
+    Recebe uma ou mais janelas no formato binário 'application/x-forma-onda' (ver formato_binario.py).
+    """
+    try:
+        janelas = decodificar_formas_onda(await request.body())
+    except FormatoBinarioError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+    resultados = await run_in_threadpool(gravar_formas_onda, janelas)
+    return JSONResponse(content=_resposta(resultados))
+
+
+# Rota que, além do JSON, aceita o content-type binário 'application/x-forma-onda' no mesmo endpoint
+RotaFormaOnda = rota_com_formato_binario(MEDIA_TYPE_FORMA_ONDA, receber_forma_onda_binaria)
+
+forma_onda_router = APIRouter(route_class=RotaFormaOnda)
+
+
+@forma_onda_router.post("/forma_onda")
+def receber_forma_onda(request: FormaOndaRequest):
+    """
+    Recebe uma janela de amostras do acelerômetro (1 a 10 kHz) de um eixo, gravada em uma única linha.
+    Para janelas grandes prefira o formato binário, que evita a conversão das amostras de/para JSON.
+    """
+    inicio_ms = int(request.data_inicio.timestamp() * 1000) if request.data_inicio else 0
+
+    janela = JanelaFormaOnda(
+        serial=request.serial,
+        eixo=request.eixo.value,
+        taxa_amostragem=request.taxa_amostragem,
+        inicio_ms=inicio_ms,
+        amostras=np.asarray(request.amostras, dtype=np.float32),
+    )
+
+    return _resposta(gravar_formas_onda([janela]))
@@ -1,10 +1,22 @@
-from pydantic import BaseModel
-from src.database.tipos_base.database import Database
-from src.database.models.sensor import Sensor, TipoSensor, TipoSensorEnum, LeituraSensor
+from pydantic import BaseModel, ValidationError, field_validator
+from src.database.models.sensor import TipoSensorEnum
+from src.wokwi_api.amostragem_adaptativa import AmostragemAdaptativa
+from src.wokwi_api.buffer_leituras import BufferCheioError
+from src.wokwi_api.horario_leitura import LEITURA_TOLERANCIA_FUTURO, para_horario_local
+from src.wokwi_api.idempotencia import ChavesRecentes, chave_leitura, chave_permanente
+from src.wokwi_api.ingestao import aceitar_leituras, resposta_buffer_cheio
+from src.wokwi_api.receber_leitura_binaria import RotaLeitura
+from src.wokwi_api.rota_sensores import RotaSensor, RotaSensores
 from datetime import datetime
 from fastapi import APIRouter
+from src.logger.config import LOGGER_LEITURAS
+import logging
 
-receber_router = APIRouter()
+# A RotaLeitura permite que os endpoints também recebam o formato binário 'application/x-leitura'
+receber_router = APIRouter(route_class=RotaLeitura)
+
+# Mensagens geradas a cada leitura, com a quantidade por segundo limitada (LOG_LEITURAS_POR_SEGUNDO)
+logger_leituras = logging.getLogger(LOGGER_LEITURAS)
 
 
 class LeituraRequest(BaseModel):
@@ -15,61 +27,198 @@ class LeituraRequest(BaseModel):
     acelerometro_x: float or None # não utilizado
     acelerometro_y: float or None # não utilizado
     acelerometro_z: float or None # não utilizado
+    # Opcionais, enviados pelo dispositivo para que os reenvios da mesma leitura sejam descartados
+    seq: int | None = None
+    data_leitura: datetime | None = None
+    # Identificador da inicialização do dispositivo (ex.: número aleatório sorteado ao ligar), o seq recomeça a cada uma
+    boot: int | None = None
+
+    @field_validator('data_leitura')
+    @classmethod
+    def _data_leitura_local(cls, data_leitura: datetime | None) -> datetime | None:
+        return para_horario_local(data_leitura)
+
+
+class LeituraLoteRequest(BaseModel):
+    # Os itens são validados individualmente para que um item inválido não rejeite o lote inteiro
+    leituras: list[dict]
+
+
+def valor_por_tipo(request: LeituraRequest, tipo: TipoSensorEnum) -> float | None:
+    """
+    Retorna o valor da leitura correspondente ao tipo do sensor.
+    :param request: Leitura recebida.
+    :param tipo: Tipo do sensor.
+    :return: Valor da leitura ou None se a leitura não possuir valor para o tipo.
+    """
+    match tipo:
+        case TipoSensorEnum.LUX:
+            return request.lux
+        case TipoSensorEnum.TEMPERATURA:
+            return request.temperatura
+        case TipoSensorEnum.VIBRACAO:
+            return request.vibracao_media
+
+    return None
+
+
+def data_da_leitura(leitura: LeituraRequest, now: datetime) -> datetime:
+    """
+    Retorna o horário da leitura: o enviado pelo dispositivo ou, se ausente ou no futuro, o horário do servidor.
+    :param leitura: Leitura recebida.
+    :param now: Horário do servidor no recebimento.
+    :return: Horário a ser gravado.
+    """
+    if leitura.data_leitura is None or leitura.data_leitura > now + LEITURA_TOLERANCIA_FUTURO:
+        return now
+    return leitura.data_leitura
+
+
+def linhas_da_leitura(leitura: LeituraRequest, sensores: list[RotaSensor], now: datetime) -> list[dict]:
+    """
+    Monta as linhas da LEITURA_SENSOR de uma leitura, uma por sensor do serial.
+    :param leitura: Leitura recebida.
+    :param sensores: Lista de (sensor_id, tipo) do serial.
+    :param now: Horário do servidor, usado quando o dispositivo não envia o horário da leitura.
+    :return: Lista de linhas.
+    """
+    chave = chave_leitura(leitura.seq, leitura.data_leitura, leitura.boot)
+    data_leitura = data_da_leitura(leitura, now)
+
+    linhas: list[dict] = []
+
+    for sensor_id, tipo in sensores:
+        valor = valor_por_tipo(leitura, tipo)
+
+        if valor is None:
+            continue
+
+        linha = {"sensor_id": sensor_id, "data_leitura": data_leitura, "valor": valor}
+
+        if chave_permanente(chave):
+            linha["chave_idempotencia"] = f"{sensor_id}|{chave}"
+
+        linhas.append(linha)
+
+    return linhas
 
 
 @receber_router.post("/")
 def receber_leitura(request: LeituraRequest):
 
-    print(f"Recebendo leitura para o sensor com serial: {request.serial}", request)
+    logger_leituras.debug("Recebendo leitura para o sensor com serial: %s", request.serial)
 
     now = datetime.now()
 
-    with Database.get_session() as session:
-        sensores = session.query(Sensor).filter(Sensor.cod_serial == request.serial).filter().all()
+    sensores = RotaSensores.get(request.serial)
 
-        if not sensores:
-            return {
-                "status": "error",
-                "message": f"Sensor com serial '{request.serial}' não encontrado."
-            }
-
-        for sensor in sensores:
-
-            tipo = session.query(TipoSensor).filter(TipoSensor.id == sensor.tipo_sensor_id).first()
-
-            if not tipo:
-                return {
-                    "status": "error",
-                    "message": f"Tipo de sensor para o sensor com serial '{request.serial}' não encontrado."
-                }
-
-            if tipo.tipo == TipoSensorEnum.LUX and request.lux is not None:
-                nova_leitura = LeituraSensor(
-                    sensor_id=sensor.id,
-                    data_leitura=now,
-                    valor= request.lux
-                )
-            elif tipo.tipo == TipoSensorEnum.TEMPERATURA and request.temperatura is not None:
-                nova_leitura = LeituraSensor(
-                    sensor_id=sensor.id,
-                    data_leitura=now,
-                    valor=request.temperatura
-                )
-            elif tipo.tipo == TipoSensorEnum.VIBRACAO and request.vibracao_media is not None:
-                nova_leitura = LeituraSensor(
-                    sensor_id=sensor.id,
-                    data_leitura=now,
-                    valor=request.vibracao_media
-                )
-            else:
-                continue
-            session.add(nova_leitura)
-            print('Nova leitura salva:', nova_leitura)
+    if not sensores:
+        return {
+            "status": "error",
+            "message": f"Sensor com serial '{request.serial}' não encontrado."
+        }
+
+    chave = chave_leitura(request.seq, request.data_leitura, request.boot)
+
+    if chave is not None and not ChavesRecentes.registrar(request.serial, chave):
+        return {
+            "status": "success",
+            "message": "Leitura já recebida anteriormente.",
+            "proximo_intervalo_ms": AmostragemAdaptativa.proximo_intervalo_ms(sensores),
+        }
+
+    linhas = linhas_da_leitura(request, sensores, now)
 
-        session.commit()
+    try:
+        with ChavesRecentes.desfazer_em_erro([(request.serial, chave)] if chave else []):
+            aceitar_leituras(linhas)
+    except BufferCheioError as e:
+        return resposta_buffer_cheio(e)
 
+    AmostragemAdaptativa.registrar(linhas)
+
+    logger_leituras.debug("Novas leituras recebidas: %s", linhas)
 
     return {
         "status": "success",
         "message": "Leitura recebida com sucesso",
+        # Intervalo recomendado até o próximo envio, pela variação recente das leituras e pela carga da API
+        "proximo_intervalo_ms": AmostragemAdaptativa.proximo_intervalo_ms(sensores),
+    }
+
+
+@receber_router.post("/lote")
+def receber_leitura_lote(request: LeituraLoteRequest):
+    """
+    Recebe um lote de leituras de um ou mais seriais e grava todas em um único INSERT em lote
+    (ou adiciona todas no buffer, se ele estiver ativo).
+    Cada item recebe o seu próprio status, assim um item inválido não rejeita o lote inteiro.
+    """
+
+    now = datetime.now()
+
+    resultados: list[dict] = []
+    validas: list[tuple[int, LeituraRequest]] = []
+
+    for indice, item in enumerate(request.leituras):
+        try:
+            validas.append((indice, LeituraRequest.model_validate(item)))
+            resultados.append({"indice": indice, "status": "success"})
+        except ValidationError as e:
+            erros = "; ".join(f"{'.'.join(map(str, erro['loc']))}: {erro['msg']}" for erro in e.errors())
+            resultados.append({
+                "indice": indice,
+                "status": "error",
+                "message": f"Leitura inválida: {erros}"
+            })
+
+    linhas: list[dict] = []
+    chaves: list[tuple[str, str]] = []
+
+    sensores = RotaSensores.get_varios({leitura.serial for _, leitura in validas})
+
+    for indice, leitura in validas:
+
+        resultado = resultados[indice]
+        resultado["serial"] = leitura.serial
+
+        if leitura.serial not in sensores:
+            resultado["status"] = "error"
+            resultado["message"] = f"Sensor com serial '{leitura.serial}' não encontrado."
+            continue
+
+        chave = chave_leitura(leitura.seq, leitura.data_leitura, leitura.boot)
+
+        if chave is not None:
+            if not ChavesRecentes.registrar(leitura.serial, chave):
+                # Leitura reenviada (no mesmo lote ou em uma requisição anterior)
+                resultado["duplicada"] = True
+                resultado["leituras"] = 0
+                continue
+
+            chaves.append((leitura.serial, chave))
+
+        linhas_leitura = linhas_da_leitura(leitura, sensores[leitura.serial], now)
+        linhas.extend(linhas_leitura)
+        resultado["leituras"] = len(linhas_leitura)
+
+    try:
+        with ChavesRecentes.desfazer_em_erro(chaves):
+            gravadas = aceitar_leituras(linhas)
+    except BufferCheioError as e:
+        return resposta_buffer_cheio(e)
+
+    sucessos = sum(1 for r in resultados if r["status"] == "success")
+
+    if sucessos == len(resultados):
+        status = "success"
+    elif sucessos == 0:
+        status = "error"
+    else:
+        status = "partial"
+
+    return {
+        "status": status,
+        "message": f"{gravadas} leituras recebidas.",
+        "resultados": resultados,
     }
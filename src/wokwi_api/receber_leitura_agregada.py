@@ -0,0 +1,109 @@
+from datetime import datetime
+from fastapi import APIRouter
+from pydantic import BaseModel, field_validator, model_validator
+from src.database.models.leitura_agregada import LeituraAgregada
+from src.database.models.sensor import TipoSensorEnum
+from src.database.tipos_base.database import Database
+from src.wokwi_api.horario_leitura import LEITURA_TOLERANCIA_FUTURO, para_horario_local
+from src.wokwi_api.metricas import contador
+from src.wokwi_api.rota_sensores import RotaSensores
+
+agregada_router = APIRouter()
+
+_JANELAS_GRAVADAS = contador("leituras_agregadas_total", "Janelas agregadas gravadas na LEITURA_AGREGADA.")
+_LEITURAS_RESUMIDAS = contador("leituras_agregadas_resumidas_total", "Leituras representadas pelas janelas agregadas gravadas.")
+
+
+class AgregadoRequest(BaseModel):
+    # Valor do TipoSensorEnum: 'L' (lux), 'T' (temperatura) ou 'V' (vibração)
+    tipo: TipoSensorEnum
+    quantidade: int
+    minimo: float
+    maximo: float
+    media: float
+    desvio_padrao: float
+
+    @model_validator(mode='after')
+    def _validar_estatisticas(self):
+        if self.quantidade <= 0:
+            raise ValueError("A quantidade de leituras deve ser maior que zero.")
+        if not self.minimo <= self.media <= self.maximo:
+            raise ValueError("A média deve estar entre o mínimo e o máximo.")
+        if self.desvio_padrao < 0:
+            raise ValueError("O desvio padrão não pode ser negativo.")
+        return self
+
+
+class LeituraAgregadaRequest(BaseModel):
+    serial: str
+    data_inicio: datetime
+    data_fim: datetime
+    agregados: list[AgregadoRequest]
+
+    @field_validator('data_inicio', 'data_fim')
+    @classmethod
+    def _data_local(cls, data: datetime) -> datetime:
+        return para_horario_local(data)
+
+    @model_validator(mode='after')
+    def _validar_janela(self):
+        if self.data_fim < self.data_inicio:
+            raise ValueError("O fim da janela deve ser posterior ao início.")
+        if self.data_fim > datetime.now() + LEITURA_TOLERANCIA_FUTURO:
+            raise ValueError("O fim da janela está no futuro.")
+        return self
+
+
+@agregada_router.post("/agregada")
+def receber_leitura_agregada(request: LeituraAgregadaRequest):
+    """
+    Recebe as estatísticas (mínimo, máximo, média, desvio padrão e quantidade) de uma janela de leituras,
+    calculadas no dispositivo, uma por tipo de sensor. Indicado para sinais que variam devagar (lux e temperatura),
+    reduz o volume de dados recebido mantendo as estatísticas usadas pelos modelos.
+    O reenvio de uma janela já gravada (mesmo sensor e início) é descartado.
+    """
+
+    sensores = RotaSensores.get(request.serial)
+
+    if not sensores:
+        return {
+            "status": "error",
+            "message": f"Sensor com serial '{request.serial}' não encontrado."
+        }
+
+    sensor_por_tipo = {tipo: sensor_id for sensor_id, tipo in sensores}
+
+    linhas: list[dict] = []
+    ignorados: list[str] = []
+
+    for agregado in request.agregados:
+        sensor_id = sensor_por_tipo.get(agregado.tipo)
+
+        if sensor_id is None:
+            ignorados.append(agregado.tipo.value)
+            continue
+
+        linhas.append({
+            "sensor_id": sensor_id,
+            "data_inicio": request.data_inicio,
+            "data_fim": request.data_fim,
+            **agregado.model_dump(exclude={"tipo"}),
+        })
+
+    if linhas:
+        with Database.get_session() as session:
+            LeituraAgregada.bulk_insert(linhas, ignore_conflicts_on=['sensor_id', 'data_inicio'], session=session)
+            session.commit()
+
+        _JANELAS_GRAVADAS.inc(len(linhas))
+        _LEITURAS_RESUMIDAS.inc(sum(linha["quantidade"] for linha in linhas))
+
+    resposta = {
+        "status": "success" if not ignorados else ("partial" if linhas else "error"),
+        "message": f"{len(linhas)} janelas agregadas recebidas.",
+    }
+
+    if ignorados:
+        resposta["ignorados"] = ignorados
+
+    return resposta
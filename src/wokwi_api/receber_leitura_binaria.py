@@ -0,0 +1,155 @@
+from datetime import datetime
+import numpy as np
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from src.wokwi_api.amostragem_adaptativa import AmostragemAdaptativa
+from src.wokwi_api.buffer_leituras import BufferCheioError
+from src.wokwi_api.colunas_leituras import ColunasLeituras
+from src.wokwi_api.formato_binario import MEDIA_TYPE, ORDEM_VALORES, BlocoLeituras, FormatoBinarioError, decodificar_leituras
+from src.wokwi_api.horario_leitura import LEITURA_TOLERANCIA_FUTURO, data_do_timestamp_ms
+from src.wokwi_api.idempotencia import ChavesRecentes, chave_leitura, chave_permanente
+from src.wokwi_api.ingestao import aceitar_leituras, resposta_buffer_cheio
+from src.wokwi_api.rota_binaria import rota_com_formato_binario
+from src.wokwi_api.rota_sensores import RotaSensor, RotaSensores
+
+
+def _datas_do_bloco(bloco: BlocoLeituras, now: datetime) -> tuple[np.ndarray, np.ndarray | None] | None:
+    """
+    Calcula o horário de cada leitura do bloco: inicio + i * intervalo.
+    Sem o horário do dispositivo, ou com o relógio adiantado, a última leitura do bloco recebe o horário do servidor.
+    :param bloco: Bloco recebido.
+    :param now: Horário do servidor no recebimento.
+    :return: (horários a serem gravados, horários enviados pelo dispositivo ou None se ele não os enviou),
+    ou None se o horário estiver fora do intervalo suportado.
+    """
+    quantidade = len(bloco.valores)
+    deslocamentos = np.arange(quantidade) * np.timedelta64(bloco.intervalo_ms, 'ms')
+    duracao = np.timedelta64((quantidade - 1) * bloco.intervalo_ms, 'ms') if quantidade else np.timedelta64(0, 'ms')
+    agora = np.datetime64(now, 'ms')
+
+    if not bloco.inicio_ms:
+        return agora - duracao + deslocamentos, None
+
+    inicio = data_do_timestamp_ms(bloco.inicio_ms)
+    if inicio is None or data_do_timestamp_ms(bloco.inicio_ms + (quantidade - 1) * bloco.intervalo_ms) is None:
+        return None
+
+    enviadas = np.datetime64(inicio, 'ms') + deslocamentos
+
+    if quantidade and enviadas[-1] > np.datetime64(now + LEITURA_TOLERANCIA_FUTURO, 'ms'):
+        return agora - duracao + deslocamentos, enviadas
+
+    return enviadas, enviadas
+
+
+def _chaves_do_bloco(bloco: BlocoLeituras, enviadas: np.ndarray | None) -> list[str | None]:
+    # Mesmas chaves das rotas JSON: pelo número de sequência e pelo horário do dispositivo, quando enviados
+    datas = enviadas.astype("datetime64[us]").tolist() if enviadas is not None else [None] * len(bloco.valores)
+    seqs = range(bloco.seq, bloco.seq + len(bloco.valores)) if bloco.seq >= 0 else [None] * len(bloco.valores)
+
+    return [chave_leitura(seq, data) for seq, data in zip(seqs, datas)]
+
+
+def _colunas_dos_blocos(blocos: list[BlocoLeituras]) -> tuple[ColunasLeituras, list[dict], list[tuple[str, str]], dict[str, list[RotaSensor]]]:
+    """
+    Converte os blocos decodificados nas colunas da LEITURA_SENSOR, sem montar uma linha por leitura.
+    As leituras já recebidas (mesmo seq ou horário do dispositivo) são descartadas, como nas rotas JSON.
+    :param blocos: Blocos retornados por decodificar_leituras.
+    :return: (colunas, resultados por bloco, chaves de idempotência registradas, sensores por serial)
+    """
+    now = datetime.now()
+    sensores = RotaSensores.get_varios({bloco.serial for bloco in blocos})
+
+    partes: list[ColunasLeituras] = []
+    resultados: list[dict] = []
+    registradas: list[tuple[str, str]] = []
+
+    for indice, bloco in enumerate(blocos):
+        resultado = {"indice": indice, "serial": bloco.serial}
+        resultados.append(resultado)
+
+        if bloco.serial not in sensores:
+            resultado.update({"status": "error", "message": f"Sensor com serial '{bloco.serial}' não encontrado."})
+            continue
+
+        datas = _datas_do_bloco(bloco, now)
+
+        if datas is None:
+            resultado.update({"status": "error", "message": f"Horário de início {bloco.inicio_ms} ms fora do intervalo suportado."})
+            continue
+
+        datas, enviadas = datas
+        chaves = _chaves_do_bloco(bloco, enviadas)
+
+        novas = np.array([chave is None or ChavesRecentes.registrar(bloco.serial, chave) for chave in chaves], dtype=bool)
+        chaves = [chave for chave, nova in zip(chaves, novas) if nova]
+        registradas.extend((bloco.serial, chave) for chave in chaves if chave is not None)
+
+        valores = bloco.valores[novas]
+        datas = datas[novas]
+
+        total = 0
+        for sensor_id, tipo in sensores[bloco.serial]:
+            coluna = valores[:, ORDEM_VALORES.index(tipo)]
+            presentes = ~np.isnan(coluna)
+
+            partes.append(ColunasLeituras({
+                "sensor_id": np.full(np.count_nonzero(presentes), sensor_id, dtype=np.int64),
+                "data_leitura": datas[presentes],
+                "valor": coluna[presentes].astype(np.float64),
+                "chave_idempotencia": np.array(
+                    [f"{sensor_id}|{chave}" if chave_permanente(chave) else None for chave, presente in zip(chaves, presentes) if presente],
+                    dtype=object,
+                ),
+            }))
+            total += int(np.count_nonzero(presentes))
+
+        resultado.update({"status": "success", "leituras": total})
+
+        if not novas.all():
+            # Leituras reenviadas (no mesmo payload ou em uma requisição anterior)
+            resultado["duplicadas"] = int(np.count_nonzero(~novas))
+
+    return ColunasLeituras.concatenar(partes), resultados, registradas, sensores
+
+
+def _proximos_intervalos(colunas: ColunasLeituras, resultados: list[dict], sensores: dict[str, list[RotaSensor]]) -> None:
+    # Atualiza as estatísticas da amostragem adaptativa e informa o intervalo recomendado de cada serial
+    AmostragemAdaptativa.registrar(colunas)
+
+    for resultado in resultados:
+        if resultado["status"] == "success":
+            resultado["proximo_intervalo_ms"] = AmostragemAdaptativa.proximo_intervalo_ms(sensores[resultado["serial"]])
+
+
+async def receber_leitura_binaria(request: Request) -> Response:
+    """
+    Recebe leituras no formato binário (ver formato_binario.py), de um ou mais seriais.
+    """
+    try:
+        blocos = decodificar_leituras(await request.body())
+    except FormatoBinarioError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+    colunas, resultados, chaves, sensores = await run_in_threadpool(_colunas_dos_blocos, blocos)
+
+    try:
+        with ChavesRecentes.desfazer_em_erro(chaves):
+            recebidas = await run_in_threadpool(aceitar_leituras, colunas)
+    except BufferCheioError as e:
+        return resposta_buffer_cheio(e)
+
+    await run_in_threadpool(_proximos_intervalos, colunas, resultados, sensores)
+
+    sucessos = sum(1 for r in resultados if r["status"] == "success")
+
+    return JSONResponse(content={
+        "status": "success" if sucessos == len(resultados) else ("error" if sucessos == 0 else "partial"),
+        "message": f"{recebidas} leituras recebidas.",
+        "resultados": resultados,
+    })
+
+
+# Rota que, além do JSON, aceita o content-type binário 'application/x-leitura' no mesmo endpoint
+RotaLeitura = rota_com_formato_binario(MEDIA_TYPE, receber_leitura_binaria)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+from src.wokwi_api.buffer_leituras import BufferCheioError
+from src.wokwi_api.formato_binario import ORDEM_VALORES
+from src.wokwi_api.ingestao import aceitar_leituras
+from src.wokwi_api.rota_sensores import RotaSensores
+
+ws_router = APIRouter()
+
+WS_TAMANHO_LOTE = int(os.environ.get("WS_TAMANHO_LOTE", 500))
+WS_INTERVALO_SEGUNDOS = float(os.environ.get("WS_INTERVALO_SEGUNDOS", 1.0))
+
+
+class _LoteConexao:
+    """
+    Acumula as leituras de uma conexão até atingir o tamanho do lote ou o intervalo máximo.
+    """
+
+    def __init__(self, indices: list[tuple[int, int]]):
+        # (sensor_id, posição do valor no frame)
+        self.indices = indices
+        self.linhas: list[dict] = []
+        self.inicio = 0.0
+
+    def _linhas_do_frame(self, valores: list, now: datetime) -> list[dict]:
+        if not isinstance(valores, list):
+            raise ValueError("Frame inválido.")
+
+        return [
+            {"sensor_id": sensor_id, "data_leitura": now, "valor": float(valores[posicao])}
+            for sensor_id, posicao in self.indices
+            if posicao < len(valores) and valores[posicao] is not None
+        ]
+
+    def adicionar(self, frame: list) -> None:
+        """
+        Adiciona as leituras de uma mensagem. Todo o conteúdo é validado antes: com um frame inválido
+        nenhuma leitura da mensagem é adicionada.
+        :param frame: Valores na ordem de ORDEM_VALORES, ou uma lista de frames.
+        :raises ValueError: Se a mensagem não for um frame (lista de números) ou uma lista de frames.
+        :raises TypeError: Se algum valor não for um número.
+        """
+        if not isinstance(frame, list):
+            raise ValueError("Frame inválido.")
+
+        now = datetime.now()
+        frames = frame if frame and isinstance(frame[0], list) else [frame]
+        novas = [linha for valores in frames for linha in self._linhas_do_frame(valores, now)]
+
+        if not self.linhas:
+            # O intervalo máximo é contado a partir da primeira leitura pendente
+            self.inicio = time.monotonic()
+
+        self.linhas.extend(novas)
+
+    def tempo_restante(self) -> float | None:
+        """
+        Tempo até a próxima gravação por intervalo ou None se não houver leituras pendentes.
+        """
+        if not self.linhas:
+            return None
+        return max(0.0, WS_INTERVALO_SEGUNDOS - (time.monotonic() - self.inicio))
+
+    def deve_gravar(self) -> bool:
+        return len(self.linhas) >= WS_TAMANHO_LOTE or self.tempo_restante() == 0
+
+    def retirar(self) -> list[dict]:
+        linhas, self.linhas = self.linhas, []
+        return linhas
+
+
+async def _gravar(websocket: WebSocket, lote: _LoteConexao) -> None:
+    linhas = lote.retirar()
+
+    if not linhas:
+        return
+
+    try:
+        total = await run_in_threadpool(aceitar_leituras, linhas)
+        await websocket.send_json({"status": "success", "leituras": total})
+    except BufferCheioError as e:
+        # As leituras não foram aceitas, o dispositivo deve reenviá-las
+        await websocket.send_json({"status": "error", "message": str(e), "leituras_rejeitadas": len(linhas)})
+    except (SQLAlchemyError, OSError) as e:
+        # Erro do banco de dados (ou do spool em disco): a conexão continua aberta e o dispositivo pode reenviar as leituras
+        logging.error(f"Erro ao gravar {len(linhas)} leituras recebidas pelo WebSocket: {e}")
+        await websocket.send_json({
+            "status": "error", "message": "Erro ao gravar as leituras.", "leituras_rejeitadas": len(linhas)
+        })
+
+
+@ws_router.websocket("/ws")
+async def receber_leitura_ws(websocket: WebSocket):
+    """
+    Recebe leituras por uma conexão WebSocket persistente.
+
+    Protocolo:
+        1. O dispositivo envia {"serial": "<serial>"} uma única vez. Os sensores do serial são resolvidos apenas nesse momento.
+        2. Em seguida envia frames compactos com os valores na ordem [lux, temperatura, vibracao_media]
+           (null para valores ausentes), ou uma lista desses frames: [[lux, temperatura, vibracao_media], ...].
+        3. O servidor agrupa as leituras e as grava em lote, respondendo {"status": "success", "leituras": n} a cada gravação.
+    """
+    await websocket.accept()
+
+    try:
+        autenticacao = await websocket.receive_json()
+        serial = autenticacao.get("serial") if isinstance(autenticacao, dict) else None
+    except ValueError:
+        serial = None
+    except WebSocketDisconnect:
+        # Desconectado antes de se identificar: não há a quem responder
+        return
+
+    sensores = await run_in_threadpool(RotaSensores.get, serial) if serial else None
+
+    if not sensores:
+        await websocket.send_json({"status": "error", "message": f"Sensor com serial '{serial}' não encontrado."})
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    lote = _LoteConexao([(sensor_id, ORDEM_VALORES.index(tipo)) for sensor_id, tipo in sensores])
+    await websocket.send_json({"status": "success", "sensores": len(sensores)})
+    logging.info(f"WebSocket conectado para o serial {serial}.")
+
+    try:
+        while True:
+            try:
+                mensagem = await asyncio.wait_for(websocket.receive_text(), timeout=lote.tempo_restante())
+            except asyncio.TimeoutError:
+                await _gravar(websocket, lote)
+                continue
+
+            try:
+                lote.adicionar(json.loads(mensagem))
+            except (ValueError, TypeError):
+                await websocket.send_json({"status": "error", "message": "Frame inválido."})
+                continue
+
+            if lote.deve_gravar():
+                await _gravar(websocket, lote)
+
+    except WebSocketDisconnect:
+        # Grava as leituras que ainda não foram gravadas
+        linhas = lote.retirar()
+        if linhas:
+            try:
+                await run_in_threadpool(aceitar_leituras, linhas)
+            except (BufferCheioError, SQLAlchemyError, OSError) as e:
+                # Não há mais conexão para avisar o dispositivo
+                logging.error(f"{len(linhas)} leituras do serial {serial} descartadas ao desconectar: {e}")
+
+        logging.info(f"WebSocket desconectado para o serial {serial}.")
@@ -0,0 +1,58 @@
+import time
+from collections import deque
+from operator import itemgetter
+from src.wokwi_api.colunas_leituras import ColunasLeituras, Leituras
+
+_CHAVE_ORDEM = itemgetter("sensor_id", "data_leitura")
+
+
+def ordenar_leituras(linhas: Leituras) -> Leituras:
+    """
+    Ordena as leituras por (sensor_id, data_leitura), a ordem do índice da LEITURA_SENSOR.
+    :param linhas: Lista de dicionários com as chaves 'sensor_id' e 'data_leitura', ou leituras em colunas.
+    :return: Novas leituras ordenadas, no mesmo formato.
+    """
+    if isinstance(linhas, ColunasLeituras):
+        return linhas.ordenadas()
+    return sorted(linhas, key=_CHAVE_ORDEM)
+
+
+class JanelaReordenacao:
+    """
+    Retém as leituras por alguns segundos antes da gravação para que as leituras que chegam atrasadas
+    (ex.: enviadas depois por um dispositivo que estava sem conexão) sejam ordenadas junto com as demais.
+    Assim a LEITURA_SENSOR é gravada, por sensor, na ordem de data_leitura.
+    Não é thread-safe: deve ser usada por uma única thread (ex.: a thread de gravação do BufferLeituras).
+    """
+
+    def __init__(self, janela_segundos: float):
+        """
+        :param janela_segundos: Tempo, a partir da chegada, que cada leitura fica retida. 0 não retém as leituras.
+        """
+        self.janela = janela_segundos
+        self._retidas: deque[tuple[float, dict]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._retidas)
+
+    def adicionar(self, linhas: list[dict]) -> None:
+        """
+        Adiciona leituras à janela.
+        :param linhas: Lista de dicionários com as chaves 'sensor_id', 'data_leitura' e 'valor'.
+        """
+        chegada = time.monotonic()
+        self._retidas.extend((chegada, linha) for linha in linhas)
+
+    def retirar(self, todas: bool = False) -> list[dict]:
+        """
+        Retira as leituras que já completaram o tempo da janela.
+        :param todas: Retira todas as leituras, inclusive as que ainda não completaram o tempo (ex.: ao encerrar).
+        :return: Leituras retiradas, ordenadas por (sensor_id, data_leitura).
+        """
+        limite = time.monotonic() - self.janela
+        liberadas = []
+
+        while self._retidas and (todas or self._retidas[0][0] <= limite):
+            liberadas.append(self._retidas.popleft()[1])
+
+        return ordenar_leituras(liberadas)
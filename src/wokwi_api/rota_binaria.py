@@ -0,0 +1,29 @@
+from typing import Awaitable, Callable
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+
+def rota_com_formato_binario(media_type: str, handler_binario: Callable[[Request], Awaitable[Response]]) -> type[APIRoute]:
+    """
+    Cria uma classe de rota que, além do JSON, aceita um content-type binário no mesmo endpoint.
+    :param media_type: Content-type binário aceito (ex.: 'application/x-leitura').
+    :param handler_binario: Função que recebe a requisição binária e retorna a resposta.
+    :return: Classe de rota para o route_class do APIRouter.
+    """
+
+    class RotaBinaria(APIRoute):
+
+        def get_route_handler(self) -> Callable:
+            handler_json = super().get_route_handler()
+
+            async def handler(request: Request) -> Response:
+                content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+                if content_type == media_type:
+                    return await handler_binario(request)
+
+                return await handler_json(request)
+
+            return handler
+
+    return RotaBinaria
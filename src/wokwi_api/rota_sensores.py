@@ -0,0 +1,227 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy.orm import Session
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.database_async import DatabaseAsync
+from src.database.tipos_base.model_mixins.crud import _ModelCrudMixin
+from src.database.models.sensor import Sensor, TipoSensor, TipoSensorEnum
+from src.wokwi_api.metricas import contador, medidor
+
+# O Oracle limita a quantidade de itens em uma cláusula IN
+_TAMANHO_MAXIMO_IN = 1000
+
+# Tempo em que um serial não cadastrado é respondido sem nova consulta ao banco de dados
+ROTA_SENSORES_TTL_DESCONHECIDOS_SEGUNDOS = float(os.environ.get("ROTA_SENSORES_TTL_DESCONHECIDOS_SEGUNDOS", 5.0))
+# Quantidade máxima de seriais não cadastrados mantidos em memória
+_MAX_DESCONHECIDOS = 10000
+
+RotaSensor = tuple[int, TipoSensorEnum]
+
+_ACERTOS = contador("rota_sensores_acertos_total", "Seriais resolvidos pela tabela de roteamento em memória.")
+_FALTAS = contador("rota_sensores_faltas_total", "Seriais que precisaram de consulta ao banco de dados.")
+
+
+def _taxa_acerto() -> float:
+    total = _ACERTOS.valor() + _FALTAS.valor()
+    return _ACERTOS.valor() / total if total else 0.0
+
+
+medidor("rota_sensores_taxa_acerto", "Proporção dos seriais resolvidos sem consulta ao banco de dados.", _taxa_acerto)
+
+
+def buscar_sensores_por_serial(session: Session, seriais: set[str] | None = None) -> dict[str, list[RotaSensor]]:
+    """
+    Busca os sensores e seus tipos com uma única consulta (com JOIN) por bloco de seriais.
+    :param session: Sessão do banco de dados.
+    :param seriais: Seriais a serem buscados. Se None, busca todos os sensores que possuem serial.
+    :return: Dicionário com o serial como chave e uma lista de (sensor_id, tipo) como valor.
+    """
+    sensores: dict[str, list[RotaSensor]] = {}
+
+    query = session.query(Sensor.cod_serial, Sensor.id, TipoSensor.tipo) \
+        .join(TipoSensor, TipoSensor.id == Sensor.tipo_sensor_id)
+
+    if seriais is None:
+        blocos = [query.filter(Sensor.cod_serial.isnot(None))]
+    else:
+        seriais = list(seriais)
+        blocos = [
+            query.filter(Sensor.cod_serial.in_(seriais[inicio:inicio + _TAMANHO_MAXIMO_IN]))
+            for inicio in range(0, len(seriais), _TAMANHO_MAXIMO_IN)
+        ]
+
+    for bloco in blocos:
+        for cod_serial, sensor_id, tipo in bloco.all():
+            sensores.setdefault(cod_serial, []).append((sensor_id, TipoSensorEnum(tipo)))
+
+    return sensores
+
+
+class RotaSensores:
+    """
+    Tabela de roteamento em memória, compartilhada pelo processo, do serial para os sensores (sensor_id, tipo).
+    É carregada uma única vez, atualizada pelo init_sensor e invalidada sempre que
+    Sensor ou TipoSensor são alterados pelos métodos do model.
+    Com isso o caminho de ingestão não faz nenhuma consulta para resolver os sensores.
+    Os seriais não cadastrados também ficam em memória, por ROTA_SENSORES_TTL_DESCONHECIDOS_SEGUNDOS,
+    para que um dispositivo não cadastrado não gere uma consulta a cada envio.
+    """
+
+    _rotas: dict[str, list[RotaSensor]] | None = None
+    # Serial não cadastrado -> instante (time.monotonic) em que deve ser consultado novamente
+    _desconhecidos: OrderedDict[str, float] = OrderedDict()
+    _lock = threading.RLock()
+
+    @classmethod
+    def carregar(cls) -> dict[str, list[RotaSensor]]:
+        """
+        Carrega todos os sensores com serial do banco de dados.
+        :return: A tabela de roteamento carregada.
+        """
+        with Database.get_session() as session:
+            rotas = buscar_sensores_por_serial(session)
+
+        return cls._armazenar(rotas)
+
+    @classmethod
+    def _armazenar(cls, rotas: dict[str, list[RotaSensor]]) -> dict[str, list[RotaSensor]]:
+        with cls._lock:
+            cls._rotas = rotas
+
+        logging.debug(f"Tabela de roteamento carregada com {len(rotas)} seriais.")
+        return rotas
+
+    @classmethod
+    def _adicionar(cls, novos: dict[str, list[RotaSensor]], consultados: set[str]):
+        agora = time.monotonic()
+
+        with cls._lock:
+            if cls._rotas is not None:
+                cls._rotas.update(novos)
+
+            for serial in consultados:
+                if serial in novos:
+                    cls._desconhecidos.pop(serial, None)
+                else:
+                    cls._desconhecidos[serial] = agora + ROTA_SENSORES_TTL_DESCONHECIDOS_SEGUNDOS
+                    cls._desconhecidos.move_to_end(serial)
+
+            while len(cls._desconhecidos) > _MAX_DESCONHECIDOS:
+                cls._desconhecidos.popitem(last=False)
+
+    @classmethod
+    def _separar(cls, rotas: dict[str, list[RotaSensor]], seriais: set[str]) -> tuple[dict[str, list[RotaSensor]], set[str]]:
+        # Retorna os seriais em memória e os que precisam de consulta: os não cadastrados consultados há pouco não são consultados
+        agora = time.monotonic()
+        encontrados = {serial: rotas[serial] for serial in seriais if serial in rotas}
+
+        with cls._lock:
+            faltantes = {
+                serial for serial in seriais
+                if serial not in rotas and cls._desconhecidos.get(serial, 0.0) <= agora
+            }
+
+        _ACERTOS.inc(len(seriais) - len(faltantes))
+        _FALTAS.inc(len(faltantes))
+        return encontrados, faltantes
+
+    @classmethod
+    def get(cls, serial: str) -> list[RotaSensor] | None:
+        """
+        Retorna os sensores de um serial.
+        :param serial: Serial do dispositivo.
+        :return: Lista de (sensor_id, tipo) ou None se o serial não possuir sensores.
+        """
+        return cls.get_varios({serial}).get(serial)
+
+    @classmethod
+    def get_varios(cls, seriais: set[str]) -> dict[str, list[RotaSensor]]:
+        """
+        Retorna os sensores de vários seriais. Os seriais que não estão em memória
+        (ex.: cadastrados por outro processo) são buscados em uma única consulta.
+        :param seriais: Seriais dos dispositivos.
+        :return: Dicionário com o serial como chave e uma lista de (sensor_id, tipo) como valor.
+        """
+        rotas = cls._rotas
+
+        if rotas is None:
+            rotas = cls.carregar()
+
+        encontrados, faltantes = cls._separar(rotas, seriais)
+
+        if faltantes:
+            with Database.get_session() as session:
+                novos = buscar_sensores_por_serial(session, faltantes)
+
+            cls._adicionar(novos, faltantes)
+            encontrados.update(novos)
+
+        return encontrados
+
+    @classmethod
+    async def get_varios_async(cls, seriais: set[str]) -> dict[str, list[RotaSensor]]:
+        """
+        Versão assíncrona do get_varios, que consulta o banco pelo DatabaseAsync sem bloquear o event loop.
+        :param seriais: Seriais dos dispositivos.
+        :return: Dicionário com o serial como chave e uma lista de (sensor_id, tipo) como valor.
+        """
+        rotas = cls._rotas
+
+        if rotas is None:
+            async with DatabaseAsync.get_session() as session:
+                rotas = cls._armazenar(await session.run_sync(buscar_sensores_por_serial))
+
+        encontrados, faltantes = cls._separar(rotas, seriais)
+
+        if faltantes:
+            async with DatabaseAsync.get_session() as session:
+                novos = await session.run_sync(buscar_sensores_por_serial, faltantes)
+
+            cls._adicionar(novos, faltantes)
+            encontrados.update(novos)
+
+        return encontrados
+
+    @classmethod
+    def atualizar(cls, serial: str, rotas: list[RotaSensor]) -> None:
+        """
+        Atualiza os sensores de um serial na tabela de roteamento.
+        :param serial: Serial do dispositivo.
+        :param rotas: Lista de (sensor_id, tipo) do serial.
+        """
+        with cls._lock:
+            cls._desconhecidos.pop(serial, None)
+            if cls._rotas is not None:
+                cls._rotas[serial] = list(rotas)
+
+    @classmethod
+    def atualizar_varios(cls, rotas: dict[str, list[RotaSensor]]) -> None:
+        """
+        Atualiza os sensores de vários seriais na tabela de roteamento.
+        :param rotas: Dicionário com o serial como chave e a lista de (sensor_id, tipo) como valor.
+        """
+        with cls._lock:
+            for serial in rotas:
+                cls._desconhecidos.pop(serial, None)
+            if cls._rotas is not None:
+                cls._rotas.update({serial: list(sensores) for serial, sensores in rotas.items()})
+
+    @classmethod
+    def invalidar(cls) -> None:
+        """
+        Descarta a tabela de roteamento e os seriais não cadastrados. Ela será recarregada na próxima leitura.
+        """
+        with cls._lock:
+            cls._rotas = None
+            cls._desconhecidos.clear()
+
+
+def _invalidar_rotas(model: type) -> None:
+    if getattr(model, '__tablename__', None) in (Sensor.__tablename__, TipoSensor.__tablename__):
+        RotaSensores.invalidar()
+
+
+_ModelCrudMixin.add_write_listener(_invalidar_rotas)
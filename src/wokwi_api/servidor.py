@@ -0,0 +1,64 @@
+"""
+Servidor independente da API de ingestão, executado em vários processos (workers),
+separado do dashboard do Streamlit.
+
+Exemplos (executar a partir da raiz do projeto):
+    python -m src.wokwi_api.servidor --sqlite database.db --workers 4
+    python -m src.wokwi_api.servidor --port 8180 --workers 8   (Oracle, com as variáveis 'user', 'senha' e 'dsn')
+"""
+import argparse
+import logging
+import os
+import uvicorn
+from dotenv import load_dotenv
+from src.database.tipos_base.database import Database
+from src.logger.config import configurar_logger
+
+
+def _argumentos() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servidor da API de ingestão das leituras dos sensores.")
+    parser.add_argument("--host", default=os.environ.get("API_HOST", "0.0.0.0"),
+                        help="Endereço onde a API vai escutar (padrão: API_HOST ou 0.0.0.0).")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("API_PORT", 8180)),
+                        help="Porta da API (padrão: API_PORT ou 8180).")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("API_WORKERS", os.cpu_count() or 1)),
+                        help="Quantidade de processos da API (padrão: API_WORKERS ou a quantidade de CPUs).")
+    parser.add_argument("--sqlite", default=os.environ.get("SQLITE_PATH"),
+                        help="Caminho do banco SQLite. Se omitido, usa o Oracle com as variáveis 'user', 'senha' e 'dsn'.")
+    parser.add_argument("--timeout-desligamento", type=int, default=30,
+                        help="Tempo, em segundos, para finalizar as requisições em andamento ao encerrar.")
+    return parser.parse_args()
+
+
+def main():
+    """
+    Inicia a API de ingestão em 'workers' processos.
+    Cada worker abre a sua própria conexão com o banco e configura o seu logger no api.log (ver lifespan em api_basica.py).
+    """
+    load_dotenv()
+    configurar_logger("api.log")
+
+    args = _argumentos()
+
+    if args.sqlite:
+        # Os workers leem o banco a ser utilizado das variáveis de ambiente
+        os.environ["SQLITE_PATH"] = os.path.abspath(args.sqlite)
+
+    # Cria as tabelas uma única vez, antes de iniciar os workers
+    Database.init_from_env(wal=True)
+    Database.create_all_tables()
+    Database.engine.dispose()
+
+    logging.info(f"Iniciando a API em http://{args.host}:{args.port} com {args.workers} worker(s).")
+
+    uvicorn.run(
+        "src.wokwi_api.api_basica:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.timeout_desligamento,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+Spool em disco para as leituras aceitas enquanto o banco de dados está indisponível ou lento.
+
+As leituras são adicionadas em arquivos de segmento (append-only) com registros
+[tamanho uint32][crc32 uint32][json das linhas]. Vários registros são confirmados por um único fsync
+(a cada SPOOL_FSYNC_INTERVALO_SEGUNDOS) e a requisição só retorna depois que o seu registro foi confirmado.
+Uma thread reprocessa os segmentos na ordem em que foram gravados, em INSERTs em lote na LEITURA_SENSOR,
+salvando a posição já reprocessada em um arquivo de checkpoint. Enquanto houver leituras no spool,
+as novas leituras também são enviadas para ele, mantendo a ordem de chegada.
+
+A entrega é 'ao menos uma vez': se o processo for encerrado entre o COMMIT e o checkpoint, o último lote é
+reprocessado. As leituras com 'seq' ou 'data_leitura' (chave_idempotencia) não são duplicadas nesse caso.
+"""
+import itertools
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
+from src.wokwi_api.colunas_leituras import Leituras
+from src.wokwi_api.gravar_leituras import banco_indisponivel, gravar_leituras, gravar_leituras_validas
+from src.wokwi_api.metricas import TaxaPorSegundo, contador, medidor
+
+_CABECALHO = struct.Struct('<II')
+_PREFIXO_SEGMENTO = "segmento-"
+_EXTENSAO_SEGMENTO = ".spool"
+
+_LEITURAS_SPOOL = contador("spool_leituras_gravadas_total", "Leituras gravadas no spool em disco.")
+_LEITURAS_REPROCESSADAS = contador("spool_leituras_reprocessadas_total", "Leituras do spool gravadas no banco de dados.")
+_LEITURAS_DESCARTADAS = contador("spool_leituras_descartadas_total", "Leituras do spool recusadas pelo banco de dados (ex.: dados inválidos).")
+_TAXA_REPROCESSAMENTO = TaxaPorSegundo()
+
+
+def _travar(arquivo) -> bool:
+    # Trava exclusiva liberada pelo sistema operacional quando o processo termina
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _serializar(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável no spool: {type(valor)}")
+
+
+class Spool:
+    """
+    Spool em disco das leituras (ver a descrição do módulo).
+
+    Configurado pelas variáveis de ambiente:
+        SPOOL_DIRETORIO: diretório do spool. Se não for definida, o spool não é utilizado.
+            Cada processo (ex.: workers do servidor.py) usa um subdiretório 'worker-N' próprio.
+        SPOOL_TAMANHO_SEGMENTO_BYTES: tamanho a partir do qual um novo segmento é criado (padrão 16 MB).
+        SPOOL_FSYNC_INTERVALO_SEGUNDOS: intervalo entre os fsync dos registros pendentes (padrão 0.01).
+        SPOOL_LATENCIA_MAXIMA_SEGUNDOS: duração de uma gravação no banco a partir da qual ele é considerado lento (padrão 2.0).
+        SPOOL_ESPERA_SEGUNDOS: tempo que as leituras são desviadas para o spool após uma falha ou lentidão do banco (padrão 5.0).
+        SPOOL_TAMANHO_LOTE: quantidade máxima de leituras por INSERT do reprocessamento (padrão 5000).
+    """
+
+    tamanho_segmento: int = int(os.environ.get("SPOOL_TAMANHO_SEGMENTO_BYTES", 16 * 1024 * 1024))
+    intervalo_fsync: float = float(os.environ.get("SPOOL_FSYNC_INTERVALO_SEGUNDOS", 0.01))
+    latencia_maxima: float = float(os.environ.get("SPOOL_LATENCIA_MAXIMA_SEGUNDOS", 2.0))
+    espera: float = float(os.environ.get("SPOOL_ESPERA_SEGUNDOS", 5.0))
+    tamanho_lote: int = int(os.environ.get("SPOOL_TAMANHO_LOTE", 5000))
+
+    _diretorio: str | None = None
+    _trava = None
+    _arquivo = None
+    _segmento_ativo: int = 0
+    # Posição do segmento ativo já confirmada por fsync, a única parte que pode ser reprocessada
+    _posicao_sincronizada: int = 0
+    _escritos: int = 0
+    _sincronizados: int = 0
+    # Há registros no spool ainda não reprocessados
+    _pendente: bool = False
+    # Momento (time.monotonic) até o qual as leituras são desviadas para o spool
+    _desviar_ate: float = 0.0
+
+    _condicao = threading.Condition()
+    _evento_parar = threading.Event()
+    _threads: list[threading.Thread] = []
+
+    @staticmethod
+    def habilitado() -> bool:
+        """
+        Retorna se o spool está configurado (variável de ambiente SPOOL_DIRETORIO).
+        """
+        return bool(os.environ.get("SPOOL_DIRETORIO"))
+
+    @classmethod
+    def ativo(cls) -> bool:
+        """
+        Retorna se o spool foi iniciado.
+        """
+        return cls._arquivo is not None
+
+    @classmethod
+    def desviando(cls) -> bool:
+        """
+        Retorna se as novas leituras devem ir para o spool: há leituras não reprocessadas
+        ou o banco falhou (ou estava lento) há menos de SPOOL_ESPERA_SEGUNDOS.
+        """
+        return cls._pendente or time.monotonic() < cls._desviar_ate
+
+    @classmethod
+    def iniciar(cls, diretorio: str | None = None):
+        """
+        Abre um novo segmento e inicia as threads de fsync e de reprocessamento.
+        Os segmentos deixados por uma execução anterior são reprocessados.
+        :param diretorio: Diretório do spool. Padrão: variável de ambiente SPOOL_DIRETORIO.
+        """
+        with cls._condicao:
+            if cls.ativo():
+                return
+
+            cls._diretorio = cls._reservar_diretorio(diretorio or os.environ["SPOOL_DIRETORIO"])
+
+            segmentos = cls._segmentos()
+            cls._segmento_ativo = (segmentos[-1] + 1) if segmentos else 1
+            cls._abrir_segmento()
+            cls._pendente = cls.bytes_pendentes() > 0
+
+            cls._evento_parar.clear()
+            cls._threads = [
+                threading.Thread(target=cls._executar_fsync, name="spool-fsync", daemon=True),
+                threading.Thread(target=cls._executar_reprocessamento, name="spool-reprocessamento", daemon=True),
+            ]
+
+        for thread in cls._threads:
+            thread.start()
+
+        logging.info(f"Spool de leituras iniciado em {cls._diretorio} ({cls.bytes_pendentes()} bytes pendentes).")
+
+    @classmethod
+    def parar(cls, timeout: float | None = 30.0):
+        """
+        Para as threads e fecha o segmento ativo. As leituras não reprocessadas continuam no disco
+        e são reprocessadas na próxima vez que o spool for iniciado.
+        :param timeout: Tempo máximo, em segundos, para aguardar as threads.
+        """
+        if not cls.ativo():
+            return
+
+        cls._evento_parar.set()
+        with cls._condicao:
+            cls._condicao.notify_all()
+
+        for thread in cls._threads:
+            thread.join(timeout)
+
+        with cls._condicao:
+            cls._sincronizar()
+            cls._arquivo.close()
+            cls._arquivo = None
+            cls._trava.close()
+            cls._trava = None
+            cls._condicao.notify_all()
+
+        logging.info("Spool de leituras finalizado.")
+
+    @classmethod
+    def gravar(cls, linhas: Leituras) -> int:
+        """
+        Grava leituras no spool. Retorna depois que o registro foi confirmado no disco (fsync).
+        :param linhas: Lista de dicionários com as chaves 'sensor_id', 'data_leitura' e 'valor', ou leituras em colunas.
+        :return: Quantidade de leituras gravadas.
+        """
+        if not linhas:
+            return 0
+
+        payload = json.dumps(list(linhas), default=_serializar, separators=(',', ':')).encode('utf-8')
+        registro = _CABECALHO.pack(len(payload), zlib.crc32(payload)) + payload
+
+        with cls._condicao:
+            if not cls.ativo():
+                raise RuntimeError("Spool de leituras não iniciado.")
+
+            cls._arquivo.write(registro)
+            cls._arquivo.flush()
+            cls._escritos += 1
+            escrito = cls._escritos
+            cls._pendente = True
+
+            if cls._arquivo.tell() >= cls.tamanho_segmento:
+                cls._rotacionar()
+
+            # Aguarda o fsync em grupo feito pela thread 'spool-fsync'
+            while cls._sincronizados < escrito and cls.ativo():
+                cls._condicao.wait(1.0)
+
+        _LEITURAS_SPOOL.inc(len(linhas))
+        return len(linhas)
+
+    @classmethod
+    def bytes_pendentes(cls) -> int:
+        """
+        Retorna a quantidade de bytes do spool ainda não reprocessados.
+        """
+        if cls._diretorio is None:
+            return 0
+
+        segmento_checkpoint, posicao = cls._ler_checkpoint()
+        total = 0
+
+        for segmento in cls._segmentos():
+            if segmento < segmento_checkpoint:
+                continue
+            try:
+                tamanho = os.path.getsize(cls._caminho_segmento(segmento))
+            except FileNotFoundError:
+                continue
+            total += tamanho - (posicao if segmento == segmento_checkpoint else 0)
+
+        return max(0, total)
+
+    # Arquivos
+
+    @classmethod
+    def _reservar_diretorio(cls, base: str) -> str:
+        # Usa o primeiro 'worker-N' que nenhum outro processo está usando, inclusive os deixados por processos encerrados
+        for indice in itertools.count():
+            diretorio = os.path.join(base, f"worker-{indice}")
+            os.makedirs(diretorio, exist_ok=True)
+
+            trava = open(os.path.join(diretorio, ".lock"), "a+b")
+            if _travar(trava):
+                cls._trava = trava
+                return diretorio
+            trava.close()
+
+    @classmethod
+    def _caminho_segmento(cls, segmento: int) -> str:
+        return os.path.join(cls._diretorio, f"{_PREFIXO_SEGMENTO}{segmento:012d}{_EXTENSAO_SEGMENTO}")
+
+    @classmethod
+    def _segmentos(cls) -> list[int]:
+        return sorted(
+            int(nome[len(_PREFIXO_SEGMENTO):-len(_EXTENSAO_SEGMENTO)])
+            for nome in os.listdir(cls._diretorio)
+            if nome.startswith(_PREFIXO_SEGMENTO) and nome.endswith(_EXTENSAO_SEGMENTO)
+        )
+
+    @classmethod
+    def _abrir_segmento(cls):
+        cls._arquivo = open(cls._caminho_segmento(cls._segmento_ativo), "ab")
+        cls._posicao_sincronizada = cls._arquivo.tell()
+
+    @classmethod
+    def _sincronizar(cls):
+        # Deve ser chamado com o _condicao adquirido
+        if cls._sincronizados < cls._escritos:
+            os.fsync(cls._arquivo.fileno())
+            cls._sincronizados = cls._escritos
+            cls._posicao_sincronizada = cls._arquivo.tell()
+            cls._condicao.notify_all()
+
+    @classmethod
+    def _rotacionar(cls):
+        # Deve ser chamado com o _condicao adquirido
+        cls._sincronizar()
+        cls._arquivo.close()
+        cls._segmento_ativo += 1
+        cls._abrir_segmento()
+
+    @classmethod
+    def _ler_checkpoint(cls) -> tuple[int, int]:
+        try:
+            with open(os.path.join(cls._diretorio, "checkpoint")) as arquivo:
+                segmento, posicao = arquivo.read().split()
+                return int(segmento), int(posicao)
+        except (FileNotFoundError, ValueError):
+            return 0, 0
+
+    @classmethod
+    def _salvar_checkpoint(cls, segmento: int, posicao: int):
+        caminho = os.path.join(cls._diretorio, "checkpoint")
+        temporario = caminho + ".tmp"
+
+        with open(temporario, "w") as arquivo:
+            arquivo.write(f"{segmento} {posicao}")
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def _ler_registros(cls, segmento: int, inicio: int, limite: int | None) -> tuple[list[dict], int]:
+        """
+        Lê registros de um segmento a partir de 'inicio' até somar SPOOL_TAMANHO_LOTE leituras.
+        :return: (leituras, posição após o último registro lido)
+        """
+        linhas: list[dict] = []
+        posicao = inicio
+
+        with open(cls._caminho_segmento(segmento), "rb") as arquivo:
+            arquivo.seek(inicio)
+
+            while len(linhas) < cls.tamanho_lote and (limite is None or posicao < limite):
+                cabecalho = arquivo.read(_CABECALHO.size)
+                if len(cabecalho) < _CABECALHO.size:
+                    break
+
+                tamanho, crc = _CABECALHO.unpack(cabecalho)
+                payload = arquivo.read(tamanho)
+
+                if len(payload) < tamanho or zlib.crc32(payload) != crc:
+                    # Registro incompleto (processo encerrado durante a escrita): descarta o restante do segmento
+                    logging.error(f"Registro inválido no segmento {segmento} do spool, posição {posicao}. Restante do segmento descartado.")
+                    return linhas, os.path.getsize(cls._caminho_segmento(segmento))
+
+                for linha in json.loads(payload):
+                    linha["data_leitura"] = datetime.fromisoformat(linha["data_leitura"])
+                    linhas.append(linha)
+
+                posicao += _CABECALHO.size + tamanho
+
+        return linhas, posicao
+
+    # Threads
+
+    @classmethod
+    def _executar_fsync(cls):
+        while not cls._evento_parar.wait(cls.intervalo_fsync):
+            with cls._condicao:
+                cls._sincronizar()
+
+    @classmethod
+    def _executar_reprocessamento(cls):
+        while not cls._evento_parar.is_set():
+            try:
+                reprocessadas = cls._reprocessar_lote()
+            except Exception as e:
+                logging.exception(f"Erro no reprocessamento do spool: {e}")
+                reprocessadas = None
+
+            if reprocessadas is None:
+                # Banco indisponível
+                cls._evento_parar.wait(cls.espera)
+            elif reprocessadas == 0:
+                # Nada para reprocessar
+                cls._evento_parar.wait(0.5)
+
+    @classmethod
+    def _reprocessar_lote(cls) -> int | None:
+        """
+        Grava no banco o próximo lote do spool.
+        :return: Quantidade de leituras reprocessadas, 0 se o spool está vazio ou None se o banco está indisponível.
+        """
+        segmento_checkpoint, posicao_checkpoint = cls._ler_checkpoint()
+
+        for segmento in cls._segmentos():
+            if segmento < segmento_checkpoint:
+                # Já reprocessado, mas não removido antes de o processo ser encerrado
+                os.remove(cls._caminho_segmento(segmento))
+                continue
+
+            inicio = posicao_checkpoint if segmento == segmento_checkpoint else 0
+
+            with cls._condicao:
+                ativo = segmento == cls._segmento_ativo
+                limite = cls._posicao_sincronizada if ativo else None
+
+            linhas, fim = cls._ler_registros(segmento, inicio, limite)
+
+            if not linhas and fim == inicio:
+                if not ativo:
+                    cls._salvar_checkpoint(segmento + 1, 0)
+                    os.remove(cls._caminho_segmento(segmento))
+                    continue
+
+                with cls._condicao:
+                    # Tudo o que foi gravado no spool já foi reprocessado: as novas leituras voltam a ir para o banco
+                    if segmento == cls._segmento_ativo and cls._escritos == cls._sincronizados \
+                            and fim == cls._posicao_sincronizada:
+                        cls._pendente = False
+                return 0
+
+            inicio_gravacao = time.monotonic()
+            try:
+                # Apenas as leituras recusadas pelo banco (ex.: dados inválidos) são descartadas, não o lote inteiro
+                gravadas, recusadas = gravar_leituras_validas(linhas)
+            except SQLAlchemyError as e:
+                logging.warning(f"Banco de dados indisponível, {cls.bytes_pendentes()} bytes aguardando no spool: {e}")
+                return None
+
+            if recusadas:
+                _LEITURAS_DESCARTADAS.inc(len(recusadas))
+                logging.error(f"{len(recusadas)} leituras do spool recusadas pelo banco de dados e descartadas.")
+
+            # Leituras já gravadas antes de uma queda (ex.: checkpoint não salvo) são ignoradas pelo INSERT e não contam
+            _LEITURAS_REPROCESSADAS.inc(gravadas)
+            _TAXA_REPROCESSAMENTO.registrar(gravadas)
+            registrar_latencia(time.monotonic() - inicio_gravacao)
+
+            cls._salvar_checkpoint(segmento, fim)
+            return len(linhas)
+
+        return 0
+
+
+def registrar_latencia(segundos: float) -> None:
+    """
+    Desvia as leituras para o spool por SPOOL_ESPERA_SEGUNDOS se a gravação no banco foi mais lenta que SPOOL_LATENCIA_MAXIMA_SEGUNDOS.
+    :param segundos: Duração da gravação.
+    """
+    if segundos > Spool.latencia_maxima:
+        Spool._desviar_ate = time.monotonic() + Spool.espera
+
+
+def gravar_com_spool(linhas: Leituras) -> int:
+    """
+    Grava as leituras no banco de dados ou, se o spool estiver ativo e o banco indisponível, lento
+    ou com leituras anteriores ainda no spool, grava no spool.
+    :param linhas: Lista de dicionários com as chaves 'sensor_id', 'data_leitura' e 'valor', ou leituras em colunas.
+    :return: Quantidade de leituras gravadas.
+    """
+    if not Spool.ativo():
+        return gravar_leituras(linhas)
+
+    if Spool.desviando():
+        return Spool.gravar(linhas)
+
+    inicio = time.monotonic()
+    try:
+        gravadas = gravar_leituras(linhas)
+    except SQLAlchemyError as e:
+        if not banco_indisponivel(e):
+            raise
+        logging.warning(f"Banco de dados indisponível, leituras desviadas para o spool: {e}")
+        Spool._desviar_ate = time.monotonic() + Spool.espera
+        return Spool.gravar(linhas)
+
+    registrar_latencia(time.monotonic() - inicio)
+    return gravadas
+
+
+medidor("spool_bytes_pendentes", "Bytes do spool em disco ainda não gravados no banco de dados.", Spool.bytes_pendentes)
+medidor("spool_desviando", "1 enquanto as leituras estão sendo desviadas para o spool.", lambda: int(Spool.ativo() and Spool.desviando()))
+medidor("spool_reprocessamento_por_segundo", "Leituras do spool gravadas no banco por segundo (média do último minuto).", _TAXA_REPROCESSAMENTO.taxa)
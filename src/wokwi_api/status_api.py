@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from src.wokwi_api.buffer_leituras import BufferLeituras
+from src.wokwi_api.controle_admissao import ControleAdmissao
+from src.wokwi_api.metricas import CONTENT_TYPE, REGISTRO
+
+status_router = APIRouter()
+metricas_router = APIRouter()
+
+
+@status_router.get('/')
+def status_api():
+    """
+    Retorna os contadores de carga da API: controle de admissão e buffer de leituras.
+    """
+    return {
+        "admissao": ControleAdmissao.status(),
+        "buffer": {
+            "ativo": BufferLeituras.ativo(),
+            "pendentes": BufferLeituras.tamanho(),
+            "tamanho_maximo": BufferLeituras.tamanho_maximo,
+        },
+    }
+
+
+@metricas_router.get('')
+def metricas():
+    """
+    Retorna as métricas do processo no formato texto do Prometheus.
+    """
+    return Response(content=REGISTRO.exportar(), media_type=CONTENT_TYPE)
@@ -0,0 +1,200 @@
+"""
+Transmissão ao vivo (Server-Sent Events) das leituras recebidas pela API.
+As leituras aceitas são adicionadas em um buffer circular em memória, lido por todos os inscritos,
+sem nenhuma consulta ao banco de dados, independente da quantidade de inscritos.
+"""
+import asyncio
+import itertools
+import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Iterator
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from src.database.models.sensor import Sensor
+from src.database.tipos_base.database import Database
+from src.wokwi_api.metricas import medidor
+from src.wokwi_api.rota_sensores import RotaSensores
+
+# Quantidade de leituras mantidas para os inscritos que se reconectam (Last-Event-ID)
+SSE_TAMANHO_BUFFER = int(os.environ.get("SSE_TAMANHO_BUFFER", 10000))
+# Intervalo do comentário enviado para manter a conexão aberta quando não há leituras
+SSE_KEEPALIVE_SEGUNDOS = float(os.environ.get("SSE_KEEPALIVE_SEGUNDOS", 15.0))
+
+MEDIA_TYPE_SSE = "text/event-stream"
+
+stream_router = APIRouter()
+
+
+@dataclass(frozen=True)
+class EventoLeitura:
+    id: int
+    sensor_id: int
+    data_leitura: datetime
+    valor: float
+
+
+class TransmissaoLeituras:
+    """
+    Buffer circular das últimas SSE_TAMANHO_BUFFER leituras aceitas, numeradas em sequência.
+    Os inscritos são acordados a cada nova leitura e leem a partir do último id que receberam.
+    """
+
+    _eventos: deque[EventoLeitura] = deque(maxlen=SSE_TAMANHO_BUFFER)
+    _ultimo_id: int = 0
+    _lock = threading.Lock()
+    _inscritos: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @classmethod
+    def publicar(cls, linhas: list[dict]) -> None:
+        """
+        Adiciona leituras ao buffer e acorda os inscritos. Pode ser chamado de qualquer thread.
+        :param linhas: Lista de dicionários com as chaves 'sensor_id', 'data_leitura' e 'valor'.
+        """
+        with cls._lock:
+            for linha in linhas:
+                cls._ultimo_id += 1
+                cls._eventos.append(EventoLeitura(cls._ultimo_id, linha["sensor_id"], linha["data_leitura"], linha["valor"]))
+            inscritos = list(cls._inscritos)
+
+        for loop, evento in inscritos:
+            try:
+                loop.call_soon_threadsafe(evento.set)
+            except RuntimeError:
+                # Event loop já encerrado
+                pass
+
+    @classmethod
+    def ultimo_id(cls) -> int:
+        """
+        Retorna o id da leitura mais recente.
+        """
+        return cls._ultimo_id
+
+    @classmethod
+    def ler(cls, apos_id: int, sensor_ids: set[int] | None = None) -> tuple[list[EventoLeitura], int, int]:
+        """
+        Lê as leituras posteriores a um id.
+        :param apos_id: Id da última leitura já recebida.
+        :param sensor_ids: Sensores desejados. Se None, todos.
+        :return: (leituras, quantidade de leituras que já saíram do buffer, id da última leitura lida)
+        """
+        with cls._lock:
+            ultimo_id = cls._ultimo_id
+            if apos_id >= ultimo_id or not cls._eventos:
+                # Um id maior que o último (ex.: API reiniciada) continua a partir das próximas leituras
+                return [], 0, ultimo_id
+
+            primeiro_id = cls._eventos[0].id
+            perdidas = max(0, primeiro_id - apos_id - 1)
+            # Os ids são sequenciais: as novas leituras são as últimas do buffer
+            novos = list(itertools.islice(reversed(cls._eventos), ultimo_id - max(apos_id, primeiro_id - 1)))
+
+        novos.reverse()
+
+        if sensor_ids is not None:
+            novos = [evento for evento in novos if evento.sensor_id in sensor_ids]
+
+        return novos, perdidas, ultimo_id
+
+    @classmethod
+    @contextmanager
+    def inscrever(cls) -> Iterator[asyncio.Event]:
+        """
+        Inscreve o event loop atual para ser acordado a cada nova leitura.
+        :return: Evento sinalizado quando há novas leituras.
+        """
+        inscrito = (asyncio.get_running_loop(), asyncio.Event())
+
+        with cls._lock:
+            cls._inscritos.add(inscrito)
+        try:
+            yield inscrito[1]
+        finally:
+            with cls._lock:
+                cls._inscritos.discard(inscrito)
+
+    @classmethod
+    def quantidade_inscritos(cls) -> int:
+        """
+        Retorna a quantidade de conexões inscritas.
+        """
+        return len(cls._inscritos)
+
+
+def _sensores_do_equipamento(equipamento_id: int) -> list[int]:
+    with Database.get_session() as session:
+        return list(session.scalars(select(Sensor.id).where(Sensor.equipamento_id == equipamento_id)))
+
+
+def _formatar_evento(evento: EventoLeitura) -> str:
+    dados = json.dumps({
+        "sensor_id": evento.sensor_id,
+        "data_leitura": evento.data_leitura.isoformat(),
+        "valor": evento.valor,
+    })
+    return f"id: {evento.id}\nevent: leitura\ndata: {dados}\n\n"
+
+
+async def _transmitir(request: Request, apos_id: int, sensor_ids: set[int] | None) -> AsyncIterator[str]:
+    with TransmissaoLeituras.inscrever() as novas_leituras:
+        # Tempo para o navegador (EventSource) reconectar, enviando o Last-Event-ID
+        yield "retry: 3000\n\n"
+
+        while not await request.is_disconnected():
+            # Limpo antes da leitura para não perder as leituras publicadas durante ela
+            novas_leituras.clear()
+            eventos, perdidas, apos_id = TransmissaoLeituras.ler(apos_id, sensor_ids)
+
+            if perdidas:
+                yield f"event: lacuna\ndata: {json.dumps({'perdidas': perdidas})}\n\n"
+            if eventos:
+                yield "".join(map(_formatar_evento, eventos))
+
+            try:
+                await asyncio.wait_for(novas_leituras.wait(), SSE_KEEPALIVE_SEGUNDOS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+
+
+@stream_router.get('/stream')
+async def transmitir_leituras(request: Request,
+                              serial: list[str] | None = Query(None),
+                              sensor_id: list[int] | None = Query(None),
+                              equipamento_id: int | None = None,
+                              last_event_id: int | None = Header(None)):
+    """
+    Transmite as leituras recebidas pela API (Server-Sent Events, evento 'leitura'), sem consultar o banco de dados.
+    Filtros opcionais por serial, sensor e equipamento: são transmitidas as leituras dos sensores de qualquer um deles.
+    Ao reconectar com o header Last-Event-ID, as leituras perdidas que ainda estão no buffer são reenviadas;
+    as que já saíram são informadas no evento 'lacuna'.
+    """
+    sensor_ids: set[int] | None = None
+
+    if serial or sensor_id or equipamento_id is not None:
+        sensor_ids = set(sensor_id or [])
+
+        for cod_serial in serial or []:
+            sensor_ids.update(id_sensor for id_sensor, _ in RotaSensores.get(cod_serial) or [])
+
+        if equipamento_id is not None:
+            # Única consulta, feita apenas na inscrição
+            sensor_ids.update(await run_in_threadpool(_sensores_do_equipamento, equipamento_id))
+
+    apos_id = last_event_id if last_event_id is not None else TransmissaoLeituras.ultimo_id()
+
+    return StreamingResponse(
+        _transmitir(request, apos_id, sensor_ids),
+        media_type=MEDIA_TYPE_SSE,
+        # Evita que proxies acumulem a resposta
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+medidor("transmissao_leituras_inscritos", "Conexões inscritas no /leitura/stream.", TransmissaoLeituras.quantidade_inscritos)
@@ -0,0 +1,279 @@
+"""
+Leitura mais recente de cada sensor, mantida em memória e salva periodicamente na tabela ULTIMA_LEITURA.
+Permite ler o estado atual de todos os sensores em O(quantidade de sensores), sem percorrer a LEITURA_SENSOR.
+"""
+import logging
+import os
+import threading
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from src.database.models.sensor import LeituraSensor, Sensor, TipoSensor, TipoSensorEnum
+from src.database.models.ultima_leitura import UltimaLeitura
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.model_mixins.crud import _ModelCrudMixin
+from src.wokwi_api.metricas import medidor
+
+ValorAtual = tuple[datetime, float]
+
+
+def _consultar_tabela(session: Session) -> dict[int, ValorAtual]:
+    return {
+        sensor_id: (data_leitura, valor)
+        for sensor_id, data_leitura, valor in session.execute(
+            select(UltimaLeitura.sensor_id, UltimaLeitura.data_leitura, UltimaLeitura.valor)
+        )
+    }
+
+
+def _consultar_leituras(session: Session) -> dict[int, ValorAtual]:
+    # Usado apenas enquanto a ULTIMA_LEITURA está vazia (ex.: banco criado antes dela), pelo índice (sensor_id, data_leitura)
+    maximas = select(LeituraSensor.sensor_id, func.max(LeituraSensor.data_leitura).label("data_leitura")) \
+        .group_by(LeituraSensor.sensor_id).subquery()
+
+    return {
+        sensor_id: (data_leitura, valor)
+        for sensor_id, data_leitura, valor in session.execute(
+            select(LeituraSensor.sensor_id, LeituraSensor.data_leitura, LeituraSensor.valor).join(
+                maximas,
+                (LeituraSensor.sensor_id == maximas.c.sensor_id) & (LeituraSensor.data_leitura == maximas.c.data_leitura)
+            )
+        )
+    }
+
+
+class UltimasLeituras:
+    """
+    Mapa em memória do sensor_id para a leitura mais recente (data_leitura, valor), atualizado a cada gravação na LEITURA_SENSOR.
+    Uma thread salva os sensores alterados na ULTIMA_LEITURA a cada ULTIMA_LEITURA_INTERVALO_SEGUNDOS
+    e traz as leituras mais recentes gravadas pelos outros processos.
+    Em um processo sem a thread (ex.: dashboard sem a API), as consultas leem direto a ULTIMA_LEITURA.
+    """
+
+    intervalo: float = float(os.environ.get("ULTIMA_LEITURA_INTERVALO_SEGUNDOS", 5.0))
+
+    _valores: dict[int, ValorAtual] = {}
+    _alterados: set[int] = set()
+    _lock = threading.Lock()
+    _thread: threading.Thread | None = None
+    _evento_parar = threading.Event()
+
+    @classmethod
+    def ativo(cls) -> bool:
+        """
+        Retorna se a thread que salva as leituras está em execução.
+        """
+        return cls._thread is not None and cls._thread.is_alive()
+
+    @classmethod
+    def iniciar(cls):
+        """
+        Carrega as últimas leituras do banco de dados e inicia a thread que as salva periodicamente.
+        """
+        if cls.ativo():
+            return
+
+        with Database.get_session() as session:
+            valores = _consultar_tabela(session)
+            vazia = not valores
+            if vazia:
+                valores = _consultar_leituras(session)
+
+        with cls._lock:
+            for sensor_id, valor in valores.items():
+                cls._atualizar(sensor_id, valor)
+            if vazia:
+                cls._alterados.update(valores)
+
+        cls._evento_parar.clear()
+        cls._thread = threading.Thread(target=cls._executar, name="ultimas-leituras", daemon=True)
+        cls._thread.start()
+
+        logging.info(f"Últimas leituras carregadas ({len(cls._valores)} sensores).")
+
+    @classmethod
+    def parar(cls, timeout: float | None = 30.0):
+        """
+        Para a thread, salvando antes as leituras alteradas.
+        :param timeout: Tempo máximo, em segundos, para aguardar a thread.
+        """
+        if not cls.ativo():
+            return
+
+        cls._evento_parar.set()
+        cls._thread.join(timeout)
+        cls._thread = None
+
+    @classmethod
+    def registrar(cls, linhas: list[dict]) -> None:
+        """
+        Atualiza o mapa com leituras gravadas na LEITURA_SENSOR. Leituras mais antigas que a atual do sensor são ignoradas.
+        :param linhas: Lista de dicionários com as chaves 'sensor_id', 'data_leitura' e 'valor'.
+        """
+        with cls._lock:
+            for linha in linhas:
+                if cls._atualizar(linha["sensor_id"], (linha["data_leitura"], linha["valor"])):
+                    cls._alterados.add(linha["sensor_id"])
+
+    @classmethod
+    def _atualizar(cls, sensor_id: int, valor: ValorAtual) -> bool:
+        # Deve ser chamado com o _lock adquirido
+        atual = cls._valores.get(sensor_id)
+        if atual is not None and atual[0] > valor[0]:
+            return False
+        cls._valores[sensor_id] = valor
+        return True
+
+    @classmethod
+    def valores(cls, sensor_ids: list[int] | None = None) -> dict[int, ValorAtual]:
+        """
+        Retorna a última leitura dos sensores.
+        :param sensor_ids: Sensores desejados. Se None, todos os sensores com leitura.
+        :return: Dicionário com o sensor_id como chave e (data_leitura, valor) como valor.
+        """
+        if not cls.ativo():
+            with Database.get_session_atual() as session:
+                valores = _consultar_tabela(session)
+            return valores if sensor_ids is None else {sensor_id: valores[sensor_id] for sensor_id in sensor_ids if sensor_id in valores}
+
+        with cls._lock:
+            if sensor_ids is None:
+                return dict(cls._valores)
+            return {sensor_id: cls._valores[sensor_id] for sensor_id in sensor_ids if sensor_id in cls._valores}
+
+    @classmethod
+    def leituras(cls, sensor_ids: list[int] | None = None) -> dict[int, UltimaLeitura]:
+        """
+        Retorna a última leitura dos sensores como instâncias (não salvas na sessão) do model UltimaLeitura.
+        :param sensor_ids: Sensores desejados. Se None, todos os sensores com leitura.
+        :return: Dicionário com o sensor_id como chave.
+        """
+        return {
+            sensor_id: UltimaLeitura(sensor_id=sensor_id, data_leitura=data_leitura, valor=valor)
+            for sensor_id, (data_leitura, valor) in cls.valores(sensor_ids).items()
+        }
+
+    @classmethod
+    def do_sensor(cls, sensor_id: int) -> UltimaLeitura | None:
+        """
+        Retorna a leitura mais recente do sensor, sem consultar a LEITURA_SENSOR.
+        :param sensor_id: Id do sensor.
+        :return: UltimaLeitura ou None se o sensor ainda não possui leituras.
+        """
+        return cls.leituras([sensor_id]).get(sensor_id)
+
+    @classmethod
+    def do_equipamento(cls, equipamento_id: int) -> dict[TipoSensorEnum, UltimaLeitura]:
+        """
+        Retorna o estado atual do equipamento: a leitura mais recente de cada tipo de sensor instalado nele.
+        :param equipamento_id: Id do equipamento.
+        :return: Dicionário com o tipo do sensor como chave. Tipos sem leitura não são incluídos.
+        """
+        with Database.get_session_atual() as session:
+            sensores = session.execute(
+                select(Sensor.id, TipoSensor.tipo)
+                .join(TipoSensor, TipoSensor.id == Sensor.tipo_sensor_id)
+                .where(Sensor.equipamento_id == equipamento_id)
+            ).all()
+
+        leituras = cls.leituras([sensor_id for sensor_id, _ in sensores])
+        ultimas: dict[TipoSensorEnum, UltimaLeitura] = {}
+
+        for sensor_id, tipo in sensores:
+            leitura = leituras.get(sensor_id)
+            if leitura is not None and (tipo not in ultimas or ultimas[tipo].data_leitura < leitura.data_leitura):
+                ultimas[tipo] = leitura
+
+        return ultimas
+
+    @classmethod
+    def salvar(cls) -> int:
+        """
+        Salva na ULTIMA_LEITURA os sensores alterados desde o último salvamento.
+        Os sensores removidos por outro processo (ex.: dashboard), que não notificou este, são descartados do mapa
+        em vez de gravados: a chave estrangeira do SENSOR recusaria o lote inteiro em todas as tentativas.
+        :return: Quantidade de sensores salvos.
+        """
+        with cls._lock:
+            alterados, cls._alterados = cls._alterados, set()
+            linhas = [
+                {"sensor_id": sensor_id, "data_leitura": cls._valores[sensor_id][0], "valor": cls._valores[sensor_id][1]}
+                for sensor_id in alterados if sensor_id in cls._valores
+            ]
+
+        if not linhas:
+            return 0
+
+        try:
+            with Database.get_session() as session:
+                existentes = set(session.scalars(select(Sensor.id)))
+                linhas = [linha for linha in linhas if linha["sensor_id"] in existentes]
+
+                if linhas:
+                    # Cada worker do servidor.py salva as leituras que recebeu: a linha só é substituída por uma leitura mais recente
+                    UltimaLeitura.bulk_upsert(
+                        linhas, keys=['sensor_id'], update_columns=['data_leitura', 'valor'], version_column='data_leitura',
+                        session=session,
+                    )
+                session.commit()
+        except Exception:
+            # Ex.: banco indisponível, ou sensor removido entre a consulta e a gravação (excluído na próxima tentativa)
+            with cls._lock:
+                cls._alterados.update(alterados)
+            raise
+
+        cls._remover(alterados, existentes)
+
+        return len(linhas)
+
+    @classmethod
+    def _executar(cls):
+        while True:
+            finalizar = cls._evento_parar.wait(cls.intervalo)
+
+            try:
+                cls.salvar()
+
+                if not finalizar:
+                    # Traz as leituras gravadas pelos outros processos
+                    with Database.get_session() as session:
+                        valores = _consultar_tabela(session)
+                    with cls._lock:
+                        for sensor_id, valor in valores.items():
+                            cls._atualizar(sensor_id, valor)
+            except Exception as e:
+                logging.error(f"Erro ao salvar as últimas leituras: {e}")
+
+            if finalizar:
+                return
+
+    @classmethod
+    def remover_inexistentes(cls) -> None:
+        """
+        Remove do mapa os sensores que não existem mais no banco de dados.
+        """
+        with Database.get_session() as session:
+            existentes = set(session.scalars(select(Sensor.id)))
+
+        with cls._lock:
+            sensor_ids = set(cls._valores)
+
+        cls._remover(sensor_ids, existentes)
+
+    @classmethod
+    def _remover(cls, sensor_ids: set[int], existentes: set[int]) -> None:
+        # Remove do mapa os sensores informados que não estão entre os existentes
+        with cls._lock:
+            for sensor_id in sensor_ids - existentes:
+                cls._valores.pop(sensor_id, None)
+                cls._alterados.discard(sensor_id)
+
+
+def _remover_sensores_excluidos(model: type) -> None:
+    if model is Sensor and UltimasLeituras.ativo():
+        UltimasLeituras.remover_inexistentes()
+
+
+_ModelCrudMixin.add_write_listener(_remover_sensores_excluidos)
+
+medidor("ultimas_leituras_sensores", "Sensores com a última leitura em memória.", lambda: len(UltimasLeituras._valores))
@@ -0,0 +1,55 @@
+import pytest
+from fastapi.testclient import TestClient
+from src.database.dynamic_import import import_models
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.model_mixins.cache import CacheConsultas
+from src.wokwi_api.api_basica import app
+from src.wokwi_api.idempotencia import ChavesRecentes
+from src.wokwi_api.init_sensor import provisionar_sensores
+from src.wokwi_api.rota_sensores import RotaSensor, RotaSensores
+from src.wokwi_api.ultimas_leituras import UltimasLeituras
+
+import_models()
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """
+    Banco SQLite novo em um diretório temporário, com as tabelas criadas e os caches em memória vazios.
+    O busy_timeout curto faz um banco bloqueado falhar logo, como um banco indisponível.
+    """
+    Database.init_sqlite(str(tmp_path / "teste.db"), busy_timeout=0.2)
+    Database.create_all_tables()
+
+    CacheConsultas.invalidar()
+    RotaSensores.invalidar()
+    ChavesRecentes.limpar()
+
+    with UltimasLeituras._lock:
+        UltimasLeituras._valores.clear()
+        UltimasLeituras._alterados.clear()
+
+    yield Database
+
+    Database.engine.dispose()
+
+
+@pytest.fixture
+def sensores(banco) -> list[RotaSensor]:
+    """
+    Cadastra o serial 'A1' (um sensor de cada tipo) e retorna a lista de (sensor_id, tipo).
+    """
+    with Database.get_session() as session:
+        rotas, _ = provisionar_sensores(session, ["A1"])
+        session.commit()
+
+    return rotas["A1"]
+
+
+@pytest.fixture
+def client(banco, sensores) -> TestClient:
+    """
+    Cliente da API, com o serial 'A1' cadastrado.
+    """
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,73 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+import pytest
+from src.database.models.sensor import LeituraSensor
+from src.wokwi_api.buffer_leituras import BufferCheioError, BufferLeituras
+
+
+@pytest.fixture
+def buffer(banco, monkeypatch):
+    monkeypatch.setattr(BufferLeituras, "tamanho_maximo", 100)
+    monkeypatch.setattr(BufferLeituras, "tamanho_lote", 1000)
+    monkeypatch.setattr(BufferLeituras, "intervalo", 0.05)
+    monkeypatch.setattr(BufferLeituras, "janela_reordenacao", 0.0)
+
+    BufferLeituras.iniciar()
+    yield BufferLeituras
+    BufferLeituras.parar()
+
+
+def _aguardar(condicao, timeout: float = 10.0) -> bool:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if condicao():
+            return True
+        time.sleep(0.05)
+    return condicao()
+
+
+def _leituras(sensor_id: int, quantidade: int) -> list[dict]:
+    inicio = datetime(2025, 1, 1)
+    return [{"sensor_id": sensor_id, "data_leitura": inicio + timedelta(seconds=i), "valor": float(i)} for i in range(quantidade)]
+
+
+def test_lote_tentado_novamente_enquanto_o_banco_esta_indisponivel(buffer, sensores, tmp_path):
+    sensor_id, _ = sensores[0]
+
+    bloqueio = sqlite3.connect(str(tmp_path / "teste.db"), isolation_level=None)
+    bloqueio.execute("BEGIN EXCLUSIVE")
+
+    try:
+        buffer.adicionar(_leituras(sensor_id, 10))
+        # O lote continua pendente enquanto o banco está bloqueado
+        time.sleep(0.5)
+        assert buffer.tamanho() == 10
+    finally:
+        bloqueio.rollback()
+        bloqueio.close()
+
+    assert _aguardar(lambda: buffer.tamanho() == 0)
+    assert LeituraSensor.count() == 10
+
+
+def test_apenas_a_leitura_invalida_e_descartada(buffer, sensores):
+    sensor_id, _ = sensores[0]
+    linhas = _leituras(sensor_id, 8)
+    # Valor obrigatório ausente: o banco recusa a linha (IntegrityError), não o lote inteiro
+    linhas[3]["valor"] = None
+
+    buffer.adicionar(linhas)
+
+    assert _aguardar(lambda: buffer.tamanho() == 0)
+    assert LeituraSensor.count() == 7
+
+
+def test_buffer_cheio_recusa_o_lote_inteiro(buffer, sensores, monkeypatch):
+    sensor_id, _ = sensores[0]
+    monkeypatch.setattr(BufferLeituras, "tamanho_maximo", 5)
+
+    with pytest.raises(BufferCheioError):
+        buffer.adicionar(_leituras(sensor_id, 6))
+
+    assert buffer.tamanho() == 0
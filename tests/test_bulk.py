@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from src.database.models.equipamento import Equipamento
+from src.database.models.sensor import LeituraSensor
+from src.database.models.ultima_leitura import UltimaLeitura
+
+INICIO = datetime(2025, 1, 1)
+
+
+def _datas(quantidade: int, inicio: int = 0) -> list[datetime]:
+    return [INICIO + timedelta(seconds=i) for i in range(inicio, inicio + quantidade)]
+
+
+def test_insert_aceita_listas_colunas_e_dataframes(banco, sensores):
+    sensor_id, _ = sensores[0]
+
+    lista = [{"sensor_id": sensor_id, "data_leitura": data, "valor": 1.0} for data in _datas(4)]
+    colunas = {
+        "sensor_id": np.full(4, sensor_id),
+        "data_leitura": np.array(_datas(4, 4), dtype="datetime64[ms]"),
+        "valor": np.arange(4, dtype=np.float32),
+    }
+    dataframe = pd.DataFrame({"sensor_id": sensor_id, "data_leitura": _datas(4, 8), "valor": 2.0})
+
+    assert LeituraSensor.bulk_insert(lista) == 4
+    assert LeituraSensor.bulk_insert(colunas, chunk_size=3) == 4
+    assert LeituraSensor.bulk_insert(dataframe) == 4
+
+    assert LeituraSensor.count() == 12
+    assert sorted({leitura.data_leitura for leitura in LeituraSensor.all()}) == _datas(12)
+
+
+def test_insert_conta_apenas_as_linhas_inseridas(banco, sensores):
+    sensor_id, _ = sensores[0]
+    linhas = [
+        {"sensor_id": sensor_id, "data_leitura": data, "valor": 1.0, "chave_idempotencia": f"k{i}"}
+        for i, data in enumerate(_datas(10))
+    ]
+
+    assert LeituraSensor.bulk_insert(linhas[:6], chunk_size=4, ignore_conflicts_on=["chave_idempotencia"]) == 6
+    # Reenvio de parte das linhas: as já gravadas são ignoradas e não contam
+    assert LeituraSensor.bulk_insert(linhas, chunk_size=4, ignore_conflicts_on=["chave_idempotencia"]) == 4
+    assert LeituraSensor.count() == 10
+
+
+def test_upsert_conta_as_linhas_inseridas_e_atualizadas(banco):
+    assert Equipamento.bulk_upsert([{"nome": "A", "modelo": "1"}, {"nome": "B", "modelo": "1"}], keys=["nome"]) == 2
+    assert Equipamento.bulk_upsert([{"nome": "B", "modelo": "2"}, {"nome": "C", "modelo": "1"}], keys=["nome"]) == 2
+
+    # Sem colunas a atualizar, as linhas existentes são mantidas e apenas as novas contam
+    assert Equipamento.bulk_upsert([{"nome": "A", "modelo": "9"}, {"nome": "D", "modelo": "1"}], keys=["nome"], update_columns=[]) == 1
+
+    assert {equipamento.nome: equipamento.modelo for equipamento in Equipamento.all()} == {"A": "1", "B": "2", "C": "1", "D": "1"}
+
+
+def test_upsert_com_versao_nao_substitui_por_valores_antigos(banco, sensores):
+    (primeiro, _), (segundo, _) = sensores[:2]
+
+    def linhas(*valores):
+        return [{"sensor_id": sensor_id, "data_leitura": INICIO + timedelta(seconds=segundos), "valor": float(segundos)}
+                for sensor_id, segundos in valores]
+
+    opcoes = {"keys": ["sensor_id"], "update_columns": ["data_leitura", "valor"], "version_column": "data_leitura"}
+
+    assert UltimaLeitura.bulk_upsert(linhas((primeiro, 10), (segundo, 10)), **opcoes) == 2
+    assert UltimaLeitura.bulk_upsert(linhas((primeiro, 5), (segundo, 20)), **opcoes) == 1
+
+    assert {leitura.sensor_id: leitura.valor for leitura in UltimaLeitura.all()} == {primeiro: 10.0, segundo: 20.0}
+
+
+def test_delete_em_lotes_conta_as_linhas_removidas(banco):
+    Equipamento.bulk_insert([{"nome": f"E{i}"} for i in range(10)] + [{"nome": "Manter"}])
+
+    assert Equipamento.bulk_delete([Equipamento.nome.like("E%")], chunk_size=3) == 10
+    assert [equipamento.nome for equipamento in Equipamento.all()] == ["Manter"]
+
+    assert Equipamento.bulk_delete(None) == 1
+    assert Equipamento.count() == 0
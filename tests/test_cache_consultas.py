@@ -0,0 +1,99 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+import pytest
+from src.database.models.equipamento import Equipamento
+from src.database.models.sensor import LeituraSensor, Sensor, TipoSensor, TipoSensorEnum
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.model_mixins.cache import CacheConsultas
+
+
+def _em_outra_thread(funcao):
+    # Outra thread não enxerga a unidade de trabalho (ContextVar) e lê o cache compartilhado pelo processo
+    resultado = []
+    thread = threading.Thread(target=lambda: resultado.append(funcao()))
+    thread.start()
+    thread.join()
+    return resultado[0]
+
+
+def _faltas() -> int:
+    return CacheConsultas.estatisticas()["faltas"]
+
+
+def test_rollback_nao_deixa_resultados_antigos_no_cache(banco):
+    assert _em_outra_thread(Equipamento.count) == 0
+
+    with pytest.raises(RuntimeError):
+        with Database.unidade_de_trabalho():
+            Equipamento(nome="Prensa").save()
+            assert Equipamento.count() == 1
+            raise RuntimeError("falha no meio da unidade de trabalho")
+
+    assert Equipamento.count() == 0
+    assert _em_outra_thread(Equipamento.count) == 0
+
+
+def test_commit_invalida_o_cache_das_outras_threads(banco):
+    assert _em_outra_thread(Equipamento.count) == 0
+
+    with Database.unidade_de_trabalho():
+        Equipamento(nome="Prensa").save()
+        # Antes do commit as outras threads continuam com o resultado anterior
+        assert _em_outra_thread(Equipamento.count) == 0
+
+    assert _em_outra_thread(Equipamento.count) == 1
+
+
+def test_escritas_em_lote_invalidam_o_cache(banco):
+    assert Equipamento.count() == 0
+
+    Equipamento.bulk_insert([{"nome": "Prensa"}, {"nome": "Torno"}])
+    assert Equipamento.count() == 2
+
+    Equipamento.bulk_upsert([{"nome": "Fresa", "modelo": "F1"}], keys=["nome"])
+    assert Equipamento.count() == 3
+
+    Equipamento.bulk_delete([Equipamento.nome == "Torno"])
+    assert sorted(equipamento.nome for equipamento in Equipamento.all()) == ["Fresa", "Prensa"]
+
+
+def test_escrita_em_lote_sem_notificar_invalida_o_cache(banco):
+    assert Equipamento.count() == 0
+
+    with Database.get_session() as session:
+        Equipamento.bulk_upsert([{"nome": "Prensa"}], keys=["nome"], session=session, notify=False)
+        session.commit()
+
+    assert Equipamento.count() == 1
+
+
+def test_escrita_invalida_as_tabelas_que_referenciam(banco, sensores):
+    def consultado_novamente() -> bool:
+        faltas = _faltas()
+        assert Sensor.count() == 3
+        return _faltas() > faltas
+
+    assert consultado_novamente()
+
+    # O SENSOR referencia o TIPO_SENSOR: o resultado é descartado
+    TipoSensor(nome="Umidade", tipo=TipoSensorEnum.LUX).save()
+    assert consultado_novamente()
+
+    # A LEITURA_SENSOR referencia o SENSOR, e não o contrário: o resultado é mantido
+    LeituraSensor(sensor_id=sensores[0][0], data_leitura=datetime(2025, 1, 1), valor=1.0).save()
+    assert not consultado_novamente()
+
+
+def test_resultado_expira_apos_o_ttl(banco, tmp_path, monkeypatch):
+    monkeypatch.setattr(Equipamento, "__cache_ttl__", 0.1)
+    assert Equipamento.count() == 0
+
+    # Gravado por outro processo, sem passar pelos listeners deste
+    with sqlite3.connect(str(tmp_path / "teste.db")) as conexao:
+        conexao.execute('INSERT INTO "EQUIPAMENTO" (nome) VALUES (?)', ("Prensa",))
+
+    assert Equipamento.count() == 0
+    time.sleep(0.2)
+    assert Equipamento.count() == 1
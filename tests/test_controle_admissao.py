@@ -0,0 +1,108 @@
+import asyncio
+import json
+import pytest
+from src.wokwi_api.controle_admissao import ControleAdmissao, MiddlewareAdmissao
+
+
+@pytest.fixture(autouse=True)
+def admissao(monkeypatch):
+    # Uma requisição por vez e nenhuma na fila: a segunda requisição simultânea é rejeitada
+    monkeypatch.setattr(ControleAdmissao, "max_em_andamento", 1)
+    monkeypatch.setattr(ControleAdmissao, "max_fila", 0)
+    monkeypatch.setattr(ControleAdmissao, "espera_maxima", 0.05)
+    monkeypatch.setattr(ControleAdmissao, "retry_after", 3)
+    monkeypatch.setattr(ControleAdmissao, "rejeitadas", 0)
+    monkeypatch.setattr(ControleAdmissao, "_semaforo", None)
+    monkeypatch.setattr(ControleAdmissao, "_loop", None)
+
+
+def _middleware(liberar: asyncio.Event) -> MiddlewareAdmissao:
+    async def app(scope, receive, send):
+        await liberar.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    return MiddlewareAdmissao(app)
+
+
+async def _requisicao(middleware: MiddlewareAdmissao, caminho: str = "/leitura/", metodo: str = "POST") -> dict:
+    mensagens = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(mensagem):
+        mensagens.append(mensagem)
+
+    await middleware({"type": "http", "method": metodo, "path": caminho}, receive, send)
+
+    inicio, corpo = mensagens
+    return {"status": inicio["status"], "headers": dict(inicio["headers"]), "corpo": corpo["body"]}
+
+
+def test_excesso_rejeitado_com_503_e_retry_after():
+    async def executar():
+        liberar = asyncio.Event()
+        middleware = _middleware(liberar)
+
+        em_andamento = asyncio.create_task(_requisicao(middleware))
+        await asyncio.sleep(0)
+
+        rejeitada = await _requisicao(middleware)
+
+        liberar.set()
+        return await em_andamento, rejeitada, await _requisicao(middleware)
+
+    admitida, rejeitada, seguinte = asyncio.run(executar())
+
+    assert admitida["status"] == 200
+    assert rejeitada["status"] == 503
+    assert rejeitada["headers"][b"retry-after"] == b"3"
+    assert json.loads(rejeitada["corpo"])["message"] == "Servidor sobrecarregado, tente novamente mais tarde."
+    # A vaga é liberada ao fim da requisição admitida
+    assert seguinte["status"] == 200
+    assert ControleAdmissao.rejeitadas == 1
+    assert ControleAdmissao.em_andamento == 0
+
+
+def test_requisicao_na_fila_rejeitada_apos_a_espera_maxima(monkeypatch):
+    monkeypatch.setattr(ControleAdmissao, "max_fila", 1)
+
+    async def executar():
+        liberar = asyncio.Event()
+        middleware = _middleware(liberar)
+
+        em_andamento = asyncio.create_task(_requisicao(middleware))
+        await asyncio.sleep(0)
+
+        na_fila = await _requisicao(middleware)
+
+        liberar.set()
+        await em_andamento
+        return na_fila
+
+    assert asyncio.run(executar())["status"] == 503
+    assert ControleAdmissao.na_fila == 0
+
+
+def test_apenas_post_da_ingestao_e_limitado():
+    async def executar():
+        liberar = asyncio.Event()
+        middleware = _middleware(liberar)
+
+        em_andamento = asyncio.create_task(_requisicao(middleware))
+        await asyncio.sleep(0)
+
+        # Consultas não disputam as vagas da ingestão, mesmo com todas ocupadas
+        consultas = [
+            asyncio.create_task(_requisicao(middleware, "/leituras/", "GET")),
+            asyncio.create_task(_requisicao(middleware, "/leitura/stream", "GET")),
+        ]
+        await asyncio.sleep(0.1)
+
+        liberar.set()
+        await em_andamento
+        return await asyncio.gather(*consultas)
+
+    assert [resposta["status"] for resposta in asyncio.run(executar())] == [200, 200]
+    assert ControleAdmissao.rejeitadas == 0
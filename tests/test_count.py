@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from src.database.models.equipamento import Equipamento
+from src.database.models.sensor import LeituraSensor
+from src.database.tipos_base.model_mixins import crud
+from src.database.tipos_base.model_mixins.cache import CacheConsultas
+
+
+def _gravar_leituras(sensor_id: int, quantidade: int) -> None:
+    inicio = datetime(2025, 1, 1)
+    LeituraSensor.bulk_insert([
+        {"sensor_id": sensor_id, "data_leitura": inicio + timedelta(seconds=i), "valor": float(i)} for i in range(quantidade)
+    ])
+
+
+def test_count_em_cache_ate_a_proxima_escrita(banco):
+    Equipamento(nome="Prensa").save()
+    assert Equipamento.count() == 1
+
+    faltas = CacheConsultas.estatisticas()["faltas"]
+    assert Equipamento.count() == 1
+    assert CacheConsultas.estatisticas()["faltas"] == faltas
+
+    Equipamento(nome="Torno").save()
+    assert Equipamento.count() == 2
+
+
+def test_count_estimado_nas_tabelas_grandes(banco, sensores, monkeypatch):
+    monkeypatch.setattr(crud, "COUNT_ESTIMADO_MINIMO", 5)
+    sensor_id, _ = sensores[0]
+
+    _gravar_leituras(sensor_id, 3)
+    # Abaixo do mínimo a contagem é exata
+    assert LeituraSensor.count_estimate() == (3, False)
+
+    _gravar_leituras(sensor_id, 7)
+    LeituraSensor.bulk_delete([LeituraSensor.id.in_([4, 5])])
+
+    # A estimativa é a faixa de ids, sem percorrer a tabela: não desconta as linhas removidas no meio
+    assert LeituraSensor.count_estimate() == (10, True)
+    assert LeituraSensor.count() == 8
+
+    # Com filtros, ou em tabelas sem __count_estimado__, a contagem é exata
+    assert LeituraSensor.count_estimate([LeituraSensor.valor >= 5]) == (2, False)
+    assert Equipamento.count_estimate() == (0, False)
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from src.database.models.forma_onda import EixoFormaOndaEnum, FormaOndaSensor
+from src.wokwi_api.formato_binario import (
+    MEDIA_TYPE_FORMA_ONDA, FormatoBinarioError, JanelaFormaOnda, codificar_formas_onda, decodificar_formas_onda,
+)
+
+
+def test_decodifica_as_janelas_codificadas():
+    amostras = np.sin(np.linspace(0, 10, 1000)).astype(np.float32)
+    payload = codificar_formas_onda([JanelaFormaOnda("A1", "Z", 1000.0, 1234, amostras)])
+
+    janela, = decodificar_formas_onda(payload)
+
+    assert (janela.serial, janela.eixo, janela.taxa_amostragem, janela.inicio_ms) == ("A1", "Z", 1000.0, 1234)
+    np.testing.assert_array_equal(janela.amostras, amostras)
+
+
+def test_payload_truncado_nas_amostras():
+    payload = codificar_formas_onda([JanelaFormaOnda("A1", "X", 100.0, 0, [1.0, 2.0])])
+
+    with pytest.raises(FormatoBinarioError, match="Payload truncado nas amostras do serial 'A1'."):
+        decodificar_formas_onda(payload[:-1])
+
+
+def test_janelas_gravadas_com_erro_por_janela(client):
+    inicio = datetime.now().replace(microsecond=0) - timedelta(minutes=1)
+    amostras = np.arange(500, dtype=np.float32)
+    payload = codificar_formas_onda([
+        JanelaFormaOnda("A1", "X", 500.0, int(inicio.timestamp() * 1000), amostras),
+        JanelaFormaOnda("A1", "Q", 500.0, 0, amostras),
+        JanelaFormaOnda("A1", "Y", 500.0, 2 ** 62, amostras),
+        JanelaFormaOnda("ZZ", "X", 500.0, 0, amostras),
+    ])
+
+    resposta = client.post("/leitura/forma_onda", content=payload, headers={"content-type": MEDIA_TYPE_FORMA_ONDA}).json()
+
+    assert resposta["status"] == "partial"
+    assert [r["status"] for r in resposta["resultados"]] == ["success", "error", "error", "error"]
+    assert resposta["resultados"][1]["message"] == "Eixo 'Q' inválido."
+    assert resposta["resultados"][2]["message"] == f"Horário de início {2 ** 62} ms fora do intervalo suportado."
+
+    janela, = FormaOndaSensor.all()
+    assert (janela.eixo, janela.data_inicio, janela.quantidade_amostras) == (EixoFormaOndaEnum.X, inicio, 500)
+    np.testing.assert_array_equal(janela.amostras(), amostras)
+
+
+def test_janela_json(client):
+    resposta = client.post("/leitura/forma_onda", json={
+        "serial": "A1", "eixo": "M", "taxa_amostragem": 1000.0, "amostras": [0.5, -0.5, 0.25],
+    }).json()
+
+    assert resposta["status"] == "success"
+    assert FormaOndaSensor.all()[0].amostras().tolist() == [0.5, -0.5, 0.25]
@@ -0,0 +1,75 @@
+import struct
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from src.database.models.sensor import LeituraSensor
+from src.wokwi_api.formato_binario import (
+    MEDIA_TYPE, BlocoLeituras, FormatoBinarioError, codificar_leituras, decodificar_leituras,
+)
+
+
+def test_decodifica_os_blocos_codificados():
+    valores = [[1.0, 2.0, 3.0], [4.0, np.nan, 6.0]]
+    payload = codificar_leituras([BlocoLeituras("A1", 1000, 500, 7, valores), BlocoLeituras("B2", 0, 0, -1, [])])
+
+    # 1 byte de versão + (1 + serial + 24 de cabeçalho + 12 por leitura) por bloco
+    assert len(payload) == 1 + (1 + 2 + 24 + 24) + (1 + 2 + 24)
+
+    primeiro, segundo = decodificar_leituras(payload)
+
+    assert (primeiro.serial, primeiro.inicio_ms, primeiro.intervalo_ms, primeiro.seq) == ("A1", 1000, 500, 7)
+    np.testing.assert_array_equal(primeiro.valores, np.array(valores, dtype=np.float32))
+    assert (segundo.serial, segundo.seq, segundo.valores.shape) == ("B2", -1, (0, 3))
+
+
+def test_decodifica_a_versao_1():
+    payload = bytes([1, 2]) + b"A1" + struct.pack("<I", 1) + np.array([7, 8, 9], dtype="<f4").tobytes()
+
+    bloco, = decodificar_leituras(payload)
+
+    assert (bloco.serial, bloco.inicio_ms, bloco.intervalo_ms, bloco.seq) == ("A1", 0, 0, -1)
+    assert bloco.valores.tolist() == [[7.0, 8.0, 9.0]]
+
+
+@pytest.mark.parametrize("payload, mensagem", [
+    (b"", "Payload vazio."),
+    (bytes([9]), "Versão 9 do formato binário não suportada."),
+    (bytes([2, 2]) + b"A1" + b"\x00" * 10, "Payload truncado no cabeçalho do bloco."),
+    (bytes([2, 2]) + b"\xff\xfe" + b"\x00" * 24, "Serial não está em utf-8."),
+])
+def test_payload_invalido(payload, mensagem):
+    with pytest.raises(FormatoBinarioError, match=mensagem):
+        decodificar_leituras(payload)
+
+
+def test_payload_truncado_nas_leituras():
+    payload = codificar_leituras([BlocoLeituras("A1", 0, 0, -1, [[1.0, 2.0, 3.0]])])
+
+    with pytest.raises(FormatoBinarioError, match="Payload truncado nas leituras do serial 'A1'."):
+        decodificar_leituras(payload[:-2])
+
+
+def test_leituras_gravadas_com_o_horario_de_cada_leitura(client):
+    inicio = datetime.now().replace(microsecond=0) - timedelta(minutes=1)
+    inicio_ms = int(inicio.timestamp() * 1000)
+    payload = codificar_leituras([
+        BlocoLeituras("A1", inicio_ms, 1000, 5, [[1.0, 2.0, 3.0], [4.0, np.nan, 6.0]]),
+        BlocoLeituras("ZZ", 0, 0, -1, [[1.0, 1.0, 1.0]]),
+    ])
+
+    resposta = client.post("/leitura/", content=payload, headers={"content-type": MEDIA_TYPE}).json()
+
+    assert resposta["status"] == "partial"
+    assert resposta["resultados"][0]["leituras"] == 5
+    assert resposta["resultados"][1]["message"] == "Sensor com serial 'ZZ' não encontrado."
+
+    leituras = LeituraSensor.all()
+    assert sorted({leitura.data_leitura for leitura in leituras}) == [inicio, inicio + timedelta(seconds=1)]
+    assert sorted(leitura.chave_idempotencia.rsplit(":", 1)[1] for leitura in leituras) == ["s5"] * 3 + ["s6"] * 2
+
+
+def test_payload_invalido_recusado_pela_api(client):
+    resposta = client.post("/leitura/lote", content=bytes([9]), headers={"content-type": MEDIA_TYPE})
+
+    assert resposta.status_code == 400
+    assert resposta.json()["message"] == "Versão 9 do formato binário não suportada."
@@ -0,0 +1,84 @@
+import time
+from src.database.models.sensor import LeituraSensor
+from src.wokwi_api.formato_binario import MEDIA_TYPE, BlocoLeituras, codificar_leituras
+from src.wokwi_api.gravar_leituras import gravar_leituras
+from src.wokwi_api.idempotencia import ChavesRecentes
+
+
+def _leitura(seq: int, **campos) -> dict:
+    leitura = {
+        "serial": "A1", "lux": 100.0, "temperatura": 25.0, "vibracao_media": 0.5,
+        "acelerometro_x": 0.0, "acelerometro_y": 0.0, "acelerometro_z": 1.0, "seq": seq,
+    }
+    leitura.update(campos)
+    return leitura
+
+
+def test_reenvio_json_descartado(client):
+    assert client.post("/leitura/", json=_leitura(1)).json()["status"] == "success"
+    gravadas = LeituraSensor.count()
+    assert gravadas > 0
+
+    resposta = client.post("/leitura/", json=_leitura(1)).json()
+    assert resposta["message"] == "Leitura já recebida anteriormente."
+    assert LeituraSensor.count() == gravadas
+
+    # Outro número de sequência é uma nova leitura
+    client.post("/leitura/", json=_leitura(2))
+    assert LeituraSensor.count() == 2 * gravadas
+
+
+def test_reenvio_descartado_pelo_indice_unico_sem_o_cache(client):
+    client.post("/leitura/", json=_leitura(1, boot=77))
+    linhas = [
+        {"sensor_id": l.sensor_id, "data_leitura": l.data_leitura, "valor": l.valor, "chave_idempotencia": l.chave_idempotencia}
+        for l in LeituraSensor.all()
+    ]
+    assert all(linha["chave_idempotencia"] for linha in linhas)
+
+    # Após o reinício do processo as chaves recentes se perdem: o INSERT ignora os reenvios
+    ChavesRecentes.limpar()
+    assert gravar_leituras(linhas) == 0
+    assert client.post("/leitura/", json=_leitura(1, boot=77)).json()["status"] == "success"
+    assert LeituraSensor.count() == len(linhas)
+
+
+def test_seq_reiniciado_pelo_dispositivo_nao_descarta_leituras(client, monkeypatch):
+    # Com o identificador da inicialização: o mesmo seq de outro boot é uma nova leitura
+    client.post("/leitura/", json=_leitura(0, boot=1))
+    client.post("/leitura/", json=_leitura(0, boot=2))
+    assert LeituraSensor.count() == 6
+
+    # Com o horário do dispositivo: o mesmo seq em outro horário é uma nova leitura
+    client.post("/leitura/", json=_leitura(0, data_leitura="2025-01-01T10:00:00"))
+    client.post("/leitura/", json=_leitura(0, data_leitura="2025-01-01T10:05:00"))
+    assert LeituraSensor.count() == 12
+
+    # Apenas com o seq: o reenvio só é descartado dentro da janela e a chave não vai para o índice único
+    monkeypatch.setattr(ChavesRecentes, "janela", 0.2)
+    client.post("/leitura/", json=_leitura(5))
+    assert client.post("/leitura/", json=_leitura(5)).json()["message"] == "Leitura já recebida anteriormente."
+
+    time.sleep(0.3)
+    assert client.post("/leitura/", json=_leitura(5)).json()["message"] == "Leitura recebida com sucesso"
+    assert LeituraSensor.count() == 18
+
+
+def test_reenvio_binario_informa_duplicadas(client):
+    agora = int(time.time() * 1000)
+    payload = codificar_leituras([BlocoLeituras("A1", agora - 2000, 1000, 10, [[1, 2, 3], [4, 5, 6]])])
+
+    primeiro = client.post("/leitura/", content=payload, headers={"content-type": MEDIA_TYPE}).json()
+    assert primeiro["resultados"][0]["leituras"] == 6
+    assert "duplicadas" not in primeiro["resultados"][0]
+
+    reenvio = client.post("/leitura/", content=payload, headers={"content-type": MEDIA_TYPE}).json()
+    assert reenvio["resultados"][0]["leituras"] == 0
+    assert reenvio["resultados"][0]["duplicadas"] == 2
+    assert LeituraSensor.count() == 6
+
+    # Após reiniciar, o dispositivo envia o mesmo seq com um novo horário
+    reiniciado = codificar_leituras([BlocoLeituras("A1", agora - 500, 1000, 10, [[1, 2, 3]])])
+    resposta = client.post("/leitura/", content=reiniciado, headers={"content-type": MEDIA_TYPE}).json()
+    assert resposta["resultados"][0]["leituras"] == 3
+    assert LeituraSensor.count() == 9
@@ -0,0 +1,46 @@
+from src.database.models.sensor import Sensor
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.model_mixins.crud import _ModelCrudMixin, _write_listeners
+from src.wokwi_api.init_sensor import provisionar_sensores
+from src.wokwi_api.rota_sensores import RotaSensores
+
+
+def test_provisionamento_invalida_o_cache_de_consultas(banco):
+    with Database.get_session() as session:
+        provisionar_sensores(session, ["A1"])
+
+    # Resultados em cache antes do segundo cadastro
+    assert Sensor.count() == 3
+    assert len(Sensor.all()) == 3
+
+    with Database.get_session() as session:
+        rotas, inseridos = provisionar_sensores(session, ["A1", "B2"])
+
+    assert inseridos == 3
+    assert Sensor.count() == 6
+    assert len(Sensor.all()) == 6
+    assert len(rotas["B2"]) == 3
+
+
+def test_provisionamento_nao_notifica_os_demais_listeners(banco):
+    notificados = []
+    listener = notificados.append
+    _ModelCrudMixin.add_write_listener(listener)
+
+    try:
+        with Database.get_session() as session:
+            provisionar_sensores(session, ["A1"])
+    finally:
+        _write_listeners.remove(listener)
+
+    # A tabela de roteamento é atualizada pelo cadastro, em vez de invalidada por um listener
+    assert Sensor not in notificados
+    assert len(RotaSensores.get("A1")) == 3
+
+
+def test_cadastro_pela_api_pode_ser_reenviado(client):
+    assert client.post("/init/", json={"serial": "A1"}).json()["status"] == "success"
+    assert client.post("/init/lote", json={"seriais": ["A1", "B2", "C3"]}).json()["status"] == "success"
+
+    assert Sensor.count() == 9
+    assert {sensor.cod_serial for sensor in Sensor.all()} == {"A1", "B2", "C3"}
@@ -0,0 +1,64 @@
+import pytest
+from src.database.models.equipamento import Equipamento
+
+ITENS_POR_PAGINA = 4
+
+
+@pytest.fixture
+def equipamentos(banco) -> int:
+    for numero in range(1, 10):
+        Equipamento(nome=f"Equipamento {numero}").save()
+    return 9
+
+
+def _ids(dataframe) -> list[int]:
+    return dataframe["id"].tolist()
+
+
+def _pagina(**kwargs):
+    return Equipamento.filter_dataframe(order_by=[Equipamento.id.desc()], select_fields=["id"], **kwargs)
+
+
+def test_avancar_pelas_paginas(equipamentos):
+    primeira = _pagina(limit=ITENS_POR_PAGINA)
+    segunda = _pagina(limit=ITENS_POR_PAGINA, after=primeira.attrs["cursor_fim"])
+    terceira = _pagina(limit=ITENS_POR_PAGINA, after=segunda.attrs["cursor_fim"])
+
+    assert _ids(primeira) == [9, 8, 7, 6] and primeira.attrs["tem_mais"]
+    assert _ids(segunda) == [5, 4, 3, 2] and segunda.attrs["tem_mais"]
+    assert _ids(terceira) == [1] and not terceira.attrs["tem_mais"]
+
+
+def test_ultima_pagina_alinhada_com_o_avanco(equipamentos):
+    # Tamanho da última página, como calculado pela table_view
+    limite = equipamentos % ITENS_POR_PAGINA or ITENS_POR_PAGINA
+
+    ultima = _pagina(limit=limite, from_end=True)
+    assert _ids(ultima) == [1]
+    assert ultima.attrs["tem_mais"]
+
+    anterior = _pagina(limit=ITENS_POR_PAGINA, before=ultima.attrs["cursor_inicio"])
+    assert _ids(anterior) == [5, 4, 3, 2]
+
+    primeira = _pagina(limit=ITENS_POR_PAGINA, before=anterior.attrs["cursor_inicio"])
+    assert _ids(primeira) == [9, 8, 7, 6]
+    assert not primeira.attrs["tem_mais"]
+
+
+def test_pagina_seguinte_nao_repete_linhas_com_valores_iguais_na_ordenacao(banco):
+    for numero in range(6):
+        Equipamento(nome=f"Equipamento {numero}", modelo="M").save()
+
+    vistos = []
+    cursor = None
+
+    while True:
+        pagina = Equipamento.filter_dataframe(
+            order_by=[Equipamento.modelo.asc()], select_fields=["id"], limit=ITENS_POR_PAGINA, after=cursor
+        )
+        vistos.extend(_ids(pagina))
+        if not pagina.attrs["tem_mais"]:
+            break
+        cursor = pagina.attrs["cursor_fim"]
+
+    assert sorted(vistos) == list(range(1, 7))
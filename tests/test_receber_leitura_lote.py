@@ -0,0 +1,57 @@
+from sqlalchemy import event
+from src.database.models.sensor import LeituraSensor
+from src.database.tipos_base.database import Database
+
+
+def _leitura(serial: str = "A1", **valores) -> dict:
+    leitura = {
+        "serial": serial, "lux": 100.0, "temperatura": 25.0, "vibracao_media": 0.5,
+        "acelerometro_x": 0.0, "acelerometro_y": 0.0, "acelerometro_z": 1.0,
+    }
+    leitura.update(valores)
+    return leitura
+
+
+def test_lote_gravado_em_um_unico_insert(client):
+    inserts = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO \"LEITURA_SENSOR\""):
+            inserts.append(statement)
+
+    event.listen(Database.engine, "before_cursor_execute", _registrar)
+    try:
+        resposta = client.post("/leitura/lote", json={"leituras": [_leitura(seq=i) for i in range(5)]}).json()
+    finally:
+        event.remove(Database.engine, "before_cursor_execute", _registrar)
+
+    assert resposta["status"] == "success"
+    assert resposta["message"] == "15 leituras recebidas."
+    assert len(inserts) == 1
+    assert LeituraSensor.count() == 15
+
+
+def test_item_invalido_nao_rejeita_o_lote(client):
+    leituras = [
+        _leitura(),
+        {"serial": "A1", "lux": "muito"},
+        _leitura("ZZ"),
+        _leitura(seq=7),
+    ]
+
+    resposta = client.post("/leitura/lote", json={"leituras": leituras}).json()
+    resultados = resposta["resultados"]
+
+    assert resposta["status"] == "partial"
+    assert [r["status"] for r in resultados] == ["success", "error", "error", "success"]
+    assert resultados[1]["message"].startswith("Leitura inválida:")
+    assert resultados[2]["message"] == "Sensor com serial 'ZZ' não encontrado."
+    assert [resultados[0]["leituras"], resultados[3]["leituras"]] == [3, 3]
+    assert LeituraSensor.count() == 6
+
+
+def test_lote_sem_itens_validos(client):
+    resposta = client.post("/leitura/lote", json={"leituras": [{"serial": "A1"}]}).json()
+
+    assert resposta["status"] == "error"
+    assert LeituraSensor.count() == 0
@@ -0,0 +1,30 @@
+import json
+from src.database.models.sensor import LeituraSensor
+from src.wokwi_api import receber_leitura_ws
+
+
+def test_frame_invalido_nao_adiciona_nenhuma_leitura(client, monkeypatch):
+    # As leituras pendentes são gravadas logo após o frame
+    monkeypatch.setattr(receber_leitura_ws, "WS_INTERVALO_SEGUNDOS", 0.05)
+
+    with client.websocket_connect("/leitura/ws") as websocket:
+        websocket.send_json({"serial": "A1"})
+        assert websocket.receive_json() == {"status": "success", "sensores": 3}
+
+        # O segundo frame é inválido: o primeiro também não pode ser gravado
+        websocket.send_text(json.dumps([[1.0, 2.0, 3.0], [4.0, "x", 6.0]]))
+        assert websocket.receive_json() == {"status": "error", "message": "Frame inválido."}
+
+        websocket.send_text(json.dumps({"lux": 1.0}))
+        assert websocket.receive_json() == {"status": "error", "message": "Frame inválido."}
+
+        websocket.send_text(json.dumps([7.0, None, 9.0]))
+        assert websocket.receive_json() == {"status": "success", "leituras": 2}
+
+    assert sorted(leitura.valor for leitura in LeituraSensor.all()) == [7.0, 9.0]
+
+
+def test_serial_desconhecido_encerra_a_conexao(client):
+    with client.websocket_connect("/leitura/ws") as websocket:
+        websocket.send_json({"serial": "ZZ"})
+        assert websocket.receive_json() == {"status": "error", "message": "Sensor com serial 'ZZ' não encontrado."}
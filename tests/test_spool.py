@@ -0,0 +1,72 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+import pytest
+from src.database.models.sensor import LeituraSensor
+from src.wokwi_api.spool import Spool, gravar_com_spool
+
+
+@pytest.fixture
+def spool(banco, tmp_path, monkeypatch):
+    # Espera curta entre as tentativas de reprocessamento, para o teste não aguardar os 5 s padrão
+    monkeypatch.setattr(Spool, "espera", 0.1)
+    monkeypatch.setattr(Spool, "_desviar_ate", 0.0)
+    monkeypatch.setattr(Spool, "_pendente", False)
+
+    Spool.iniciar(str(tmp_path / "spool"))
+    yield Spool
+    Spool.parar()
+
+
+def _aguardar(condicao, timeout: float = 10.0) -> bool:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if condicao():
+            return True
+        time.sleep(0.05)
+    return condicao()
+
+
+def _leituras(sensor_id: int, quantidade: int) -> list[dict]:
+    inicio = datetime(2025, 1, 1)
+    return [
+        {"sensor_id": sensor_id, "data_leitura": inicio + timedelta(seconds=i), "valor": float(i),
+         "chave_idempotencia": f"{sensor_id}|s{i}"}
+        for i in range(quantidade)
+    ]
+
+
+def test_leituras_reprocessadas_depois_que_o_banco_volta(banco, sensores, spool, tmp_path):
+    sensor_id, _ = sensores[0]
+
+    # Simula o banco indisponível: outra conexão mantém o arquivo bloqueado
+    bloqueio = sqlite3.connect(str(tmp_path / "teste.db"), isolation_level=None)
+    bloqueio.execute("BEGIN EXCLUSIVE")
+
+    try:
+        assert gravar_com_spool(_leituras(sensor_id, 10)) == 10
+        assert spool.desviando()
+        assert spool.bytes_pendentes() > 0
+
+        # Enquanto o banco está indisponível, as novas leituras vão direto para o spool
+        assert gravar_com_spool(_leituras(sensor_id, 15)[10:]) == 5
+    finally:
+        bloqueio.rollback()
+        bloqueio.close()
+
+    assert _aguardar(lambda: not spool.desviando())
+    assert LeituraSensor.count() == 15
+    assert spool.bytes_pendentes() == 0
+
+
+def test_reprocessamento_ignora_leituras_ja_gravadas(banco, sensores, spool):
+    sensor_id, _ = sensores[0]
+    linhas = _leituras(sensor_id, 5)
+
+    assert gravar_com_spool(linhas) == 5
+
+    # Reenvio das mesmas leituras pelo spool (ex.: checkpoint não salvo antes de uma queda)
+    spool.gravar(linhas)
+
+    assert _aguardar(lambda: not spool.desviando())
+    assert LeituraSensor.count() == 5
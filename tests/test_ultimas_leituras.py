@@ -0,0 +1,60 @@
+import sqlite3
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.exc import OperationalError
+from src.database.models.ultima_leitura import UltimaLeitura
+from src.wokwi_api.ultimas_leituras import UltimasLeituras
+
+INICIO = datetime(2025, 1, 1)
+
+
+def _leituras(sensores, segundos: int) -> list[dict]:
+    return [
+        {"sensor_id": sensor_id, "data_leitura": INICIO + timedelta(seconds=segundos), "valor": float(segundos)}
+        for sensor_id, _ in sensores
+    ]
+
+
+def _tabela() -> dict[int, float]:
+    return {leitura.sensor_id: leitura.valor for leitura in UltimaLeitura.all()}
+
+
+def test_salva_apenas_a_leitura_mais_recente(banco, sensores):
+    UltimasLeituras.registrar(_leituras(sensores, 10))
+    UltimasLeituras.registrar(_leituras(sensores, 5))
+
+    assert UltimasLeituras.salvar() == 3
+    assert _tabela() == {sensor_id: 10.0 for sensor_id, _ in sensores}
+
+    # Sem alterações desde o último salvamento
+    assert UltimasLeituras.salvar() == 0
+
+
+def test_sensor_removido_por_outro_processo_e_descartado(banco, sensores, tmp_path):
+    removido, _ = sensores[0]
+    UltimasLeituras.registrar(_leituras(sensores, 10))
+
+    # Removido por outra conexão, sem passar pelos listeners deste processo
+    with sqlite3.connect(str(tmp_path / "teste.db")) as conexao:
+        conexao.execute('DELETE FROM "SENSOR" WHERE id = ?', (removido,))
+
+    assert UltimasLeituras.salvar() == 2
+    assert removido not in _tabela()
+    assert removido not in UltimasLeituras._valores
+    assert not UltimasLeituras._alterados
+
+
+def test_sensores_mantidos_para_a_proxima_tentativa_se_o_banco_falhar(banco, sensores, tmp_path):
+    UltimasLeituras.registrar(_leituras(sensores, 10))
+
+    bloqueio = sqlite3.connect(str(tmp_path / "teste.db"), isolation_level=None)
+    bloqueio.execute("BEGIN EXCLUSIVE")
+    try:
+        with pytest.raises(OperationalError):
+            UltimasLeituras.salvar()
+    finally:
+        bloqueio.rollback()
+        bloqueio.close()
+
+    assert UltimasLeituras._alterados == {sensor_id for sensor_id, _ in sensores}
+    assert UltimasLeituras.salvar() == 3
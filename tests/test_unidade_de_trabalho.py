@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+from src.database.models.equipamento import Equipamento
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.model_mixins.crud import _ModelCrudMixin, _write_listeners
+
+
+def test_rollback_desfaz_todas_as_escritas(banco):
+    with pytest.raises(RuntimeError):
+        with Database.unidade_de_trabalho():
+            Equipamento(nome="Prensa").save()
+            Equipamento(nome="Torno").save()
+            # A própria transação enxerga as escritas
+            assert Equipamento.count() == 2
+            raise RuntimeError("falha no meio da unidade de trabalho")
+
+    assert Equipamento.count() == 0
+
+
+def test_unidades_aninhadas_compartilham_a_transacao(banco):
+    with Database.unidade_de_trabalho() as externa:
+        Equipamento(nome="Prensa").save()
+
+        with Database.unidade_de_trabalho() as interna:
+            assert interna is externa
+            Equipamento(nome="Torno").save()
+
+        assert Database.sessao_atual() is externa
+
+    assert Database.sessao_atual() is None
+    assert Equipamento.count() == 2
+
+
+def test_erro_tratado_desfaz_apenas_a_escrita_que_falhou(banco):
+    with Database.unidade_de_trabalho():
+        Equipamento(nome="Prensa").save()
+
+        # Nome repetido: a escrita é feita em um savepoint, desfeito sem afetar as anteriores
+        with pytest.raises(IntegrityError):
+            Equipamento(nome="Prensa").save()
+
+        Equipamento(nome="Torno").save()
+
+    assert sorted(equipamento.nome for equipamento in Equipamento.all()) == ["Prensa", "Torno"]
+
+
+def test_listeners_notificados_apenas_no_fim_da_transacao_externa(banco):
+    notificados = []
+    listener = notificados.append
+    _ModelCrudMixin.add_write_listener(listener)
+
+    try:
+        with Database.unidade_de_trabalho():
+            Equipamento(nome="Prensa").save()
+
+            with Database.unidade_de_trabalho():
+                Equipamento(nome="Torno").save()
+
+            assert notificados == []
+
+        assert notificados.count(Equipamento) == 1
+    finally:
+        _write_listeners.remove(listener)
+
+
+def test_alteracoes_pendentes_mantidas_ao_consultar(banco):
+    Equipamento(nome="Prensa").save()
+
+    with Database.unidade_de_trabalho():
+        equipamento = Equipamento.all()[0]
+        equipamento.modelo = "P-100"
+
+        # A instância da unidade de trabalho é reutilizada, sem perder a alteração
+        assert Equipamento.all()[0].modelo == "P-100"
+
+    assert Equipamento.all()[0].modelo == "P-100"